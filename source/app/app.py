@@ -2,18 +2,10 @@
 from kivymd.app import MDApp
 
 from core.functions import try_make_base_tables
+from core import startup_profile
 from screens.screen_manager import RootScreenManager
 from core.dependency_container import DependencyContainer
 
-from core.session import Session
-from controller.app_controller import AppController
-from services.security_service import SecurityService
-from services.user_service import UserService
-from services.field_service import FieldService
-from services.email_service import EmailService
-from services.request_service import RequestService
-from services.cloud_service import CloudService
-
 from core.constant import APPLICATION_NAME
 
 class SharyApp(MDApp):
@@ -26,7 +18,27 @@ class SharyApp(MDApp):
         try_make_base_tables()
     
     def build(self) -> RootScreenManager:
-        session: Session = DependencyContainer.get("session")
+        session = DependencyContainer.get("session")
         self.screen_manager = RootScreenManager(session)
         
         return self.screen_manager
+
+    def on_start(self):
+        startup_profile.mark_next_frame(startup_profile.MARK_FIRST_FRAME)
+
+    def on_stop(self):
+        # Don't leave network or crypto work running after the window closes.
+        # Services never built have nothing to stop
+        for name, stop in (
+                ("task_executor", "shutdown"),
+                ("controller", "close"),
+                ("cloud_service", "close"),
+                ("email_service", "close"),
+                ("field_service", "close"),
+                ("file_catalog", "stop_watching"),
+                ("outbox_service", "close"),
+                ("database", "close_all"),
+                ):
+            service = DependencyContainer.get_if_built(name)
+            if service is not None:
+                getattr(service, stop)()
@@ -0,0 +1,71 @@
+# benchmarks/bench_crypto_pool.py
+"""
+Time the Fields load (decrypt every row) with the crypto pool at several
+worker counts. One worker is the in-process serial path.
+
+Run from the `source` directory:
+    python -m benchmarks.bench_crypto_pool --fields 50000 --workers 1 2 4 8
+
+"cold" includes spawning the workers; "warm" reuses them.
+"""
+
+import argparse
+import sqlite3
+import time
+
+from core.crypto_pool import CryptoPool
+from core.enums import FieldCipher
+from core.functions import try_make_base_tables
+from repositories.field_repository import FieldRepository
+from services.field_service import FieldService
+from services.security_service import SecurityService
+from benchmarks.bench_field_storage import INSERT_RAW_FIELD
+
+
+def make_service(security: SecurityService, conn: sqlite3.Connection, workers: int) -> FieldService:
+    return FieldService(FieldRepository(conn), security, CryptoPool(max_workers=workers, min_rows=0))
+
+def seed(service: FieldService, n_fields: int):
+    rows = service.crypto_pool.seal_rows(
+        [(f"key_{i}", f"value_{i}", f"alias_{i}") for i in range(n_fields)],
+        service._get_data_key(),
+        )
+    service.repo.db_connection.executemany(INSERT_RAW_FIELD, [(*cells, FieldCipher.AES_GCM.value) for cells in rows])
+    service.repo.db_connection.commit()
+
+def time_load(service: FieldService) -> tuple[float, list]:
+    start = time.perf_counter()
+    fields = service._load_all_fields()
+    return time.perf_counter() - start, fields
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    security = SecurityService()
+    security.generate_keys_from_secrets("benchmark-password", "benchmark-user")
+
+    conn = sqlite3.connect(":memory:")
+    try_make_base_tables(conn)
+    seed(make_service(security, conn, 1), args.fields)
+
+    print(f"{'workers':>8} {'cold (s)':>10} {'warm (s)':>10} {'fields/s':>10} {'speedup':>9}")
+    baseline, expected = None, None
+    for workers in args.workers:
+        service = make_service(security, conn, workers)
+        cold, fields = time_load(service)
+        warm, _ = time_load(service)
+        service.close()
+
+        # Same rows, same order, whatever the worker count
+        expected = expected or fields
+        assert fields == expected, "Parallel load returned different rows"
+
+        baseline = baseline or warm
+        print(f"{workers:>8} {cold:10.3f} {warm:10.3f} {args.fields / warm:10.0f} {baseline / warm:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
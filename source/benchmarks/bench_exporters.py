@@ -0,0 +1,67 @@
+# benchmarks/bench_exporters.py
+"""
+Time and peak memory of the field exporters: building the whole document
+as a string vs streaming it chunk by chunk to a file.
+
+Run from the `source` directory:
+    python -m benchmarks.bench_exporters --rows 1000000
+
+Peak memory is traced with tracemalloc, which slows the run down;
+use --no-memory to time only.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from core.constant import FILE_FORMATS
+from core.functions import build_file_from_selected_fields, write_file_from_selected_fields
+
+
+def make_rows(n_rows: int):
+    # Generated lazily, so the rows themselves don't count towards peak memory
+    return ((f"key_{i}", f"value <{i}> & \"quoted\"", "2025-01-01") for i in range(n_rows))
+
+def export_in_memory(n_rows: int, file_format: str, path: str):
+    content = build_file_from_selected_fields(make_rows(n_rows), file_format)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+def export_streaming(n_rows: int, file_format: str, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        write_file_from_selected_fields(make_rows(n_rows), f, file_format)
+
+def measure(func, *args, trace_memory: bool) -> tuple[float, float | None]:
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--formats", nargs="+", default=list(FILE_FORMATS), choices=FILE_FORMATS)
+    parser.add_argument("--no-memory", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'format':<8} {'mode':<10} {'time (s)':>10} {'peak (MiB)':>12} {'size (MiB)':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_format in args.formats:
+            for mode, func in (("in-memory", export_in_memory), ("streaming", export_streaming)):
+                path = os.path.join(tmp_dir, f"export.{file_format}")
+                elapsed, peak = measure(func, args.rows, file_format, path, trace_memory=not args.no_memory)
+                size = os.path.getsize(path) / 2**20
+                peak_text = "-" if peak is None else f"{peak / 2**20:.1f}"
+                print(f"{file_format:<8} {mode:<10} {elapsed:10.2f} {peak_text:>12} {size:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
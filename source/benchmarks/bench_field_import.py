@@ -0,0 +1,81 @@
+# benchmarks/bench_field_import.py
+"""
+Time importing fields one by one (create_field) vs the bulk import path
+(parse + batched encryption + executemany in one transaction).
+
+Run from the `source` directory:
+    python -m benchmarks.bench_field_import --fields 50000
+
+The database is a temporary file in WAL mode, as in the app, so commit
+costs are real. The one-by-one path is slow; --per-row-fields limits it.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from core.constant import FILE_FORMATS
+from core.database import ConnectionManager
+from core.functions import build_file_from_selected_fields, parse_selected_fields, try_make_base_tables
+from repositories.field_repository import FieldRepository
+from services.field_service import FieldService
+from services.security_service import SecurityService
+
+PASSWORD = "Benchmark-Passw0rd!"
+USERNAME = "benchmark-user"
+
+
+def make_service(security: SecurityService, path: str) -> FieldService:
+    db = ConnectionManager(path)
+    try_make_base_tables(db.connection())
+    return FieldService(FieldRepository(db), security)
+
+def make_fields(n_fields: int) -> list[tuple[str, str, str]]:
+    return [(f"key_{i}", f"value_{i}", f"key_{i}") for i in range(n_fields)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, default=50_000)
+    parser.add_argument("--per-row-fields", type=int, default=2_000)
+    parser.add_argument("--formats", nargs="+", default=list(FILE_FORMATS), choices=FILE_FORMATS)
+    args = parser.parse_args()
+
+    security = SecurityService()
+    security.generate_keys_from_secrets(PASSWORD, USERNAME)
+
+    print(f"{'path':<22} {'fields':>8} {'parse (s)':>10} {'store (s)':>10} {'fields/s':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.per_row_fields:
+            service = make_service(security, os.path.join(tmp_dir, "per_row.db"))
+            fields = make_fields(args.per_row_fields)
+            start = time.perf_counter()
+            for key, value, alias_key in fields:
+                service.create_field(key, value, alias_key)
+            elapsed = time.perf_counter() - start
+            print(f"{'create_field loop':<22} {len(fields):>8} {'-':>10} {elapsed:10.2f} {len(fields) / elapsed:10.0f}")
+
+        fields = make_fields(args.fields)
+        for file_format in args.formats:
+            content = build_file_from_selected_fields(fields, file_format)
+            service = make_service(security, os.path.join(tmp_dir, f"bulk_{file_format}.db"))
+
+            start = time.perf_counter()
+            parsed = parse_selected_fields(content, file_format)
+            parsed_at = time.perf_counter()
+            summary = service.import_fields(parsed)
+            stored_at = time.perf_counter()
+
+            assert summary.imported == args.fields, summary
+            print(
+                f"{'import_fields ' + file_format:<22} {summary.imported:>8} {parsed_at - start:10.2f} "
+                f"{stored_at - parsed_at:10.2f} {summary.imported / (stored_at - start):10.0f}"
+                )
+
+        # Re-importing the same file only finds duplicates
+        summary = service.import_fields(parsed)
+        print(f"re-import: {summary.imported} imported, {len(summary.duplicates)} duplicates, {len(summary.conflicts)} conflicts")
+
+
+if __name__ == "__main__":
+    main()
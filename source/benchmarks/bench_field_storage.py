@@ -0,0 +1,81 @@
+# benchmarks/bench_field_storage.py
+"""
+Compare Fields load time for legacy per-cell RSA rows and envelope (AES-GCM) rows.
+
+Run from the `source` directory:
+    python -m benchmarks.bench_field_storage --sizes 1000 10000 100000
+
+Pure-Python RSA decryption is slow, so large RSA sizes take minutes.
+Use --skip-rsa to time only the envelope mode.
+"""
+
+import argparse
+import sqlite3
+import time
+
+from core.enums import FieldCipher
+from core.functions import try_make_base_tables
+from repositories.field_repository import FieldRepository
+from services.field_service import FieldService
+from services.security_service import SecurityService
+
+INSERT_RAW_FIELD = "INSERT INTO fields (`key`, value, alias_key, cipher_version) VALUES (?, ?, ?, ?)"
+
+
+def make_service(security: SecurityService) -> FieldService:
+    conn = sqlite3.connect(":memory:")
+    try_make_base_tables(conn)
+    return FieldService(FieldRepository(conn), security)
+
+def seed_rsa(service: FieldService, n_fields: int):
+    encrypt = service.security_service.encrypt
+    rows = [
+        (encrypt(f"key_{i}".encode()), encrypt(f"value_{i}".encode()), encrypt(f"alias_{i}".encode()), FieldCipher.RSA.value)
+        for i in range(n_fields)
+    ]
+    service.repo.db_connection.executemany(INSERT_RAW_FIELD, rows)
+    service.repo.db_connection.commit()
+
+def seed_envelope(service: FieldService, n_fields: int):
+    rows = [
+        (service._seal_cell(f"key_{i}"), service._seal_cell(f"value_{i}"), service._seal_cell(f"alias_{i}"), FieldCipher.AES_GCM.value)
+        for i in range(n_fields)
+    ]
+    service.repo.db_connection.executemany(INSERT_RAW_FIELD, rows)
+    service.repo.db_connection.commit()
+
+def time_load(service: FieldService) -> float:
+    start = time.perf_counter()
+    fields = service._load_all_fields()
+    elapsed = time.perf_counter() - start
+    assert fields, "No fields loaded"
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--skip-rsa", action="store_true", help="Only time the envelope mode")
+    args = parser.parse_args()
+
+    security = SecurityService()
+    security.generate_keys_from_secrets("benchmark-password", "benchmark-user")
+
+    print(f"{'fields':>10} {'rsa (s)':>12} {'envelope (s)':>14} {'speedup':>9}")
+    for n_fields in args.sizes:
+        rsa_time = None
+        if not args.skip_rsa:
+            service = make_service(security)
+            seed_rsa(service, n_fields)
+            rsa_time = time_load(service)
+
+        service = make_service(security)
+        seed_envelope(service, n_fields)
+        envelope_time = time_load(service)
+
+        rsa_col = f"{rsa_time:12.3f}" if rsa_time is not None else f"{'-':>12}"
+        speedup = f"{rsa_time / envelope_time:8.1f}x" if rsa_time is not None else f"{'-':>9}"
+        print(f"{n_fields:>10} {rsa_col} {envelope_time:14.3f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmarks/bench_import_time.py
+"""
+Cold-start import regression check, from `python -X importtime`.
+
+Imports what main.py imports before the first frame (app.app) in fresh
+interpreters and fails (exit code 1) if:
+  - a module that should load lazily is imported at startup,
+  - the startup cost grows past the baseline plus the tolerance, or
+  - there is no baseline to check against.
+
+Import times depend on the machine, so the cost is measured relative to
+importing the UI framework alone (kivymd.app) in the same run: the ratio
+of the two medians. The committed baseline holds that ratio.
+
+Run from the `source` directory:
+    python -m benchmarks.bench_import_time --runs 5
+    python -m benchmarks.bench_import_time --update   # accept the current ratio as baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+STARTUP_MODULE = "app.app"
+REFERENCE_MODULE = "kivymd.app"
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "import_time_baseline.json")
+DEFAULT_TOLERANCE = 0.2
+
+# Only needed after login, or for a single feature
+LAZY_MODULES = (
+    "requests",
+    "rsa",
+    "Crypto.Protocol.KDF",
+    "pydantic",
+    "yaml",
+    "keyring",
+    "smtplib",
+    "xml.sax.saxutils",
+    "services.cloud_service",
+    "services.email_service",
+    "services.field_service",
+    "services.outbox_service",
+    "screens.fields_screen",
+    "screens.users_screen",
+    "screens.requests_screen",
+    "screens.files_visualizer_screen",
+    "screens.diagnostics_screen",
+)
+
+
+def run_importtime(module: str) -> dict[str, int]:
+    """Cumulative import time (us) of every module imported by `import module` in a fresh interpreter."""
+    env = dict(os.environ, KIVY_NO_ARGS="1", KIVY_NO_FILELOG="1", KIVY_NO_CONSOLELOG="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, check=True,
+        )
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, total, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(total)
+    return cumulative
+
+def load_baseline() -> dict:
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest project modules to list")
+    parser.add_argument("--update", action="store_true", help="Write the current median as the baseline")
+    args = parser.parse_args()
+
+    # Interleaved, so a slower phase of the machine weighs on both
+    runs, reference_runs = [], []
+    for _ in range(args.runs):
+        reference_runs.append(run_importtime(REFERENCE_MODULE)[REFERENCE_MODULE])
+        runs.append(run_importtime(STARTUP_MODULE))
+    median_us = statistics.median(run[STARTUP_MODULE] for run in runs)
+    reference_us = statistics.median(reference_runs)
+    ratio = median_us / reference_us
+    print(f"{STARTUP_MODULE}: median {median_us / 1000:.1f} ms over {args.runs} runs, "
+          f"{ratio:.2f}x {REFERENCE_MODULE} ({reference_us / 1000:.1f} ms)")
+
+    # Where the time goes (third-party modules are counted in their importer)
+    last = runs[-1]
+    project = sorted(
+        ((us, name) for name, us in last.items() if name.split(".")[0] in ("app", "core", "screens", "services", "repositories", "controller")),
+        reverse=True)
+    for us, name in project[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failures = [f"{name} is imported at startup" for name in LAZY_MODULES if name in last]
+
+    baseline = load_baseline()
+    if args.update:
+        baseline = {
+            "module": STARTUP_MODULE,
+            "reference": REFERENCE_MODULE,
+            "ratio": round(ratio, 3),
+            "tolerance": baseline.get("tolerance", DEFAULT_TOLERANCE),
+            }
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"Baseline updated: {ratio:.2f}x {REFERENCE_MODULE}")
+    elif "ratio" in baseline:
+        limit = baseline["ratio"] * (1 + baseline["tolerance"])
+        print(f"Baseline {baseline['ratio']:.2f}x, limit {limit:.2f}x")
+        if ratio > limit:
+            failures.append(f"cold start grew to {ratio:.2f}x {REFERENCE_MODULE} (limit {limit:.2f}x)")
+    else:
+        failures.append(f"no baseline at {BASELINE_PATH}; run with --update to record one")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
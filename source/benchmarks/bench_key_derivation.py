@@ -0,0 +1,60 @@
+# benchmarks/bench_key_derivation.py
+"""
+Time the RSA key pair derivation used at sign-in, before and after caching.
+
+Run from the `source` directory:
+    python -m benchmarks.bench_key_derivation
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from core.security_utils import hash_by_pbkdf2, make_user_salt
+from services.security_service import SecurityService
+
+PASSWORD = "Benchmark-Passw0rd!"
+USERNAME = "benchmark-user"
+
+
+def timed(func, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--key-size", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cache_key = hash_by_pbkdf2(PASSWORD.encode("utf-8"), make_user_salt(USERNAME))
+    security = SecurityService()
+
+    results = {}
+    for i in range(args.repeat):
+        SecurityService.clear_derived_keys()
+        cold = timed(SecurityService._derive_keys, PASSWORD, USERNAME, args.key_size)
+        results.setdefault("derivation (no cache)", []).append(cold)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "keys_cache.bin")
+        keys = SecurityService._derive_keys(PASSWORD, USERNAME, args.key_size)
+        SecurityService._store_cached_keys(keys, cache_key, USERNAME, args.key_size, path)
+        for i in range(args.repeat):
+            disk = timed(SecurityService._load_cached_keys, cache_key, USERNAME, args.key_size, path)
+            results.setdefault("disk cache", []).append(disk)
+
+    security.generate_keys_from_secrets(PASSWORD, USERNAME, args.key_size)
+    for i in range(args.repeat):
+        memory = timed(security.generate_keys_from_secrets, PASSWORD, USERNAME, args.key_size)
+        results.setdefault("memory cache", []).append(memory)
+
+    print(f"{'path':<24} {'best (ms)':>12} {'mean (ms)':>12}")
+    for name, timings in results.items():
+        print(f"{name:<24} {min(timings) * 1000:12.3f} {sum(timings) / len(timings) * 1000:12.3f}")
+
+
+if __name__ == "__main__":
+    main()
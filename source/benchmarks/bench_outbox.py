@@ -0,0 +1,117 @@
+# benchmarks/bench_outbox.py
+"""
+Outbox drill against a flapping stub backend: uploads are made while the
+backend goes up and down, and the outbox must deliver every document
+exactly once.
+
+Run from the `source` directory:
+    python -m benchmarks.bench_outbox --rounds 6 --consumers 5 --flap-period 1.5 --lose-ack-rate 0.2
+
+Each round uploads to every consumer, half a flap period apart, so some
+rounds find the backend down: the first sends fail, the circuit opens and
+the rest are queued without a request. Retries and the circuit's open
+period are scaled down with --backoff-base. Exits with code 1 if a document is lost, stored twice,
+or the outbox isn't drained within --timeout seconds.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.stub_backend import StubBackend
+from core.database import ConnectionManager
+from core.enums import StatusDataSentDb
+from core.functions import try_make_base_tables
+from core.security_utils import hash_message
+from core.session import Session
+from repositories.outbox_repository import OutboxRepository
+from services.cloud_service import CloudService
+from services.outbox_service import OutboxService
+from services.security_service import SecurityService
+
+EMAIL = "benchmark-user@example.com"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=6)
+    parser.add_argument("--consumers", type=int, default=5)
+    parser.add_argument("--flap-period", type=float, default=1.5, help="Seconds up, then as many down")
+    parser.add_argument("--lose-ack-rate", type=float, default=0.2, help="Share of stores answered with 503 anyway")
+    parser.add_argument("--backoff-base", type=float, default=0.2, help="Seconds before the first retry")
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    security = SecurityService()
+    security.generate_keys_from_secrets("benchmark-password", "benchmark-user")
+    session = Session()
+    session.email, session.username = EMAIL, "benchmark-user"
+    session.set_verification_token("benchmark-token")
+
+    backend = StubBackend(flap_period=args.flap_period, lose_ack_rate=args.lose_ack_rate).start()
+    database = ConnectionManager(os.path.join(tempfile.mkdtemp(prefix="shary-outbox-"), "outbox.db"))
+    try_make_base_tables(database.connection())
+
+    cloud = CloudService(session, security, base_endpoint=backend.base_endpoint)
+    cloud.breaker.reset_timeout = args.backoff_base
+    outbox = OutboxService(
+        OutboxRepository(database),
+        cloud,
+        batch_size=args.batch_size,
+        backoff_base=args.backoff_base,
+        backoff_max=args.flap_period * 2,
+        )
+    cloud.outbox = outbox
+
+    # Queuing while offline needs the consumers' public keys cached
+    consumers = [f"consumer_{i}@example.com" for i in range(args.consumers)]
+    backend.forced_up = True
+    for consumer in consumers:
+        cloud.get_user_pubkey(hash_message(consumer))
+    backend.forced_up = None
+    backend.started_at = time.monotonic()
+
+    owner_hash = hash_message(EMAIL)
+    outbox.start(owner_hash)
+    cloud.start_health_checks(args.flap_period / 4)
+    start = time.perf_counter()
+    statuses = Counter()
+    for i in range(args.rounds):
+        results = cloud.upload_data([("round", str(i))], EMAIL, consumers)
+        statuses.update(status.value for status in results.values())
+        time.sleep(args.flap_period / 2)
+
+    while outbox.get_status_counts(owner_hash) and time.perf_counter() - start < args.timeout:
+        time.sleep(0.1)
+    elapsed = time.perf_counter() - start
+    outbox.close()
+    cloud.close()
+    backend.stop()
+
+    expected = args.rounds * args.consumers
+    remaining = outbox.get_status_counts(owner_hash)
+    print(f"Uploads: {expected} ({', '.join(f'{n} {status}' for status, n in sorted(statuses.items()))})")
+    print(f"Stored: {len(backend.payloads)}, duplicates dropped by the backend: {backend.duplicates}")
+    print(f"Requests: {backend.request_counts}")
+    for stats in cloud.get_endpoint_stats():
+        print(f"  {stats['name']:<15} {stats['calls']:>4} calls {stats['errors']:>4} errors  p95 {stats['p95_s'] * 1000:.1f} ms")
+    print(f"Drained in {elapsed:.1f} s, left in the outbox: {remaining or 'none'}")
+
+    failures = []
+    if remaining:
+        failures.append(f"documents left in the outbox: {remaining}")
+    lost = expected - statuses[StatusDataSentDb.ERROR.value] - len(backend.payloads)
+    if lost:
+        failures.append(f"{lost} documents lost")
+    if len({payload["idempotency_key"] for payload in backend.payloads}) != len(backend.payloads):
+        failures.append("documents stored twice")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
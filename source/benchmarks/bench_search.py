@@ -0,0 +1,79 @@
+# benchmarks/bench_search.py
+"""
+Build time and query latency of the trigram search at 100k records.
+
+Users go through UserService (plaintext rows in SQLite). Field keys and
+aliases are indexed directly, as FieldService does from its decrypted
+cache, since encrypting 100k fields would dominate the run.
+
+Run from the `source` directory:
+    python -m benchmarks.bench_search --records 100000
+"""
+
+import argparse
+import random
+import sqlite3
+import string
+import time
+
+from core.functions import try_make_base_tables
+from core.search_index import TrigramIndex
+from repositories.user_repository import UserRepository
+from services.user_service import UserService
+
+INSERT_RAW_USER = "INSERT INTO users (username, email) VALUES (?, ?)"
+FIELD_KEYS = ("email", "phone", "address", "passport", "iban", "birth_date", "nickname", "company", "tax_id", "website")
+FIELD_QUERIES = ("address_4217", "passpo", "iban_1", "adress_42", "bith_date", "ph", "com", "emial", "paspsort")
+USER_QUERIES = ("user_51234", "user_5", "example", "usre_5123", "jo", "@mail")
+
+
+def random_word(rng: random.Random, length: int) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=length))
+
+def make_fields(rng: random.Random, n_records: int):
+    for i in range(n_records):
+        key = f"{FIELD_KEYS[i % len(FIELD_KEYS)]}_{i}"
+        value = f"{random_word(rng, 6)} {random_word(rng, 8)} {rng.randint(0, 99999)}"
+        yield i + 1, (key, key.replace("_", " ")), (key, value, key, "2025-01-01")
+
+def time_queries(search, queries, repeat: int = 5):
+    print(f"  {'query':<14} {'hits':>5} {'ms':>8}  top")
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            rows = search(query)
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        print(f"  {query:<14} {len(rows):>5} {elapsed:8.2f}  {rows[0][0] if rows else '-'}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    # Fields
+    index = TrigramIndex(weights=(1.0, 0.9))
+    start = time.perf_counter()
+    index.sync(make_fields(rng, args.records))
+    print(f"fields: indexed {len(index)} in {time.perf_counter() - start:.2f}s")
+    time_queries(lambda query: [payload for _, _, payload in index.search(query)], FIELD_QUERIES)
+
+    # Users
+    conn = sqlite3.connect(":memory:")
+    try_make_base_tables(conn)
+    conn.executemany(INSERT_RAW_USER, (
+        (f"user_{i}", f"{random_word(rng, 5)}.{i}@{rng.choice(('mail.com', 'example.org', 'corp.net'))}")
+        for i in range(args.records)
+        ))
+    conn.commit()
+
+    service = UserService(UserRepository(conn))
+    start = time.perf_counter()
+    service.search_users("warm-up")
+    print(f"users: indexed {args.records} in {time.perf_counter() - start:.2f}s")
+    time_queries(service.search_users, USER_QUERIES)
+
+
+if __name__ == "__main__":
+    main()
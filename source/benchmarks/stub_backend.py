@@ -0,0 +1,215 @@
+# benchmarks/stub_backend.py
+"""
+Local stand-in for the Shary cloud functions, for benchmarks and manual testing.
+
+Serves the endpoints used by CloudService under the same base path:
+    /ping, /get_pubkey, /store_user, /delete_user, /store_payload, /store_payloads
+
+Payloads whose idempotency key (the `Idempotency-Key` header of
+/store_payload, or an item's `idempotency_key` in /store_payloads) was
+already stored are acknowledged again but not stored twice. The backend can also flap: with `flap_period`,
+it alternates up and down windows of that many seconds (down answers 503 to
+everything), and `lose_ack_rate` stores some payloads but answers 503, as
+when a response is lost on the way back.
+
+Usage:
+    backend = StubBackend(latency=0.05).start()
+    cloud = CloudService(session, security, base_endpoint=backend.base_endpoint)
+    ...
+    backend.stop()
+
+Or standalone from the `source` directory:
+    python -m benchmarks.stub_backend --port 5001 --flap-period 10
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import rsa
+
+from core.constant import BACKEND_APP_ID, NAME_GC_LOCATION_HOST
+from services.security_service import SecurityService
+
+BASE_PATH = f"/{BACKEND_APP_ID}/{NAME_GC_LOCATION_HOST}"
+
+
+class StubBackend():
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 0,
+            latency: float = 0.0,
+            key_size: int = 1024,
+            flap_period: float = 0.0,
+            lose_ack_rate: float = 0.0,
+            ):
+        self.latency = latency
+        self.flap_period = flap_period
+        self.lose_ack_rate = lose_ack_rate
+        self.started_at = time.monotonic()
+        # Forced up (True) or down (False); None follows the flap schedule
+        self.forced_up: bool | None = None
+        self.pubkey_str = SecurityService.make_pubkey_to_string(rsa.newkeys(key_size)[0])
+
+        # Observed traffic
+        self.lock = threading.Lock()
+        self.payloads: list[dict] = []
+        self.idempotency_keys: set[str] = set()
+        self.duplicates = 0
+        self.users: dict[str, str] = {}
+        self.request_counts: dict[str, int] = {}
+
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_endpoint(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{BASE_PATH}"
+
+    def start(self) -> "StubBackend":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True, name="stub-backend")
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def is_up(self) -> bool:
+        if self.forced_up is not None:
+            return self.forced_up
+        if not self.flap_period:
+            return True
+        # Up for the first period, down for the next, and so on
+        return int((time.monotonic() - self.started_at) / self.flap_period) % 2 == 0
+
+    # ----- Request handling -----
+    def handle(self, method: str, path: str, query: dict, body: dict | None, headers: dict | None = None) -> tuple[int, dict]:
+        if self.latency:
+            time.sleep(self.latency)
+
+        endpoint = path[len(BASE_PATH):] if path.startswith(BASE_PATH) else path
+        with self.lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+        if not self.is_up():
+            return 503, {"status": "unavailable"}
+
+        if endpoint == "/ping":
+            return 200, {"status": "ok"}
+
+        if endpoint == "/get_pubkey" and method == "GET":
+            return 200, {"pubkey": self.pubkey_str}
+
+        if endpoint == "/store_user" and method == "POST":
+            owner = (body or {}).get("owner")
+            with self.lock:
+                if owner in self.users:
+                    return 409, {"status": "exists"}
+                self.users[owner] = body.get("pubkey", "")
+            return 200, {"token": f"stub-token-{owner}"}
+
+        if endpoint == "/delete_user" and method == "POST":
+            with self.lock:
+                self.users.pop((body or {}).get("owner"), None)
+            return 200, {"status": "deleted"}
+
+        if endpoint == "/store_payload" and method == "POST":
+            if not body or not all(k in body for k in ("owner", "consumer", "data", "signature")):
+                return 400, {"status": "missing field"}
+            self._store_payload(body, (headers or {}).get("Idempotency-Key"))
+            if self._lose_ack():
+                return 503, {"status": "unavailable"}
+            return 200, {"status": "stored"}
+
+        if endpoint == "/store_payloads" and method == "POST":
+            if not body or not all(k in body for k in ("owner", "items", "root", "signature")):
+                return 400, {"status": "missing field"}
+            results = []
+            for item in body["items"]:
+                result = {"consumer": item.get("consumer"), "status": 200}
+                if "idempotency_key" in item:
+                    result["idempotency_key"] = item["idempotency_key"]
+                if not all(k in item for k in ("consumer", "data", "verification")):
+                    result["status"] = 400
+                else:
+                    self._store_payload({"owner": body["owner"], **item}, item.get("idempotency_key"))
+                results.append(result)
+            if self._lose_ack():
+                return 503, {"status": "unavailable"}
+            return 200, {"results": results}
+
+        return 404, {"status": "not found"}
+
+    def _store_payload(self, payload: dict, key: str | None):
+        with self.lock:
+            if key is not None and key in self.idempotency_keys:
+                self.duplicates += 1
+                return
+            if key is not None:
+                self.idempotency_keys.add(key)
+            self.payloads.append({**payload, "idempotency_key": key})
+
+    def _lose_ack(self) -> bool:
+        return self.lose_ack_rate > 0 and random.random() < self.lose_ack_rate
+
+    def _make_handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def _dispatch(self, method: str):
+                url = urlparse(self.path)
+                body = None
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    body = json.loads(self.rfile.read(length))
+
+                status, payload = backend.handle(method, url.path, parse_qs(url.query), body, self.headers)
+
+                raw = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--flap-period", type=float, default=0.0, help="Seconds up, then as many down, repeatedly (0: always up)")
+    parser.add_argument("--lose-ack-rate", type=float, default=0.0, help="Share of stores answered with 503 anyway")
+    args = parser.parse_args()
+
+    backend = StubBackend(args.host, args.port, args.latency, flap_period=args.flap_period, lose_ack_rate=args.lose_ack_rate).start()
+    print(f"Stub backend listening on {backend.base_endpoint}")
+    try:
+        backend.thread.join()
+    except KeyboardInterrupt:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
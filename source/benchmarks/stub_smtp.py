@@ -0,0 +1,146 @@
+# benchmarks/stub_smtp.py
+"""
+Minimal local SMTP server (plain text, no TLS) standing in for the mail provider.
+
+Accepts any AUTH credentials, refuses recipients whose address contains "refused",
+and can drop the connection every `drop_every` messages to exercise reconnection.
+
+Usage:
+    smtp = StubSmtpServer().start()
+    transport = SmtpTransport(smtp.host, smtp.port, credentials, use_ssl=False)
+    ...
+    smtp.stop()
+
+Or standalone from the `source` directory:
+    python -m benchmarks.stub_smtp --port 1025
+"""
+
+import argparse
+import socketserver
+import threading
+from email import message_from_bytes
+
+
+class StubSmtpServer():
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, drop_every: int = 0):
+        self.drop_every = drop_every
+
+        # Observed traffic
+        self.lock = threading.Lock()
+        self.messages: list[dict] = []
+        self.connections = 0
+        self.logins = 0
+
+        self.server = socketserver.ThreadingTCPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def host(self) -> str:
+        return self.server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self) -> "StubSmtpServer":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True, name="stub-smtp")
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _make_handler(self):
+        smtp = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str):
+                self.wfile.write(f"{line}\r\n".encode("utf-8"))
+
+            def handle(self):
+                with smtp.lock:
+                    smtp.connections += 1
+                sent_here = 0
+                mail_from, rcpt_to = None, []
+
+                self.reply("220 stub-smtp ready")
+                while True:
+                    raw = self.rfile.readline()
+                    if not raw:
+                        return
+                    line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                    command = line.split(" ", 1)[0].upper()
+
+                    if command in ("EHLO", "HELO"):
+                        self.wfile.write(b"250-stub-smtp\r\n250 AUTH PLAIN LOGIN\r\n")
+                    elif command == "AUTH":
+                        parts = line.split()
+                        if parts[1].upper() == "LOGIN" and len(parts) == 2:
+                            self.reply("334 VXNlcm5hbWU6")
+                            self.rfile.readline()
+                            self.reply("334 UGFzc3dvcmQ6")
+                            self.rfile.readline()
+                        elif parts[1].upper() == "LOGIN":
+                            self.reply("334 UGFzc3dvcmQ6")
+                            self.rfile.readline()
+                        with smtp.lock:
+                            smtp.logins += 1
+                        self.reply("235 Authentication successful")
+                    elif command == "MAIL":
+                        mail_from, rcpt_to = line.split(":", 1)[1].strip(), []
+                        self.reply("250 OK")
+                    elif command == "RCPT":
+                        address = line.split(":", 1)[1].strip()
+                        if "refused" in address:
+                            self.reply("550 Mailbox unavailable")
+                        else:
+                            rcpt_to.append(address.strip("<>"))
+                            self.reply("250 OK")
+                    elif command == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = []
+                        while True:
+                            chunk = self.rfile.readline()
+                            if chunk in (b".\r\n", b".\n", b""):
+                                break
+                            data.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                        with smtp.lock:
+                            smtp.messages.append({
+                                "from": mail_from,
+                                "to": rcpt_to,
+                                "message": message_from_bytes(b"".join(data)),
+                            })
+                        self.reply("250 OK queued")
+                        sent_here += 1
+                        if smtp.drop_every and sent_here % smtp.drop_every == 0:
+                            return
+                    elif command in ("RSET", "NOOP"):
+                        self.reply("250 OK")
+                    elif command == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--drop-every", type=int, default=0)
+    args = parser.parse_args()
+
+    smtp = StubSmtpServer(args.host, args.port, args.drop_every).start()
+    print(f"Stub SMTP server listening on {smtp.host}:{smtp.port}")
+    try:
+        smtp.thread.join()
+    except KeyboardInterrupt:
+        smtp.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+# benchmarks/suite.py
+"""
+Benchmark suite over the crypto, storage, export, email and cloud paths,
+with results stored as JSON per commit and compared between commits.
+
+Run from the `source` directory:
+    python -m benchmarks.suite run                      # every group, saved to benchmarks/results/<commit>.json
+    python -m benchmarks.suite run --groups crypto export --quick
+    python -m benchmarks.suite compare 35dcec9 HEAD      # commits (or result file paths); exit code 1 on regressions
+
+Each benchmark is warmed up once, then timed in `--samples` samples of as
+many calls as fit in `--min-time` seconds. A benchmark regresses when its
+median grows past `--threshold` and every new sample is slower than every
+base sample, so noise alone rarely flags one. Compare results from the
+same machine only.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Iterator
+
+from core.constant import DEFAULT_IMPORT_BATCH_SIZE, FILE_FORMATS
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_SAMPLES = 5
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_THRESHOLD = 0.1
+
+PASSWORD = "Benchmark-Passw0rd!"
+USERNAME = "benchmark-user"
+EMAIL = "benchmark-user@example.com"
+
+
+def make_rows(n_rows: int) -> list[tuple[str, str, str]]:
+    return [(f"key_{i}", f"value <{i}> & \"quoted\"", "2025-01-01") for i in range(n_rows)]
+
+def make_security():
+    from services.security_service import SecurityService
+
+    security = SecurityService()
+    security.generate_keys_from_secrets(PASSWORD, USERNAME)
+    return security
+
+def make_session():
+    from core.session import Session
+
+    session = Session()
+    session.email, session.username = EMAIL, USERNAME
+    session.set_verification_token("benchmark-token")
+    return session
+
+
+# ----- Groups -----
+# Each group sets up what its benchmarks share and yields them by name
+
+@contextmanager
+def crypto_group(args) -> Iterator[dict[str, Callable]]:
+    from core.security_utils import make_user_salt
+    from services.security_service import SecurityService
+
+    security = make_security()
+    message = os.urandom(64)
+    ciphertext = security.encrypt(message)
+
+    def generate_keys_from_secrets():
+        # Without the in-process cache, as on a first login
+        SecurityService.clear_derived_keys()
+        security.generate_keys_from_secrets(PASSWORD, USERNAME)
+
+    yield {
+        "security.generate_keys_from_secrets": generate_keys_from_secrets,
+        "security.hash_password": lambda: SecurityService.hash_password(PASSWORD.encode(), make_user_salt(USERNAME)),
+        "security.encrypt": lambda: security.encrypt(message),
+        "security.decrypt": lambda: security.decrypt(ciphertext),
+        "security.sign": lambda: security.sign(message),
+        }
+
+@contextmanager
+def fields_group(args) -> Iterator[dict[str, Callable]]:
+    from core.functions import try_make_base_tables
+    from repositories.field_repository import FieldRepository
+    from services.field_service import FieldService
+
+    security = make_security()
+    services = {}
+    for size in args.field_sizes:
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        try_make_base_tables(conn)
+        service = FieldService(FieldRepository(conn), security)
+        # Stored as the bulk import stores them
+        service.repo.add_fields_bulk(service._seal_field_batches([(key, value) for key, value, _ in make_rows(size)], DEFAULT_IMPORT_BATCH_SIZE))
+        services[size] = service
+
+    def get_all_fields(service):
+        # Every row decrypted, as after login
+        service._field_cache.clear()
+        service.get_all_fields()
+
+    try:
+        yield {f"fields.get_all_fields[{size}]": (lambda service=service: get_all_fields(service)) for size, service in services.items()}
+    finally:
+        for service in services.values():
+            service.close()
+
+@contextmanager
+def export_group(args) -> Iterator[dict[str, Callable]]:
+    from core.functions import build_file_from_selected_fields
+
+    rows = make_rows(args.export_rows)
+    yield {
+        f"export.{file_format}[{args.export_rows}]": (lambda file_format=file_format: build_file_from_selected_fields(rows, file_format))
+        for file_format in FILE_FORMATS
+        }
+
+@contextmanager
+def email_group(args) -> Iterator[dict[str, Callable]]:
+    from services.email_service import EmailService
+
+    # Building a message doesn't connect; the transport is never used
+    email = EmailService(make_session())
+    rows = make_rows(args.export_rows)
+    recipients = [f"consumer_{i}@example.com" for i in range(10)]
+    try:
+        yield {
+            f"email.build_email[{args.export_rows}]": lambda: email._build_email(recipients, "Shary benchmark", rows),
+            }
+    finally:
+        email.close()
+
+@contextmanager
+def cloud_group(args) -> Iterator[dict[str, Callable]]:
+    from benchmarks.stub_backend import StubBackend
+    from services.cloud_service import CloudService
+
+    backend = StubBackend().start()
+    cloud = CloudService(make_session(), make_security(), base_endpoint=backend.base_endpoint)
+    # Each consumer's copy is RSA-encrypted whole, so it must fit one block of the stub's key
+    fields = [("email", EMAIL), ("phone", "+34 600 000 000")]
+    consumers = [f"consumer_{i}@example.com" for i in range(args.consumers)]
+    # Online, as after login
+    cloud.send_ping()
+    try:
+        yield {
+            f"cloud.upload_data[{args.consumers}]": lambda: cloud.upload_data(fields, EMAIL, consumers),
+            }
+    finally:
+        cloud.close()
+        backend.stop()
+
+GROUPS = {
+    "crypto": crypto_group,
+    "fields": fields_group,
+    "export": export_group,
+    "email": email_group,
+    "cloud": cloud_group,
+    }
+
+
+# ----- Running -----
+def measure(func: Callable, samples: int, min_time: float) -> dict:
+    """Seconds per call of `func`: one value per sample, each averaged over `loops` calls."""
+    func()
+
+    # Calls per sample, so fast benchmarks aren't dominated by timer resolution
+    start = time.perf_counter()
+    func()
+    loops = max(1, int(min_time / max(time.perf_counter() - start, 1e-9)))
+
+    values = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(samples):
+            start = time.perf_counter()
+            for _ in range(loops):
+                func()
+            values.append((time.perf_counter() - start) / loops)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {
+        "loops": loops,
+        "values": values,
+        "median": statistics.median(values),
+        "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+        }
+
+def git(*args: str) -> str:
+    """Output of a git command run in this repository, whatever the working directory."""
+    return subprocess.run(["git", *args], capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+
+def get_commit() -> str:
+    """Short hash of HEAD, suffixed with -dirty if the tree has changes."""
+    try:
+        commit = git("rev-parse", "--short", "HEAD")
+        changes = git("status", "--porcelain", "--untracked-files=no")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if changes else commit
+
+def run(args):
+    commit = get_commit()
+    results = {
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "benchmarks": {},
+        }
+
+    print(f"{'benchmark':<40} {'median (ms)':>12} {'stdev':>8} {'loops':>7}")
+    for name in args.groups:
+        with GROUPS[name](args) as benchmarks:
+            for bench_name, func in benchmarks.items():
+                result = measure(func, args.samples, args.min_time)
+                results["benchmarks"][bench_name] = result
+                print(f"{bench_name:<40} {result['median'] * 1000:12.3f} {result['stdev'] / result['median']:7.1%} {result['loops']:>7}")
+
+    path = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+    print(f"Results saved to {path}")
+
+# ----- Comparing -----
+def resolve_results(ref: str) -> str:
+    """Path of a results file, given the path itself or a commit (anything `git rev-parse` accepts)."""
+    if os.path.isfile(ref):
+        return ref
+
+    try:
+        commit = git("rev-parse", "--short", ref)
+    except (OSError, subprocess.CalledProcessError):
+        commit = ref
+    for name in (f"{commit}.json", f"{commit}-dirty.json"):
+        path = os.path.join(RESULTS_DIR, name)
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f"No benchmark results for {ref!r}; run `python -m benchmarks.suite run` on that commit first")
+
+def load_results(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def is_regression(base: dict, new: dict, threshold: float) -> bool:
+    return new["median"] > base["median"] * (1 + threshold) and min(new["values"]) > max(base["values"])
+
+def compare(args) -> int:
+    paths = [resolve_results(ref) for ref in (args.base, args.new)]
+    base, new = [load_results(path) for path in paths]
+    if (base["platform"], base["cpu_count"]) != (new["platform"], new["cpu_count"]):
+        print("Warning: results come from different machines")
+
+    print(f"{'benchmark':<40} {base['commit'] + ' (ms)':>16} {new['commit'] + ' (ms)':>16} {'change':>8}")
+    regressions = []
+    for name in sorted(base["benchmarks"].keys() | new["benchmarks"].keys()):
+        old_result, new_result = base["benchmarks"].get(name), new["benchmarks"].get(name)
+        if old_result is None or new_result is None:
+            print(f"{name:<40} {'only in ' + (base if old_result else new)['commit']:>34}")
+            continue
+
+        change = new_result["median"] / old_result["median"] - 1
+        flag = ""
+        if is_regression(old_result, new_result, args.threshold):
+            flag = "REGRESSION"
+            regressions.append(name)
+        elif is_regression(new_result, old_result, args.threshold):
+            flag = "faster"
+        print(f"{name:<40} {old_result['median'] * 1000:16.3f} {new_result['median'] * 1000:16.3f} {change:+8.1%}  {flag}")
+
+    print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks and save the results as JSON")
+    run_parser.add_argument("--groups", nargs="+", default=list(GROUPS), choices=GROUPS)
+    run_parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    run_parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="Seconds per sample, at least one call")
+    run_parser.add_argument("--field-sizes", type=int, nargs="+", default=[1_000, 10_000])
+    run_parser.add_argument("--export-rows", type=int, default=10_000)
+    run_parser.add_argument("--consumers", type=int, default=10)
+    run_parser.add_argument("--quick", action="store_true", help="Fewer samples and smaller sizes, to check the suite runs")
+    run_parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>.json)")
+
+    compare_parser = commands.add_parser("compare", help="Compare two results; exit code 1 on regressions")
+    compare_parser.add_argument("base", help="Commit or results file")
+    compare_parser.add_argument("new", help="Commit or results file")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Median growth flagged, e.g. 0.1 for 10%%")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        try:
+            sys.exit(compare(args))
+        except FileNotFoundError as e:
+            parser.error(str(e))
+
+    if args.quick:
+        args.samples, args.min_time = 3, 0.05
+        args.field_sizes, args.export_rows = [100, 1_000], 1_000
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,236 @@
 # core/app_controller.py
 
-from services.security_service import SecurityService
-from services.cloud_service import CloudService
-from services.email_service import EmailService
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING
+
 from core.session import Session
+from core.security_utils import hash_message
+from core.task_executor import TaskExecutor, BackgroundTask
+from core.frame_probe import FrameTimeProbe
+from core.constant import FRAME_PROBE_ENABLED, DEFAULT_LOGIN_WORKERS
+
+if TYPE_CHECKING:
+    from services.security_service import SecurityService
+    from services.cloud_service import CloudService
+    from services.email_service import EmailService
+    from services.field_service import FieldService
+    from services.outbox_service import OutboxService
 
 class AppController:
     def __init__(
-            self, 
-            session: Session, 
-            security: SecurityService, 
-            cloud_service: CloudService, 
-            email_service: EmailService, 
+            self,
+            session: Session,
+            security: SecurityService,
+            cloud_service: CloudService,
+            email_service: EmailService,
+            executor: TaskExecutor,
+            field_service: FieldService = None,
+            outbox: OutboxService = None,
             ):
-    
+
         # Services
         self._session = session
         self._security = security
         self._cloud = cloud_service
         self._email = email_service
-    
+        self._fields = field_service
+        self._outbox = outbox
+
+        # Background work (network, crypto) runs here, never on the UI thread
+        self._executor = executor
+
+        # Concurrent steps of a login; kept apart from the executor, where the login itself runs
+        self._login_pool = ThreadPoolExecutor(max_workers=DEFAULT_LOGIN_WORKERS, thread_name_prefix="shary-login")
+
     # ----- inyection getters -----
     def get_security_service(self) -> SecurityService:
         return None or self._security
-    
+
     def get_session(self) -> Session:
         return None or self._session
-    
+
     def get_cloud_service(self) -> CloudService:
         return None or self._cloud
 
     def get_email_service(self) -> EmailService:
         return None or self._email
 
+    def get_executor(self) -> TaskExecutor:
+        return None or self._executor
+
     # ----- Services entrypoints -----
+    # All of them return a BackgroundTask; results and errors are delivered
+    # to the callbacks on the Kivy main thread.
+
+    # Session
+    def login(self, username: str, password: str, on_result=None, on_error=None, on_progress=None) -> BackgroundTask:
+        """Result: (login_succesful, is_registered)."""
+        return self._executor.submit(
+            self._login, username, password,
+            on_result=on_result, on_error=on_error, on_progress=on_progress,
+            pass_task=True, name="login"
+            )
+
+    def logout(self):
+        """End the session: stop pending work and forget credentials, keys and decrypted fields."""
+        self.cancel_all()
+        self._cloud.stop_health_checks()
+        if self._outbox:
+            self._outbox.stop()
+        if self._fields:
+            self._fields.clear_data_key()
+        self._security.clear_keys()
+        self._session.logout()
+
+    def create_owner(self, email: str, username: str, password: str, on_result=None, on_error=None, on_progress=None) -> BackgroundTask:
+        """Result: whether the owner was stored in the cloud."""
+        return self._executor.submit(
+            self._create_owner, email, username, password,
+            on_result=on_result, on_error=on_error, on_progress=on_progress,
+            pass_task=True, name="create_owner"
+            )
+
     # Cloud-service
-    def is_owner_registered(self, owner: str) -> bool:
-        is_registered = self._cloud.is_owner_registered(owner)
-        return is_registered
-    
-    def upload_user(self, owner: str):
-        return self._cloud.upload_user(owner)
-    
-    def delete_user(self, owner: str):
-        return self._cloud.delete_user(owner)
-    
-    def get_pubkey(self, other: str):
-        return self._cloud.get_user_pubkey(other)
-
-    def upload_data(self, rows: list[str], owner: str, consumers: list[str], on_request: bool=False):
-        return self._cloud.upload_data(rows, owner, consumers, on_request)
+    def is_owner_registered(self, owner: str, on_result=None, on_error=None) -> BackgroundTask:
+        return self._executor.submit(self._cloud.is_owner_registered, owner, on_result=on_result, on_error=on_error)
+
+    def upload_user(self, owner: str, on_result=None, on_error=None) -> BackgroundTask:
+        return self._executor.submit(self._cloud.upload_user, owner, on_result=on_result, on_error=on_error)
+
+    def delete_user(self, owner: str, on_result=None, on_error=None) -> BackgroundTask:
+        return self._executor.submit(self._cloud.delete_user, owner, on_result=on_result, on_error=on_error)
+
+    def get_pubkey(self, other: str, on_result=None, on_error=None) -> BackgroundTask:
+        return self._executor.submit(self._cloud.get_user_pubkey, other, on_result=on_result, on_error=on_error)
+
+    def upload_data(self, rows: list[str], owner: str, consumers: list[str], on_request: bool=False, on_result=None, on_error=None) -> BackgroundTask:
+        return self._submit_probed(self._cloud.upload_data, rows, owner, consumers, on_request, on_result=on_result, on_error=on_error)
+
+    def upload_data_batch(self, rows: list[str], owner: str, consumers: list[str], on_request: bool=False, on_result=None, on_error=None) -> BackgroundTask:
+        return self._submit_probed(self._cloud.upload_data_batch, rows, owner, consumers, on_request, on_result=on_result, on_error=on_error)
+
+    # Field-service
+    def create_field(self, key: str, value: str, alias_key: str, on_result=None, on_error=None) -> BackgroundTask:
+        """Result: the new field's id, or None if its key is already stored."""
+        return self._executor.submit(self._fields.create_field, key, value, alias_key, on_result=on_result, on_error=on_error)
+
+    def delete_fields(self, keys: list[tuple[str]], on_result=None, on_error=None) -> BackgroundTask:
+        return self._executor.submit(self._fields.delete_fields, keys, on_result=on_result, on_error=on_error)
 
     # Email-service
-    def send_email_with_fields(self, rows, recipients, filename, file_format):
-        self._email.send_email_with_fields(rows, recipients, filename, file_format)
\ No newline at end of file
+    def send_email_with_fields(self, rows, recipients, filename, file_format="json", on_result=None, on_error=None) -> BackgroundTask | None:
+        # Validation shows its own panels, so it stays on the UI thread
+        payload = self._email.create_payload(rows, recipients, filename, file_format)
+        if not payload:
+            return None
+        return self._executor.submit(self._email.send_from_payload, payload, on_result=on_result, on_error=on_error)
+
+    def send_bulk_email_with_fields(self, rows, recipient_groups, filename, file_format="json", on_result=None, on_error=None) -> BackgroundTask:
+        """Result: recipient -> StatusEmailSent."""
+        return self._executor.submit(
+            self._email.send_bulk, rows, recipient_groups, filename, file_format,
+            on_result=on_result, on_error=on_error
+            )
+
+    def cancel_all(self):
+        self._executor.cancel_all()
+
+    def close(self):
+        self._login_pool.shutdown(wait=False, cancel_futures=True)
+
+    # ----- Background pipelines -----
+    def _login(self, task: BackgroundTask, username: str, password: str) -> tuple[bool, bool]:
+        """
+        The credential check, key derivation and cloud registration check run
+        concurrently, so login takes about as long as the slowest of them. Keys
+        are only derived when no cache can have them, and only kept if the
+        credentials pass; a failed check returns without waiting for the rest.
+        """
+        verified = self._login_pool.submit(self._session.try_login, username, password)
+        reachable = self._login_pool.submit(self._cloud.send_ping)
+        registered = self._login_pool.submit(self._check_registration, verified, reachable)
+        derived = None
+        if not self._security.has_cached_keys(password, username):
+            derived = self._login_pool.submit(self._security.derive_keys, password, username)
+
+        steps = {
+            verified: "Credentials verified",
+            registered: "Cloud registration checked",
+            }
+        if derived:
+            steps[derived] = "Cryptographic keys derived"
+
+        task.report_progress(0.1, "Checking credentials, keys and cloud...")
+        for done, future in enumerate(as_completed(steps), start=1):
+            task.raise_if_cancelled()
+            if future is verified and not verified.result():
+                if derived:
+                    derived.cancel()
+                return False, False
+            task.report_progress(0.1 + 0.8 * done / len(steps), steps[future])
+
+        # Cached keys open with the session key, read by the credential check
+        self._security.generate_keys_from_secrets(
+            password,
+            username,
+            cache_key=self._session.get_encryption_key(),
+            derived_keys=derived.result() if derived else None,
+            )
+
+        # Keep the backend's health current, and send what earlier sessions of this owner left queued
+        self._cloud.start_health_checks()
+        if self._outbox:
+            self._outbox.start(hash_message(self._session.get_email()))
+        return True, registered.result()
+
+    def _check_registration(self, verified: Future, reachable: Future) -> bool:
+        # The owner's email is only known once the credentials are read
+        if not verified.result():
+            return False
+        # The ping opens the connection while credentials are checked. If it
+        # already failed, the lookup would too; otherwise it isn't waited for
+        if reachable.done() and not reachable.result():
+            return False
+        return self._cloud.is_owner_registered(self._session.get_email())
+
+    def _create_owner(self, task: BackgroundTask, email: str, username: str, password: str) -> bool:
+        # Store previously validated user credentials
+        task.report_progress(0.1, "Storing credentials...")
+        self._session.store_cached_credentials()
+
+        task.report_progress(0.3, "Generating cryptographic keys...")
+        self._security.generate_keys_from_secrets(
+            password,
+            username,
+            cache_key=self._session.get_encryption_key()
+            )
+
+        task.report_progress(0.6, "Registering in the cloud...")
+        ok_store, token = self._cloud.upload_user(email) or (False, "")
+        self._session.set_verification_token(token)
+
+        # Store previously generated cryptographic keys
+        task.report_progress(0.9, "Saving signature...")
+        self._security.save_signature(username, email, password)
+        return ok_store
+
+    def _submit_probed(self, func, *args, on_result=None, on_error=None) -> BackgroundTask:
+        """Submit a task, measuring UI frame times while it runs if the probe is enabled."""
+        if not FRAME_PROBE_ENABLED:
+            return self._executor.submit(func, *args, on_result=on_result, on_error=on_error)
+
+        probe = FrameTimeProbe(getattr(func, "__name__", "task")).start()
+
+        def _on_result(result):
+            probe.stop()
+            if on_result:
+                on_result(result)
+
+        def _on_error(error):
+            probe.stop()
+            if on_error:
+                on_error(error)
+
+        return self._executor.submit(func, *args, on_result=_on_result, on_error=_on_error)
@@ -0,0 +1,120 @@
+# core/cache.py
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache():
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None, allow_expired: bool = False) -> Any:
+        """Return a cached value. Expired values are only returned if `allow_expired`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            value, stored_at = entry
+            if not allow_expired and self._is_expired(stored_at):
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any, stored_at: float | None = None):
+        with self._lock:
+            self._entries[key] = (value, time.time() if stored_at is None else stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[0] if entry else default
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def is_fresh(self, stored_at: float) -> bool:
+        return not self._is_expired(stored_at)
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ZeroizingCache():
+    """
+    Thread-safe map of id -> tuple of secret strings. Values are kept as
+    bytearrays so they can be overwritten with zeros when evicted, cleared or
+    when the cache is dropped. Strings handed out by `get` are copies.
+    """
+
+    def __init__(self):
+        self._entries: dict[Hashable, tuple[bytearray, ...]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> tuple[str, ...] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return tuple(cell.decode() for cell in entry)
+
+    def put(self, key: Hashable, cells: tuple[str, ...]):
+        entry = tuple(bytearray(cell.encode()) for cell in cells)
+        with self._lock:
+            old = self._entries.get(key)
+            self._entries[key] = entry
+        if old is not None:
+            self._zeroize(old)
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._zeroize(entry)
+
+    def pop_where(self, index: int, values: set[str]):
+        """Drop the entries whose cell at `index` is one of `values`."""
+        targets = {value.encode() for value in values}
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if bytes(entry[index]) in targets]
+            entries = [self._entries.pop(key) for key in keys]
+        for entry in entries:
+            self._zeroize(entry)
+
+    def clear(self):
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), {}
+        for entry in entries:
+            self._zeroize(entry)
+
+    @staticmethod
+    def _zeroize(entry: tuple[bytearray, ...]):
+        for cell in entry:
+            cell[:] = bytes(len(cell))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __del__(self):
+        self.clear()
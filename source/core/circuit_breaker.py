@@ -0,0 +1,197 @@
+# core/circuit_breaker.py
+"""
+Circuit breaker for a remote backend, with per-endpoint call statistics.
+
+    CLOSED     requests go through; `failure_threshold` failures in a row open it
+    OPEN       requests fail fast with CircuitOpenError for `reset_timeout` seconds
+    HALF_OPEN  one trial request goes through; success closes, failure reopens
+
+A success recorded in any state closes the circuit, so a background health
+probe (start_probing) can close it without a request from the UI waiting on
+a dead backend first.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from core.constant import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_STATS_WINDOW,
+    TIME_CIRCUIT_OPEN,
+    TIME_HEALTH_PROBE_INTERVAL,
+)
+from core.enums import CircuitState
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of making a request while the circuit is open."""
+
+
+class EndpointStats():
+    """Outcome and latency of the last `window` calls to one endpoint, plus running totals."""
+    __slots__ = ("calls", "errors", "last_error", "recent")
+
+    def __init__(self, window: int):
+        self.calls = 0
+        self.errors = 0
+        self.last_error: str | None = None
+        # (succeeded, latency in seconds)
+        self.recent: deque[tuple[bool, float]] = deque(maxlen=window)
+
+    def add(self, succeeded: bool, latency: float, error: str | None = None):
+        self.calls += 1
+        self.recent.append((succeeded, latency))
+        if not succeeded:
+            self.errors += 1
+            self.last_error = error
+
+    def to_dict(self) -> dict:
+        latencies = sorted(latency for _, latency in self.recent)
+        failures = sum(not succeeded for succeeded, _ in self.recent)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": failures / len(self.recent) if self.recent else 0.0,
+            "mean_s": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p95_s": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else 0.0,
+            "last_error": self.last_error,
+        }
+
+
+class CircuitBreaker():
+    def __init__(
+            self,
+            failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout: float = TIME_CIRCUIT_OPEN,
+            window: int = CIRCUIT_STATS_WINDOW,
+            on_state_change: Callable[[CircuitState], None] | None = None,
+            clock: Callable[[], float] = time.monotonic,
+            ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.window = window
+        self.on_state_change = on_state_change
+        self.clock = clock
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._last_success_at = 0.0
+        self._trial_in_flight = False
+        self._stats: dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+        # Each start_probing() gets its own stop event, so a stopped prober
+        # still in a probe can't be revived by the next start
+        self._prober: threading.Thread | None = None
+        self._stop_probing = threading.Event()
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def is_open(self) -> bool:
+        """Whether a request would fail fast now. Doesn't take the half-open trial."""
+        with self._lock:
+            return self._state == CircuitState.OPEN and self.clock() - self._opened_at < self.reset_timeout \
+                or self._state == CircuitState.HALF_OPEN and self._trial_in_flight
+
+    def allow_request(self) -> bool:
+        """Whether a request may be made; once the open period is over, lets one trial through."""
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return True
+
+            if self._state == CircuitState.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                changed = self._set_state(CircuitState.HALF_OPEN)
+            else:
+                changed = None
+                if self._trial_in_flight:
+                    return False
+            self._trial_in_flight = True
+
+        self._notify(changed)
+        return True
+
+    def record_success(self, endpoint: str, latency: float):
+        with self._lock:
+            self._get_stats(endpoint).add(True, latency)
+            self._failures = 0
+            self._trial_in_flight = False
+            self._last_success_at = self.clock()
+            changed = self._set_state(CircuitState.CLOSED)
+        self._notify(changed)
+
+    def record_failure(self, endpoint: str, latency: float, error: str):
+        with self._lock:
+            self._get_stats(endpoint).add(False, latency, error)
+            self._failures += 1
+            self._trial_in_flight = False
+            changed = None
+            if self._state != CircuitState.CLOSED or self._failures >= self.failure_threshold:
+                # Opened again, or still open: the next trial waits a full period
+                self._opened_at = self.clock()
+                changed = self._set_state(CircuitState.OPEN)
+        if changed is not None:
+            logging.warning(f"Circuit opened after {self._failures} failures; last on {endpoint}: {error}")
+        self._notify(changed)
+
+    def get_stats(self) -> list[dict]:
+        """One dict per endpoint (name, calls, errors, error_rate, mean_s, p95_s, last_error)."""
+        with self._lock:
+            return [{"name": endpoint, **stats.to_dict()} for endpoint, stats in self._stats.items()]
+
+    # ----- Health probes -----
+    def start_probing(self, probe: Callable[[], object], interval: float = TIME_HEALTH_PROBE_INTERVAL):
+        """
+        Call `probe` every `interval` seconds on a background thread; it should
+        make a request and record its outcome. Skipped while closed and a call
+        succeeded within the interval.
+        """
+        if self._prober is not None and self._prober.is_alive():
+            return
+
+        stopping = self._stop_probing = threading.Event()
+
+        def run():
+            while not stopping.wait(interval):
+                if self._state == CircuitState.CLOSED and self.clock() - self._last_success_at < interval:
+                    continue
+                try:
+                    probe()
+                except Exception as e:
+                    logging.warning(f"Health probe failed: {e}")
+
+        self._prober = threading.Thread(target=run, name="shary-health-probe", daemon=True)
+        self._prober.start()
+
+    def stop_probing(self):
+        self._stop_probing.set()
+        self._prober = None
+
+    # ----- Internal methods -----
+    def _get_stats(self, endpoint: str) -> EndpointStats:
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = EndpointStats(self.window)
+        return stats
+
+    def _set_state(self, state: CircuitState) -> CircuitState | None:
+        """Change state (lock held); returns the new state if it changed."""
+        if state == self._state:
+            return None
+        self._state = state
+        return state
+
+    def _notify(self, state: CircuitState | None):
+        # Outside the lock, so the callback may use the breaker
+        if state is not None and self.on_state_change is not None:
+            try:
+                self.on_state_change(state)
+            except Exception as e:
+                logging.warning(f"Circuit state callback failed: {e}")
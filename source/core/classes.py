@@ -2,15 +2,9 @@ import logging
 from kivy.uix.screenmanager import ScreenManager
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.screen  import MDScreen
-from kivymd.uix.boxlayout import MDBoxLayout
-from kivymd.uix.datatables import MDDataTable
 from kivymd.app import MDApp
-from kivy.metrics import dp
 
-from core.constant import (
-    DEFAULT_NUM_ROWS_PAGE,
-    DEFAULT_USE_PAGINATION,
-)
+from core.virtual_table import VirtualTable, ListDataSource
 
 class Utils():
     @staticmethod
@@ -43,37 +37,42 @@ class EnhancedTableMDScreen(EnhancedMDScreen):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.main_table = None
-        self.checked_rows = []
+        self.checked_rows = {}  # Primary key -> row, in check order
     
     def on_row_check(self, instance_table, current_row):
         """Manually track checked rows when checkboxes are clicked."""
-        if current_row in self.checked_rows:
-            self.checked_rows.remove(current_row)  # Uncheck → Remove from list
+        pk = current_row[instance_table.pk_index]
+        if pk in self.checked_rows:
+            del self.checked_rows[pk]  # Uncheck → Remove from selection
         else:
-            self.checked_rows.append(current_row)  # Check → Add to list
+            self.checked_rows[pk] = tuple(current_row)  # Check → Add to selection
         #logging.debug(f"Manually Tracked Checked Rows: {len(self.checked_rows)}")
 
     def _get_checked_rows(self) -> list[str]:
         # Avoid copy by reference
-        return [] or self.checked_rows
+        return list(self.checked_rows.values())
     
+    def _is_checked_row(self, row) -> bool:
+        return row[self.main_table.pk_index] in self.checked_rows
+
     def _clear_checked_rows(self):
         self.checked_rows.clear()
+        if self.main_table:
+            self.main_table.refresh_view()
 
     def _delete_rows(self) -> list[str]:
         checked_rows = self._get_checked_rows()
-        if checked_rows is None:
-            return
+        if not checked_rows:
+            return []
         
         rows_pk_keys = []
         for checked_row in checked_rows:
-            logging.info(f"Row removed from table: {checked_row}")
-            self.main_table.remove_row(tuple(checked_row))
-
-            rows_pk_key = self._get_checked_cell(checked_row, 0, True)
+            rows_pk_key = self._get_checked_cell(checked_row, self.main_table.pk_index, True)
             rows_pk_keys.append(rows_pk_key)
         
+        self.main_table.remove_rows(set(self.checked_rows))
         self._clear_checked_rows()
+        logging.info(f"{len(rows_pk_keys)} rows removed from table.")
 
         return rows_pk_keys
     
@@ -92,19 +91,29 @@ class EnhancedTableMDScreen(EnhancedMDScreen):
     def _add_row(self, row_data):
         self.main_table.add_row(row_data)
     
-    def _initialize_table(self, column_data, row_data=[]):
+    def _refresh_table(self):
+        if self.main_table:
+            self.main_table.refresh()
+
+    def _clear_table(self):
+        """Drop the table and its cached rows; the next load builds a new one."""
+        if self.main_table:
+            self.ids.table_container.remove_widget(self.main_table)
+            self.main_table = None
+        self.checked_rows.clear()
+
+    def _initialize_table(self, column_data, row_data=[], data_source=None, executor=None):
         if self.main_table:
             return
         
-        self.main_table = MDDataTable(
+        # Rows are pulled from the data source as they scroll into view (on the executor, if given)
+        self.main_table = VirtualTable(
+            column_data=column_data,
+            data_source=data_source or ListDataSource(row_data),
+            is_checked=self._is_checked_row,
+            executor=executor,
             size_hint=(1, 0.8),
             pos_hint={"center_x": 0.5, "center_y": 0.5},  # Ensure centering
-            check=True,
-            column_data=column_data,
-            row_data=row_data,
-            use_pagination=DEFAULT_USE_PAGINATION,
-            rows_num=DEFAULT_NUM_ROWS_PAGE,
-            pagination_menu_height=dp(300),  # Set dropdown menu height
         )
 
         # Bind checkbox selection event
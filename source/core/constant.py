@@ -12,9 +12,34 @@ DEFAULT_ROW_REST_WIDTH = 50
 DEFAULT_ROW_VALUE_WIDTH = 200
 DEFAULT_USE_PAGINATION = False
 DEFAULT_SECRET_LENGTH = 16
+DEFAULT_DATA_KEY_LENGTH = 32
+DEFAULT_EXPORT_CHUNK_ROWS = 1000
+DEFAULT_IMPORT_BATCH_SIZE = 1000
+DEFAULT_SQL_IN_CHUNK_SIZE = 500  # Parameters per IN (...) query, below SQLite's variable limit
+DEFAULT_SEARCH_LIMIT = 50
+SEARCH_MIN_COVERAGE = 0.4  # Share of query trigrams a fuzzy match must contain
+SEARCH_MAX_CANDIDATES = 500  # Documents scored per query, by number of shared trigrams
+SEARCH_TYPO_MIN_CHARS = 4  # Shorter queries aren't matched within one edit
 
 # Time values
 TIME_DOCUMENT_ALIVE = 24 * 60 * 60 # 3600s
+TIME_PUBKEY_CACHE_ALIVE = 60 * 60 # 3600s
+TIME_SMTP_IDLE_ALIVE = 4 * 60 # 240s, below typical server idle disconnects
+TIME_FILE_CATALOG_POLL = 2 # seconds
+TIME_OUTBOX_BACKOFF_BASE = 5 # seconds before the first retry, doubled per attempt
+TIME_OUTBOX_BACKOFF_MAX = 15 * 60 # 900s
+TIME_CIRCUIT_OPEN = 30 # seconds failing fast before a trial request
+TIME_HEALTH_PROBE_INTERVAL = 15 # seconds
+
+# Cache sizes
+PUBKEY_CACHE_MAX_SIZE = 1024
+VIRTUAL_TABLE_BLOCK_ROWS = 100
+VIRTUAL_TABLE_CACHE_BLOCKS = 20
+FILE_CACHE_MAX_FILES = 16
+FILE_SUMMARY_MAX_KEYS = 20
+FILE_STREAM_MIN_BYTES = 8 * 1024 * 1024  # Larger downloads are streamed, not loaded whole
+FILE_READ_CHUNK_BYTES = 1024 * 1024
+FILE_INDEX_STRIDE_ROWS = VIRTUAL_TABLE_BLOCK_ROWS  # Fields between indexed offsets of a streamed file, one table block
 
 # Formats
 FIELD_HEADERS = ("key", "value", "creation_date")
@@ -24,11 +49,14 @@ USER_HEADERS = ("username", "email", "creation_date")
 # Names
 SCREEN_NAME_FIELDS = "fields"
 SCREEN_NAME_FILES_VISUALIZER = "files_visualizer"
+SCREEN_NAME_DIAGNOSTICS = "diagnostics"
 SCREEN_NAME_LOGIN = "login"
 SCREEN_NAME_REQUESTS = "requests"
 SCREEN_NAME_USERS = "users"
 SCREEN_NAME_USER_CREATION = "user_creation"
 APPLICATION_NAME = "Shary"
+DATA_KEY_NAME_FIELDS = "fields"
+INDEX_KEY_LABEL_FIELD_KEYS = b"shary.fields.key_index"  # Derives the field key index key from the data key
 
 # Networks (HTTP, SMTP, ...)
 SMTP_SERVER = "smtp.gmail.com"
@@ -39,6 +67,31 @@ NAME_GC_LOCATION_HOST = "us-central1"
 COLLECTION_SHARE_NAME = "sharing"
 SMTP_SSL_PORT = 465
 SMTP_TLS_PORT = 587
+DEFAULT_SMTP_POOL_SIZE = 2
+DEFAULT_SMTP_TIMEOUT = 30  # seconds
+DEFAULT_HTTP_TIMEOUT = 10  # seconds
+DEFAULT_HEALTH_PROBE_TIMEOUT = 3  # seconds
+CIRCUIT_FAILURE_THRESHOLD = 3  # Failed requests in a row that open the circuit
+CIRCUIT_STATS_WINDOW = 50  # Recent calls per endpoint behind error rates and latencies
+DEFAULT_UPLOAD_WORKERS = 8
+DEFAULT_UPLOAD_BATCH_SIZE = 100
+DEFAULT_OUTBOX_MAX_IN_FLIGHT = 2  # Outbox batches sent at once
+DEFAULT_OUTBOX_MAX_ATTEMPTS = 10  # Then the queued send is marked failed
+
+# Background work
+DEFAULT_TASK_WORKERS = 4
+DEFAULT_LOGIN_WORKERS = 4  # Credential check, key derivation, cloud ping and lookup
+FRAME_TIME_BUDGET_MS = 50
+CRYPTO_POOL_WORKERS = None  # One process per core
+CRYPTO_POOL_MIN_ROWS = 2000  # Smaller inputs are decrypted in-process
+CRYPTO_POOL_BATCH_ROWS = 500
+
+# Database
+DB_JOURNAL_MODE = "WAL"
+DB_SYNCHRONOUS = "NORMAL"  # Durable with WAL, without an fsync per commit
+DB_CACHE_SIZE_KB = 16 * 1024
+DB_MMAP_SIZE = 256 * 1024 * 1024
+DB_BUSY_TIMEOUT = 10  # seconds
 
 # Paths
 PATH_DB = "./shary_demo.db"
@@ -46,6 +99,7 @@ PATH_PRIVATE_KEY = "./data/authentication/private_key.pem"
 PATH_PUBLIC_KEY = "./data/authentication/public_key.pem"
 PATH_SECRET_KEY = "./data/authentication/secret.txt"
 PATH_AUTH_SIGNATURE = "./data/authentication/auth_signature.json"
+PATH_KEYS_CACHE = "./data/authentication/keys_cache.bin"
 PATH_ENV_VARIABLES = "./data/authentication/.env"
 
 # Constants for KV file paths
@@ -60,19 +114,30 @@ PATH_SCHEMA_SEND_EMAIL_DIALOG = "./ui_layouts/send_email_dialog.kv"
 PATH_SCHEMA_SELECT_CHANNEL_DIALOG = "./ui_layouts/select_channel_dialog.kv"
 PATH_SCHEMA_USER_DIALOG = "./ui_layouts/user_dialog.kv"
 PATH_SCHEMA_REQUEST_DIALOG = "./ui_layouts/request_dialog.kv"
+PATH_SCHEMA_DIAGNOSTICS = "./ui_layouts/diagnostics.kv"
 
 # For data directories
 PATH_DATA_AUTHENTICATION = "./data/authentication"
 PATH_DATA_DOWNLOAD = "./data/download"
 PATH_CREDENTIALS = "./data/authentication"
 PATH_FILE_CREDENTIALS = "./data/authentication/.credentials"
+PATH_TRACING_EXPORT = "./data/diagnostics/timings.json"
 
-KV_PATHS_OTHERS = [
-    PATH_SCHEMA_FIELD,
-    PATH_SCHEMA_USER,
-    PATH_SCHEMA_REQUEST,
-    PATH_SCHEMA_FILE_VISUALIZER
-]
+# KV files compiled when their screen is first shown, dialogs included
+KV_PATHS_BY_SCREEN = {
+    SCREEN_NAME_LOGIN: [PATH_SCHEMA_LOGIN],
+    SCREEN_NAME_USER_CREATION: [PATH_SCHEMA_USER_CREATION],
+    SCREEN_NAME_FIELDS: [
+        PATH_SCHEMA_FIELD,
+        PATH_SCHEMA_FIELD_DIALOG,
+        PATH_SCHEMA_SEND_EMAIL_DIALOG,
+        PATH_SCHEMA_SELECT_CHANNEL_DIALOG,
+    ],
+    SCREEN_NAME_USERS: [PATH_SCHEMA_USER, PATH_SCHEMA_USER_DIALOG],
+    SCREEN_NAME_REQUESTS: [PATH_SCHEMA_REQUEST, PATH_SCHEMA_REQUEST_DIALOG, PATH_SCHEMA_SEND_EMAIL_DIALOG],
+    SCREEN_NAME_FILES_VISUALIZER: [PATH_SCHEMA_FILE_VISUALIZER],
+    SCREEN_NAME_DIAGNOSTICS: [PATH_SCHEMA_DIAGNOSTICS],
+}
 
 # Predefined messages
 MSG_DEFAULT_SEND_FILENAME = "shary_fields_from_"
@@ -80,4 +145,7 @@ MSG_DEFAULT_REQUEST_FILENAME = "shary_fields_request_from_"
 MSG_DELETION_WARNING = "Are you sure you want to delete these fields?\n"
 
 # Debug and Testing
-CONTINUE_FOR_TESTING = True
\ No newline at end of file
+CONTINUE_FOR_TESTING = True
+FRAME_PROBE_ENABLED = False
+TRACING_ENABLED = False  # Operation timings (core.tracing); also switchable from the diagnostics screen
+TRACING_NUM_BUCKETS = 32  # Power-of-two microsecond buckets, the last one up to ~36 min
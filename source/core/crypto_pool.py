@@ -0,0 +1,194 @@
+# core/crypto_pool.py
+
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, Iterator
+
+import rsa
+from rsa.key import PrivateKey
+
+from core.constant import (
+    CRYPTO_POOL_WORKERS,
+    CRYPTO_POOL_MIN_ROWS,
+    CRYPTO_POOL_BATCH_ROWS,
+)
+from core.enums import FieldCipher
+from core.security_utils import aes_gcm_encrypt, aes_gcm_decrypt
+
+# Errors meaning worker processes can't be used here (e.g. no sem_open on some mobile builds)
+POOL_UNAVAILABLE_ERRORS = (BrokenProcessPool, OSError, ImportError, NotImplementedError)
+
+
+# ----- Cell crypto (run in workers, or in-process as the serial fallback) -----
+def open_rows(rows: Iterable[tuple[tuple[bytes, ...], int]], data_key: bytes, private_key: PrivateKey | None = None) -> list[tuple[str, ...]]:
+    """Decrypt (cells, cipher_version) rows into tuples of strings."""
+    opened = []
+    for cells, cipher_version in rows:
+        if cipher_version == FieldCipher.AES_GCM.value:
+            opened.append(tuple(aes_gcm_decrypt(data_key, cell).decode() for cell in cells))
+        else:
+            if private_key is None:
+                raise ValueError("Private key not loaded.")
+            opened.append(tuple(rsa.decrypt(cell, private_key).decode() for cell in cells))
+    return opened
+
+def seal_rows(rows: Iterable[tuple[str, ...]], data_key: bytes) -> list[tuple[bytes, ...]]:
+    """Encrypt rows of strings with AES-GCM, cell by cell."""
+    return [tuple(aes_gcm_encrypt(data_key, cell.encode()) for cell in row) for row in rows]
+
+
+# ----- Worker process state -----
+# Keys arrive once through the pool initializer and live only in the worker's memory
+_worker_data_key: bytes | None = None
+_worker_private_key: PrivateKey | None = None
+
+def _init_worker(data_key: bytes, private_key_der: bytes | None):
+    global _worker_data_key, _worker_private_key
+    _worker_data_key = data_key
+    _worker_private_key = PrivateKey.load_pkcs1(private_key_der, "DER") if private_key_der else None
+
+def _open_batch(rows: list) -> list[tuple[str, ...]]:
+    return open_rows(rows, _worker_data_key, _worker_private_key)
+
+def _seal_batch(rows: list) -> list[tuple[bytes, ...]]:
+    return seal_rows(rows, _worker_data_key)
+
+
+class CryptoPool():
+    """
+    Spreads cell encryption/decryption over worker processes, batch by batch,
+    and returns results in input order. Inputs under `min_rows`, single-core
+    machines and platforms without process support run in-process instead.
+
+    Workers are spawned (not forked), so they hold the keys they were given and
+    nothing else from the app. The private key is only handed over while legacy
+    RSA rows are being read; the pool is restarted when the keys change.
+    """
+
+    def __init__(
+            self,
+            max_workers: int | None = CRYPTO_POOL_WORKERS,
+            min_rows: int = CRYPTO_POOL_MIN_ROWS,
+            batch_rows: int = CRYPTO_POOL_BATCH_ROWS,
+            ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_rows = min_rows
+        self.batch_rows = batch_rows
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_keys: tuple | None = None
+        self._disabled = self.max_workers < 2
+
+    # ----- Public API -----
+    def open_rows(self, rows: list[tuple[tuple[bytes, ...], int]], data_key: bytes, private_key: PrivateKey | None = None) -> list[tuple[str, ...]]:
+        """Decrypt (cells, cipher_version) rows, in order. RSA rows need `private_key`."""
+        if not self._use_pool(len(rows)):
+            return open_rows(rows, data_key, private_key)
+
+        if not any(cipher_version != FieldCipher.AES_GCM.value for _, cipher_version in rows):
+            private_key = None
+
+        batches = [rows[i:i + self.batch_rows] for i in range(0, len(rows), self.batch_rows)]
+        opened = []
+        for batch in self._map_ordered(
+                _open_batch,
+                lambda batch: open_rows(batch, data_key, private_key),
+                batches,
+                data_key,
+                private_key):
+            opened.extend(batch)
+        return opened
+
+    def seal_rows(self, rows: list[tuple[str, ...]], data_key: bytes) -> list[tuple[bytes, ...]]:
+        """Encrypt rows of strings, in order."""
+        if not self._use_pool(len(rows)):
+            return seal_rows(rows, data_key)
+
+        batches = [rows[i:i + self.batch_rows] for i in range(0, len(rows), self.batch_rows)]
+        sealed = []
+        for batch in self.seal_batches(batches, data_key, len(rows)):
+            sealed.extend(batch)
+        return sealed
+
+    def seal_batches(self, batches: Iterable[list[tuple[str, ...]]], data_key: bytes, num_rows: int | None = None) -> Iterator[list[tuple[bytes, ...]]]:
+        """Encrypt a stream of batches, yielding each sealed batch in input order. `num_rows` is the total, if known."""
+        if self._disabled or (num_rows is not None and num_rows < self.min_rows):
+            for batch in batches:
+                yield seal_rows(batch, data_key)
+            return
+
+        yield from self._map_ordered(
+            _seal_batch,
+            lambda batch: seal_rows(batch, data_key),
+            batches,
+            data_key,
+            None)
+
+    def close(self):
+        """Stop the workers; their copies of the keys go away with them."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._executor_keys = None
+
+    # ----- Internals -----
+    def _use_pool(self, num_rows: int) -> bool:
+        return not self._disabled and num_rows >= self.min_rows
+
+    def _get_executor(self, data_key: bytes, private_key: PrivateKey | None) -> ProcessPoolExecutor:
+        keys = (data_key, private_key)
+        if self._executor is not None and self._executor_keys == keys:
+            return self._executor
+
+        self.close()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(data_key, private_key.save_pkcs1("DER") if private_key else None),
+            )
+        self._executor_keys = keys
+        logging.debug(f"Crypto pool started with {self.max_workers} workers")
+        return self._executor
+
+    def _map_ordered(
+            self,
+            worker_func: Callable[[list], list],
+            serial_func: Callable[[list], list],
+            batches: Iterable[list],
+            data_key: bytes,
+            private_key: PrivateKey | None,
+            ) -> Iterator[list]:
+        """
+        Yield worker_func(batch) for each batch, in order, with at most two
+        batches per worker in flight so memory stays bounded. If the pool
+        can't be used, the remaining batches run through serial_func.
+        """
+        batches = iter(batches)
+        pending: deque[tuple[list, Future]] = deque()
+        try:
+            executor = self._get_executor(data_key, private_key)
+            for batch in batches:
+                pending.append((batch, executor.submit(worker_func, batch)))
+                if len(pending) >= 2 * self.max_workers:
+                    result = pending[0][1].result()
+                    pending.popleft()
+                    yield result
+            while pending:
+                result = pending[0][1].result()
+                pending.popleft()
+                yield result
+        except POOL_UNAVAILABLE_ERRORS as e:
+            logging.warning(f"Crypto pool unavailable, continuing in-process: {e}")
+            self.close()
+            self._disabled = True
+
+            # Redo from the first batch not handed back yet
+            for batch, _ in pending:
+                yield serial_func(batch)
+            for batch in batches:
+                yield serial_func(batch)
@@ -0,0 +1,118 @@
+# core/database.py
+
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from core.constant import (
+    PATH_DB,
+    DB_JOURNAL_MODE,
+    DB_SYNCHRONOUS,
+    DB_CACHE_SIZE_KB,
+    DB_MMAP_SIZE,
+    DB_BUSY_TIMEOUT,
+)
+
+
+class ConnectionManager():
+    """
+    One SQLite connection per thread over a shared database file, set up
+    with WAL journaling so readers and a writer don't block each other.
+    Busy writers wait up to `busy_timeout` instead of failing with
+    "database is locked".
+    """
+    _default: "ConnectionManager | None" = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+            self,
+            path: str = PATH_DB,
+            journal_mode: str = DB_JOURNAL_MODE,
+            synchronous: str = DB_SYNCHRONOUS,
+            cache_size_kb: int = DB_CACHE_SIZE_KB,
+            mmap_size: int = DB_MMAP_SIZE,
+            busy_timeout: float = DB_BUSY_TIMEOUT,
+            ):
+        self.path = path
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.busy_timeout = busy_timeout
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[tuple[threading.Thread, sqlite3.Connection]] = []
+
+    @classmethod
+    def default(cls) -> "ConnectionManager":
+        """Process-wide manager for PATH_DB."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def connection(self) -> sqlite3.Connection:
+        """Connection owned by the calling thread, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction taking the write lock upfront; commits or rolls back as a whole."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+
+    def close(self):
+        """Close the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+
+        self._local.conn = None
+        with self._lock:
+            self._connections = [(t, c) for t, c in self._connections if c is not conn]
+        conn.close()
+
+    def close_all(self):
+        """Close every connection (on app exit, once workers are done)."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for _, conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread is off only so close_all can run from the main thread;
+        # each connection is still used by its owner thread alone
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kb}")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+
+        with self._lock:
+            # Drop connections left behind by finished threads
+            alive = []
+            for thread, other in self._connections:
+                if thread.is_alive():
+                    alive.append((thread, other))
+                else:
+                    other.close()
+            alive.append((threading.current_thread(), conn))
+            self._connections = alive
+
+        logging.debug(f"SQLite connection opened for thread {threading.current_thread().name}")
+        return conn
@@ -1,59 +1,150 @@
 # core/dependency_container.py
 
+import threading
+
+
+class LazyService():
+    """
+    Stands in for a container service until it is first used, so objects
+    built early (controller, screens) can hold services that are only
+    needed later without building them, or importing their modules, yet.
+    """
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(DependencyContainer.get(self._name), attr)
+
+    def __repr__(self):
+        return f"LazyService({self._name!r})"
+
+
 class DependencyContainer:
     _services = {}
+    _providers = {}
+    _lock = threading.RLock()
 
     @classmethod
     def register(cls, name, instance):
         cls._services[name] = instance
 
+    @classmethod
+    def register_provider(cls, name, provider):
+        """Register how to build a service; it is built on the first get()."""
+        cls._providers[name] = provider
+
     @classmethod
     def get(cls, name):
-        return cls._services[name]
+        service = cls._services.get(name)
+        if service is not None:
+            return service
+
+        # Providers may get() their own dependencies, from any thread
+        with cls._lock:
+            if name not in cls._services:
+                cls._services[name] = cls._providers[name]()
+            return cls._services[name]
+
+    @classmethod
+    def get_if_built(cls, name):
+        """The service if it was already built, else None (e.g. nothing to close)."""
+        return cls._services.get(name)
+
+    @classmethod
+    def lazy(cls, name) -> LazyService:
+        return LazyService(name)
 
     @classmethod
     def init_all(cls):
-        from core.session import Session
-
-        from services.security_service import SecurityService
-        from services.cloud_service import CloudService
-        from services.field_service import FieldService
-        
-        from services.user_service import UserService
-        from services.request_service import RequestService
-        from services.email_service import EmailService
-
-        from repositories.user_repository import UserRepository
-        from repositories.field_repository import FieldRepository
-        from repositories.request_repository import RequestRepository
-        
-        from controller.app_controller import AppController
+        """Register the providers of every service. Nothing is built, or imported, until first requested."""
+
+        # Database (one connection per thread, shared by all repositories)
+        def database():
+            from core.database import ConnectionManager
+            return ConnectionManager.default()
 
         # Security
-        security = SecurityService()
+        def security_service():
+            from services.security_service import SecurityService
+            return SecurityService()
 
-        # Session
-        session = Session(security)
-        cls.register("session", session)
+        # Session (keys are first needed at login, not to show the login screen)
+        def session():
+            from core.session import Session
+            return Session(cls.lazy("security_service"))
 
         # Repository Services
-        field = FieldService(FieldRepository(), security)
-        user = UserService(UserRepository())
-        request = RequestService(RequestRepository())
+        def field_service():
+            from services.field_service import FieldService
+            from repositories.field_repository import FieldRepository
+            return FieldService(FieldRepository(cls.get("database")), cls.get("security_service"))
 
-        cls.register("field_service", field)
-        cls.register("user_service", user)
-        cls.register("request_service", request)
+        def user_service():
+            from services.user_service import UserService
+            from repositories.user_repository import UserRepository
+            return UserService(UserRepository(cls.get("database")))
+
+        def request_service():
+            from services.request_service import RequestService
+            from repositories.request_repository import RequestRepository
+            return RequestService(RequestRepository(cls.get("database")))
 
         # Action Services
-        cloud = CloudService(security)
-        email = EmailService(session)
-
-        cls.register("security_service", security)
-        cls.register("cloud_service", cloud)
-        cls.register("email_service", email)
-        
-        # Controller
-        controller: AppController = AppController(session, security, cloud, email)
-        
-        cls.register("controller", controller)
+        def cloud_service():
+            from services.cloud_service import CloudService
+            from repositories.pubkey_repository import PubkeyRepository
+            return CloudService(
+                cls.get("session"),
+                cls.get("security_service"),
+                pubkey_repository=PubkeyRepository(cls.get("database")),
+                outbox=cls.lazy("outbox_service"),
+                )
+
+        # Failed cloud uploads, retried in the background while logged in
+        def outbox_service():
+            from services.outbox_service import OutboxService
+            from repositories.outbox_repository import OutboxRepository
+            return OutboxService(OutboxRepository(cls.get("database")), cls.lazy("cloud_service"))
+
+        def email_service():
+            from services.email_service import EmailService
+            return EmailService(cls.get("session"))
+
+        # Downloaded files
+        def file_catalog():
+            from core.file_catalog import FileCatalog
+            return FileCatalog()
+
+        # Background tasks
+        def task_executor():
+            from core.task_executor import TaskExecutor
+            return TaskExecutor()
+
+        # Controller (services other than the session are first needed after the login screen shows)
+        def controller():
+            from controller.app_controller import AppController
+            return AppController(
+                cls.get("session"),
+                cls.lazy("security_service"),
+                cls.lazy("cloud_service"),
+                cls.lazy("email_service"),
+                cls.get("task_executor"),
+                cls.lazy("field_service"),
+                cls.lazy("outbox_service"),
+                )
+
+        for provider in (
+                database,
+                security_service,
+                session,
+                field_service,
+                user_service,
+                request_service,
+                cloud_service,
+                outbox_service,
+                email_service,
+                file_catalog,
+                task_executor,
+                controller,
+                ):
+            cls.register_provider(provider.__name__, provider)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional
 from pydantic import BaseModel
 
 class BaseDTO(BaseModel):
@@ -22,3 +22,26 @@ class OwnerDTO(BaseDTO):
     username: str | None
     email: str | None
     safe_password: str | None
+
+class PageDTO(BaseModel):
+    rows: List[Any]
+    total: Optional[int] = None  # Filtered row count, only when asked for (a full count per page)
+    next_cursor: Optional[int] = None  # id of the last row; None when there are no more rows
+
+class ImportSummaryDTO(BaseModel):
+    total: int = 0
+    imported: int = 0
+    overwritten: int = 0
+    invalid: int = 0
+    duplicates: List[str] = []  # Repeated in the input, or already stored with the same value
+    conflicts: List[str] = []  # Already stored with a different value (kept unless overwriting)
+
+class DownloadedFileDTO(BaseModel):
+    filename: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    n_fields: int = 0
+    keys: List[str] = []  # First keys of "data", as a preview
+    error: Optional[str] = None  # Set when the file couldn't be parsed
+    row_offsets: List[int] = []  # Byte offset of every FILE_INDEX_STRIDE_ROWS-th field, for streamed files
@@ -5,6 +5,26 @@ class StatusDataSentDb(Enum):
     EXISTS = "EXISTS"
     MISSING_FIELD = "MISSING_FIELD"
     ERROR = "ERROR"
+    QUEUED = "QUEUED"  # Kept in the outbox, sent when the backend is reachable
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"  # Requests fail fast
+    HALF_OPEN = "half_open"  # One trial request decides
+
+class OutboxStatus(Enum):
+    PENDING = "pending"
+    FAILED = "failed"  # Rejected by the backend, or out of attempts
+    EXPIRED = "expired"  # The document expired before it could be sent
+
+class StatusEmailSent(Enum):
+    SENT = "SENT"
+    REFUSED = "REFUSED"
+    ERROR = "ERROR"
+
+class FieldCipher(Enum):
+    RSA = 0       # Legacy per-cell RSA encryption
+    AES_GCM = 1   # Envelope encryption: RSA-wrapped data key + AES-GCM rows
 
 class DataType(Enum):
     # Basic Numeric Types
@@ -0,0 +1,375 @@
+# core/file_catalog.py
+
+import codecs
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, BinaryIO, Callable, Iterator
+
+from core.cache import TTLCache
+from core.dtos import DownloadedFileDTO
+from core.constant import (
+    PATH_DATA_DOWNLOAD,
+    FILE_CACHE_MAX_FILES,
+    FILE_STREAM_MIN_BYTES,
+    FILE_READ_CHUNK_BYTES,
+    FILE_SUMMARY_MAX_KEYS,
+    FILE_INDEX_STRIDE_ROWS,
+    TIME_FILE_CATALOG_POLL,
+)
+
+_DECODER = json.JSONDecoder()
+# Characters a JSON number can go on with ("12." may be the start of "12.5")
+_NUMBER_CHARS = "0123456789+-.eE"
+
+
+# ----- Streaming JSON -----
+class _JsonStreamReader():
+    """
+    Reads a UTF-8 JSON document one value at a time from a binary file,
+    keeping only the unread part of the current chunk in memory.
+    object_items() yields each key; the caller must consume its value
+    (value() or object_items()) before the next one. `key_offset` is the byte
+    offset the last key was read from, where members() can resume reading on
+    a file seeked there (with `offset` set to it).
+    """
+    def __init__(self, file: BinaryIO, chunk_chars: int = FILE_READ_CHUNK_BYTES, offset: int = 0):
+        self.file = file
+        self.chunk_chars = chunk_chars
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.key_offset = offset
+
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        # Byte offset of buffer[_mark] in the file; moved forward by tell()
+        self._mark = 0
+        self._mark_offset = offset
+
+    def object_items(self) -> Iterator[str]:
+        if self._next_char() != "{":
+            raise ValueError("Expected a JSON object")
+        if self._next_char() == "}":
+            return
+        self.pos -= 1
+        yield from self.members()
+
+    def members(self) -> Iterator[str]:
+        """Keys from the current position, inside an object, to the end of it."""
+        while True:
+            self.key_offset = self.tell()
+            key = self.value()
+            if not isinstance(key, str) or self._next_char() != ":":
+                raise ValueError("Malformed JSON object")
+            yield key
+
+            separator = self._next_char()
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError("Malformed JSON object")
+
+    def value(self) -> Any:
+        if not self._next_char():
+            raise ValueError("Unexpected end of JSON")
+        self.pos -= 1
+
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+                # A value reaching the end of the buffer may be cut, so read on
+                if self.eof or not self._may_continue(value, end):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def tell(self) -> int:
+        """Byte offset in the file of the next unread character."""
+        # Encoded from the previous mark on, so each character is counted once
+        self._mark_offset += len(self.buffer[self._mark:self.pos].encode("utf-8"))
+        self._mark = self.pos
+        return self._mark_offset
+
+    def _may_continue(self, value: Any, end: int) -> bool:
+        if end == len(self.buffer):
+            return True
+        # A number cut in its fraction or exponent decodes to its first part ("12." as 12)
+        is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+        return is_number and not self.buffer[end:].lstrip(_NUMBER_CHARS)
+
+    def _next_char(self) -> str:
+        """Consume and return the next non-blank character ("" at the end)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                self.pos += 1
+                return self.buffer[self.pos - 1]
+            if not self._fill():
+                return ""
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        # Grow reads with the pending value, so huge values aren't re-parsed chunk by chunk
+        raw = self.file.read(max(self.chunk_chars, len(self.buffer) - self.pos))
+        if not raw:
+            self.eof = True
+            self._decoder.decode(b"", final=True)
+            return False
+
+        # The read part is dropped, so its byte length is counted first
+        self.tell()
+        self.buffer = self.buffer[self.pos:] + self._decoder.decode(raw)
+        self.pos = self._mark = 0
+        return True
+
+def iter_json_fields(file: BinaryIO, member: str = "data") -> Iterator[tuple[str, Any]]:
+    """Stream the (key, value) pairs of the top-level `member` object without loading the whole document."""
+    reader = _JsonStreamReader(file)
+    for key in reader.object_items():
+        if key == member:
+            for field_key in reader.object_items():
+                yield field_key, reader.value()
+        else:
+            reader.value()
+
+def index_json_fields(file: BinaryIO, stride: int = FILE_INDEX_STRIDE_ROWS, member: str = "data") -> tuple[int, list[str], list[int]]:
+    """
+    Count the fields of the top-level `member` object in one streamed pass.
+    Returns the count, the first keys and the byte offset of every
+    `stride`-th field, to read from with read_json_fields_at().
+    """
+    reader = _JsonStreamReader(file)
+    n_fields, keys, offsets = 0, [], []
+    for key in reader.object_items():
+        if key != member:
+            reader.value()
+            continue
+        for field_key in reader.object_items():
+            if n_fields % stride == 0:
+                offsets.append(reader.key_offset)
+            if n_fields < FILE_SUMMARY_MAX_KEYS:
+                keys.append(field_key)
+            reader.value()
+            n_fields += 1
+    return n_fields, keys, offsets
+
+def read_json_fields_at(file: BinaryIO, offset: int, chunk_chars: int = FILE_READ_CHUNK_BYTES) -> Iterator[tuple[str, Any]]:
+    """Stream (key, value) pairs from a field offset found by index_json_fields() to the end of its object."""
+    file.seek(offset)
+    reader = _JsonStreamReader(file, chunk_chars, offset)
+    for key in reader.members():
+        yield key, reader.value()
+
+
+# ----- Catalog -----
+class FileCatalog():
+    """
+    Index of the downloaded JSON files: size, mtime, content hash and a
+    summary of their keys. scan() only re-reads files whose size or mtime
+    changed. Parsed rows are kept in an LRU cache keyed by content hash;
+    files over `stream_min_bytes` are never held whole: scan() streams them
+    once to index field offsets, and read_rows() parses only the page asked for.
+    """
+
+    def __init__(
+            self,
+            directory: str = PATH_DATA_DOWNLOAD,
+            cache_size: int = FILE_CACHE_MAX_FILES,
+            stream_min_bytes: int = FILE_STREAM_MIN_BYTES,
+            ):
+        self.directory = directory
+        self.stream_min_bytes = stream_min_bytes
+
+        self._entries: dict[str, DownloadedFileDTO] = {}
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._rows_cache = TTLCache(max_size=cache_size)
+
+        # Each start_watching() gets its own stop event, so a stopped watcher
+        # still in scan() can't be revived by the next start
+        self._watcher: threading.Thread | None = None
+        self._stop_watching = threading.Event()
+
+    # ----- Index -----
+    def scan(self) -> bool:
+        """Bring the index up to date. Returns whether any file was added, changed or removed."""
+        with self._scan_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            stats = {}
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        stat = entry.stat()
+                        stats[entry.name] = (stat.st_size, stat.st_mtime_ns)
+
+            with self._lock:
+                current = dict(self._entries)
+
+            removed = current.keys() - stats.keys()
+            updated = {}
+            for filename, (size, mtime_ns) in stats.items():
+                old = current.get(filename)
+                if old and old.size == size and old.mtime_ns == mtime_ns:
+                    continue
+                updated[filename] = self._index_file(filename, size, mtime_ns)
+
+            if not removed and not updated:
+                return False
+
+            with self._lock:
+                for filename in removed:
+                    del self._entries[filename]
+                self._entries.update(updated)
+
+            logging.debug(f"File catalog: {len(updated)} files indexed, {len(removed)} removed")
+            return True
+
+    def files(self) -> list[str]:
+        with self._lock:
+            return sorted(self._entries)
+
+    def get(self, filename: str) -> DownloadedFileDTO | None:
+        with self._lock:
+            return self._entries.get(filename)
+
+    def get_current(self, filename: str) -> DownloadedFileDTO:
+        """The file's entry, re-indexed first if the file changed since."""
+        entry = self.get(filename)
+        if entry is None or self._is_stale(entry):
+            self.scan()
+            entry = self.get(filename)
+            if entry is None:
+                raise FileNotFoundError(filename)
+        return entry
+
+    def is_streamed(self, entry: DownloadedFileDTO) -> bool:
+        """Whether the file is read page by page (read_rows) rather than loaded whole."""
+        return entry.size >= self.stream_min_bytes
+
+    # ----- Content -----
+    def get_rows(self, filename: str) -> list[tuple[str, str]]:
+        """Every (key, value) row of the file's "data" object, parsed once per content version."""
+        entry = self.get_current(filename)
+
+        rows = self._rows_cache.get(entry.sha256)
+        if rows is None:
+            rows = list(self.iter_rows(filename))
+            if entry.size < self.stream_min_bytes:
+                self._rows_cache.put(entry.sha256, rows)
+        return rows
+
+    def read_rows(self, filename: str, offset: int, limit: int) -> list[tuple[str, str]]:
+        """
+        Rows `offset` to `offset + limit` of the file. Large files are parsed
+        from the nearest indexed field on, never whole.
+        """
+        entry = self.get_current(filename)
+        if not self.is_streamed(entry):
+            return self.get_rows(filename)[offset:offset + limit]
+        if offset >= entry.n_fields or not entry.row_offsets:
+            return []
+
+        block, skip = divmod(offset, FILE_INDEX_STRIDE_ROWS)
+        rows = []
+        try:
+            with open(os.path.join(self.directory, filename), "rb") as f:
+                for i, (key, value) in enumerate(read_json_fields_at(f, entry.row_offsets[block])):
+                    if i < skip:
+                        continue
+                    rows.append((key, str(value)))
+                    if len(rows) == limit:
+                        break
+        except (OSError, ValueError) as e:
+            logging.warning(f"File catalog: cannot read {filename}: {e}")
+        return rows
+
+    def iter_rows(self, filename: str) -> Iterator[tuple[str, str]]:
+        path = os.path.join(self.directory, filename)
+        if os.path.getsize(path) >= self.stream_min_bytes:
+            with open(path, "rb") as f:
+                for key, value in iter_json_fields(f):
+                    yield key, str(value)
+            return
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f).get("data", {})
+        for key, value in data.items():
+            yield key, str(value)
+
+    # ----- Watching -----
+    def start_watching(self, on_change: Callable[[], None], interval: float = TIME_FILE_CATALOG_POLL):
+        """
+        Scan now and then every `interval` seconds on a background thread,
+        calling `on_change` (from that thread) when the index changed.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+
+        stopping = self._stop_watching = threading.Event()
+
+        def watch():
+            while True:
+                try:
+                    if self.scan() and not stopping.is_set():
+                        on_change()
+                except OSError as e:
+                    logging.warning(f"File catalog scan failed: {e}")
+                if stopping.wait(interval):
+                    return
+
+        self._watcher = threading.Thread(target=watch, name="shary-file-catalog", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_watching.set()
+        self._watcher = None
+
+    # ----- Internal methods -----
+    def _is_stale(self, entry: DownloadedFileDTO) -> bool:
+        try:
+            stat = os.stat(os.path.join(self.directory, entry.filename))
+        except FileNotFoundError:
+            return True
+        return (stat.st_size, stat.st_mtime_ns) != (entry.size, entry.mtime_ns)
+
+    def _index_file(self, filename: str, size: int, mtime_ns: int) -> DownloadedFileDTO:
+        path = os.path.join(self.directory, filename)
+        entry = DownloadedFileDTO(filename=filename, size=size, mtime_ns=mtime_ns, sha256="")
+        try:
+            if size < self.stream_min_bytes:
+                with open(path, "rb") as f:
+                    content = f.read()
+                entry.sha256 = hashlib.sha256(content).hexdigest()
+                data = json.loads(content).get("data", {})
+                # Parsed anyway, so the first open of the file is free
+                self._rows_cache.put(entry.sha256, [(key, str(value)) for key, value in data.items()])
+                n_fields, keys = len(data), list(data)
+            else:
+                entry.sha256 = self._hash_file(path)
+                # Offsets rather than rows, so pages are read without parsing the whole file
+                with open(path, "rb") as f:
+                    n_fields, keys, entry.row_offsets = index_json_fields(f)
+        except (OSError, ValueError, AttributeError) as e:
+            # Unreadable, not JSON or not an object; likely still being written
+            logging.warning(f"File catalog: cannot parse {filename}: {e}")
+            entry.error = str(e)
+            return entry
+
+        entry.n_fields = n_fields
+        entry.keys = keys[:FILE_SUMMARY_MAX_KEYS]
+        return entry
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(FILE_READ_CHUNK_BYTES):
+                digest.update(chunk)
+        return digest.hexdigest()
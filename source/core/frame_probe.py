@@ -0,0 +1,51 @@
+# core/frame_probe.py
+
+import logging
+import time
+
+from kivy.clock import Clock
+
+from core.constant import FRAME_TIME_BUDGET_MS
+
+
+class FrameTimeProbe():
+    """Measures the time between rendered frames while it is running."""
+
+    def __init__(self, name: str = "frames", budget_ms: float = FRAME_TIME_BUDGET_MS):
+        self.name = name
+        self.budget_ms = budget_ms
+        self.frame_times_ms: list[float] = []
+        self._last = None
+        self._event = None
+
+    def start(self) -> "FrameTimeProbe":
+        self.frame_times_ms.clear()
+        self._last = time.perf_counter()
+        self._event = Clock.schedule_interval(self._on_frame, 0)
+        return self
+
+    def stop(self) -> dict[str, float]:
+        if self._event:
+            self._event.cancel()
+            self._event = None
+
+        report = self.report()
+        logging.info(
+            f"[FrameTimeProbe] {self.name}: {report['frames']} frames, "
+            f"max {report['max_ms']:.1f} ms, {report['over_budget']} over {self.budget_ms:.0f} ms"
+            )
+        return report
+
+    def report(self) -> dict[str, float]:
+        frames = self.frame_times_ms
+        return {
+            "frames": len(frames),
+            "max_ms": max(frames, default=0.0),
+            "mean_ms": sum(frames) / len(frames) if frames else 0.0,
+            "over_budget": sum(1 for t in frames if t > self.budget_ms),
+        }
+
+    def _on_frame(self, _dt):
+        now = time.perf_counter()
+        self.frame_times_ms.append((now - self._last) * 1000)
+        self._last = now
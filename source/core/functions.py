@@ -3,13 +3,11 @@ import sys
 import re
 import json
 import csv
-import yaml
-import xml.etree.ElementTree as ET
 from io import StringIO
-from typing import Any
+from itertools import islice
+from typing import Any, Iterable, Iterator, TextIO
 import logging
 
-import keyring
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.label import Label
@@ -18,11 +16,15 @@ from kivy.uix.popup import Popup
 from core.constant import (
     BACKEND_HOST,
     BACKEND_PORT,
-    PATH_DATA_DOWNLOAD
+    PATH_DATA_DOWNLOAD,
+    DEFAULT_EXPORT_CHUNK_ROWS
 )
 
 BACKEND_ENDPOINT = f"http://{BACKEND_HOST}:{BACKEND_PORT}/shary-21b61/us-central1"
 
+# Exporters (yaml, xml and keyring are imported where used, off the startup path)
+XML_ATTRIBUTE_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
 
 def resource_path(relative_path):
     """ Get absolute path to resource (handles PyInstaller build and dev run) """
@@ -37,6 +39,8 @@ def is_dir_empty(path: str):
     return os.path.isdir(path) and len(os.listdir(path)) == 0
 
 def load_user_credentials():
+    import keyring
+
     sender_email = keyring.get_password("shary_app", "owner_email")  # Replace with your email
     sender_password = "ugtt iggn nnni dchj"  # Replace with your app password
     
@@ -51,27 +55,66 @@ def build_file_from_selected_fields(
         rows: list[str], 
         file_format: str="json"
         ) -> (str | dict[str, str] | Any | None):
+    chunks = iter_file_from_selected_fields(rows, file_format)
+    if chunks is None:
+        return None
+    return "".join(chunks)
+
+def write_file_from_selected_fields(
+        rows: Iterable,
+        file: TextIO,
+        file_format: str="json"
+        ) -> bool:
+    """ Write selected fields to a file-like object, chunk by chunk. """
+    chunks = iter_file_from_selected_fields(rows, file_format)
+    if chunks is None:
+        return False
+
+    for chunk in chunks:
+        file.write(chunk)
+    return True
+
+def iter_file_from_selected_fields(
+        rows: Iterable,
+        file_format: str="json",
+        chunk_rows: int=DEFAULT_EXPORT_CHUNK_ROWS
+        ) -> Iterator[str] | None:
+    """
+    Stream selected fields as text chunks of `chunk_rows` rows each.
+    `rows` may be any iterable (e.g. a DB cursor), so memory stays flat.
+    """
     if file_format == "json":
-        return get_selected_fields_as_json(rows)
+        return iter_selected_fields_as_json(rows, chunk_rows)
     elif file_format == "csv":
-        return get_selected_fields_as_csv(rows)
+        return iter_selected_fields_as_csv(rows, chunk_rows)
     elif file_format == "xml":
-        return get_selected_fields_as_xml(rows)
+        return iter_selected_fields_as_xml(rows, chunk_rows)
     elif file_format == "yaml":
-        return get_selected_fields_as_yaml(rows)
+        return iter_selected_fields_as_yaml(rows, chunk_rows)
     else:
         return None
 
+def iter_chunks(rows: Iterable, chunk_rows: int=DEFAULT_EXPORT_CHUNK_ROWS) -> Iterator[list]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, chunk_rows)):
+        yield chunk
+
 def get_selected_fields_as_json(rows, as_dict=False) -> (str | dict):
     """ Get selected fields as a JSON dictionary. """
-    json_fields = {}
-    
-    for key, value, *_ in rows:
-        json_fields[key] = value
-    
     if as_dict:
-        return json_fields
-    return json.dumps(json_fields, indent=4)
+        return {key: value for key, value, *_ in rows}
+    return "".join(iter_selected_fields_as_json(rows))
+
+def iter_selected_fields_as_json(rows: Iterable, chunk_rows: int=DEFAULT_EXPORT_CHUNK_ROWS) -> Iterator[str]:
+    """ Same output as json.dumps(fields, indent=4), one chunk at a time. """
+    separator = "{\n"
+    for chunk in iter_chunks(rows, chunk_rows):
+        yield separator + ",\n".join(
+            f"    {json.dumps(key)}: {json.dumps(value)}" for key, value, *_ in chunk
+            )
+        separator = ",\n"
+
+    yield "{}" if separator == "{\n" else "\n}"
 
 def get_selected_fields_as_req_json(rows: list[str], sender: str, as_dict=False) -> (str | dict[str, str]):
     """ Get fields as a JSON with request format. """
@@ -89,37 +132,106 @@ def get_selected_fields_as_req_json(rows: list[str], sender: str, as_dict=False)
 
 def get_selected_fields_as_csv(rows: list[str]) -> Any:
     """ Get selected fields as a CSV string. """
+    return "".join(iter_selected_fields_as_csv(rows))
+
+def iter_selected_fields_as_csv(rows: Iterable, chunk_rows: int=DEFAULT_EXPORT_CHUNK_ROWS) -> Iterator[str]:
     output = StringIO()
     writer = csv.writer(output)
-    
+
     # Writing header
     writer.writerow(["Key", "Value"])
 
-    for key, value, *_ in rows:
-        writer.writerow([key, value])
+    for chunk in iter_chunks(rows, chunk_rows):
+        writer.writerows([key, value] for key, value, *_ in chunk)
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
 
-    return output.getvalue()
+    # Header only, no rows
+    if output.tell():
+        yield output.getvalue()
 
 def get_selected_fields_as_xml(rows: list[str]) -> str:
     """ Get selected fields as an XML string. """
-    root = ET.Element("Fields")
+    return "".join(iter_selected_fields_as_xml(rows))
 
-    for key, value, *_ in rows:
-        field_element = ET.SubElement(root, "Field", key=key)
-        field_element.text = value
+def iter_selected_fields_as_xml(rows: Iterable, chunk_rows: int=DEFAULT_EXPORT_CHUNK_ROWS) -> Iterator[str]:
+    """ Same output as ElementTree's tostring, without building the tree. """
+    from xml.sax.saxutils import escape
 
-    return ET.tostring(root, encoding="utf-8").decode("utf-8")
+    opened = False
+    for chunk in iter_chunks(rows, chunk_rows):
+        elements = "".join(
+            f'<Field key="{escape(key, XML_ATTRIBUTE_ENTITIES)}">{escape(value)}</Field>'
+            for key, value, *_ in chunk
+            )
+        yield elements if opened else "<Fields>" + elements
+        opened = True
+
+    yield "</Fields>" if opened else "<Fields />"
 
 def get_selected_fields_as_yaml(rows: list[str]) -> str:
     """ Get selected fields as a YAML dictionary. """
-    yaml_fields = {}
-    
-    for key, value, *_ in rows:
-        yaml_fields[key] = value
+    return "".join(iter_selected_fields_as_yaml(rows))
+
+def iter_selected_fields_as_yaml(rows: Iterable, chunk_rows: int=DEFAULT_EXPORT_CHUNK_ROWS) -> Iterator[str]:
+    """ Consecutive block mappings concatenate into one mapping. Keys keep row order. """
+    import yaml
+
+    has_rows = False
+    for chunk in iter_chunks(rows, chunk_rows):
+        has_rows = True
+        yield yaml.dump({key: value for key, value, *_ in chunk},
+                        Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+                        default_flow_style=False,
+                        allow_unicode=True,
+                        sort_keys=False)
+
+    if not has_rows:
+        yield "{}\n"
+
+def read_file_of_selected_fields(path: str) -> list[tuple[str, str]] | None:
+    """ Read a fields file exported by Shary; the format comes from the extension. """
+    file_format = os.path.splitext(path)[1].lstrip(".").lower()
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_selected_fields(f.read(), file_format)
+
+def parse_selected_fields(content: str, file_format: str="json") -> list[tuple[str, str]] | None:
+    """ Inverse of build_file_from_selected_fields: (key, value) pairs in file order. """
+    if file_format == "json":
+        return parse_selected_fields_from_json(content)
+    elif file_format == "csv":
+        return parse_selected_fields_from_csv(content)
+    elif file_format == "xml":
+        return parse_selected_fields_from_xml(content)
+    elif file_format in ("yaml", "yml"):
+        return parse_selected_fields_from_yaml(content)
+    else:
+        return None
+
+def parse_selected_fields_from_json(content: str) -> list[tuple[str, str]]:
+    # Keep repeated keys, so they can be reported as duplicates
+    pairs = json.loads(content, object_pairs_hook=list)
+    return [(str(key), str(value)) for key, value in pairs]
+
+def parse_selected_fields_from_csv(content: str) -> list[tuple[str, str]]:
+    reader = csv.reader(StringIO(content))
+    header = next(reader, None)
+    if header is None:
+        return []
+    return [(row[0], row[1] if len(row) > 1 else "") for row in reader if row]
+
+def parse_selected_fields_from_xml(content: str) -> list[tuple[str, str]]:
+    import xml.etree.ElementTree as ET
 
-    return yaml.dump(yaml_fields, 
-                     default_flow_style=False,
-                     allow_unicode=True)
+    root = ET.fromstring(content)
+    return [(field.get("key", ""), field.text or "") for field in root.iter("Field")]
+
+def parse_selected_fields_from_yaml(content: str) -> list[tuple[str, str]]:
+    import yaml
+
+    fields = yaml.load(content, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
+    return [(str(key), str(value)) for key, value in fields.items()]
 
 def parsed_fields_as_vertical_string(rows: list[str]) -> str:
     keys_values = []
@@ -138,51 +250,114 @@ def parsed_keys_as_vertical_string(rows) -> str:
 
 def try_make_base_tables(conn=None):
     if conn is None:
-        from sqlite3 import Connection
+        from core.database import ConnectionManager
+
+        conn = ConnectionManager.default().connection()
+    
+    # dates are ISO8601 strings ("YYYY-MM-DD HH:MM:SS.SSS").
+
+    # Create fields table
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fields (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key VARCHAR(256) UNIQUE NOT NULL,
+            value TEXT,
+            alias_key VARCHAR(256),
+            date_added TEXT DEFAULT (DATE('now')),
+            cipher_version INTEGER DEFAULT 0
+        );
+        """
+        )
+    # Create users table
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username VARCHAR(256) NOT NULL,
+            email VARCHAR(256) UNIQUE NOT NULL,
+            phone_number INTEGER,
+            phone_extension INTEGER,
+            date_added TEXT DEFAULT (DATE('now'))
+        );
+        """
+        )
+    # Create requests table
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            receivers VARCHAR NOT NULL,
+            keys VARCHAR NOT NULL,
+            date_added TEXT DEFAULT (DATE('now'))
+        );
+        """
+        )
+    # Create data keys table (RSA-wrapped symmetric keys)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS data_keys (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(64) UNIQUE NOT NULL,
+            wrapped_key BLOB NOT NULL,
+            date_added TEXT DEFAULT (DATE('now'))
+        );
+        """
+        )
+
+    # Create public keys cache table
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pubkeys (
+            owner_hash VARCHAR(64) PRIMARY KEY,
+            pubkey TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        );
+        """
+        )
+
+    # Create outbox table (signed, encrypted payloads waiting to be sent)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key VARCHAR(32) UNIQUE NOT NULL,
+            owner_hash VARCHAR(64) NOT NULL,
+            payload TEXT NOT NULL,
+            status VARCHAR(16) NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            last_error TEXT,
+            date_added TEXT DEFAULT (DATE('now'))
+        );
+        """
+        )
+
+    # Migrate tables created by older versions
+    try_add_column(conn, "fields", "cipher_version", "INTEGER DEFAULT 0")
+    # HMAC of the plaintext key, to find rows by key without decrypting them.
+    # Filled in on insert, and for older rows by FieldService after login.
+    try_add_column(conn, "fields", "key_index", "BLOB")
+
+    # Indexes backing the paginated and filtered queries
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fields_date_added ON fields (date_added, id);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fields_key_index ON fields (key_index);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users (username);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_date_added ON users (date_added, id);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (owner_hash, status, next_attempt_at);")
         
-        conn = Connection("shary_demo.db")
-        conn.cursor()
-        # dates are ISO8601 strings ("YYYY-MM-DD HH:MM:SS.SSS").
-
-        # Create fields table
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS fields (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                key VARCHAR(256) UNIQUE NOT NULL,
-                value TEXT,
-                alias_key VARCHAR(256),
-                date_added TEXT DEFAULT (DATE('now'))
-            );
-            """
-            )
-        # Create users table
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username VARCHAR(256) NOT NULL,
-                email VARCHAR(256) UNIQUE NOT NULL,
-                phone_number INTEGER,
-                phone_extension INTEGER,
-                date_added TEXT DEFAULT (DATE('now'))
-            );
-            """
-            )
-        # Create requests table
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                receivers VARCHAR NOT NULL,
-                keys VARCHAR NOT NULL,
-                date_added TEXT DEFAULT (DATE('now'))
-            );
-            """
-            )
-            
-        conn.commit()
-        conn.close()
+    conn.commit()
+
+def try_add_column(conn, table: str, column: str, definition: str) -> bool:
+    """Add a column to an existing table if it is missing."""
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    if column in columns:
+        return False
+    
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    logging.info(f"Column '{column}' added to table '{table}'")
+    return True
 
 def information_panel(panel_name, message):
     return_layout = BoxLayout(orientation="vertical", spacing=10, padding=10)
@@ -245,7 +420,7 @@ def validate_email_syntax(email: str) -> str | None:
     if email.startswith("@"):
         return False, "Unexpected email format: starts with @."
     
-    logging.debug(f"Email syntax validated: '{email}'")
+    logging.debug("Email syntax validated")
     return True, ""
     
     #re.search("^\w+@\w[.]{1}\w")
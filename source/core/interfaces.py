@@ -10,11 +10,11 @@ class IFieldRepository(ABC):
         pass
     
     @abstractmethod
-    def delete_field(self, key: str) -> None:
+    def delete_field(self, key_index: bytes) -> None:
         pass
     
     @abstractmethod
-    def delete_fields(self, keys: List[str]) -> None:
+    def delete_fields(self, key_indexes: List[bytes]) -> None:
         pass
     
     @abstractmethod
@@ -45,4 +45,50 @@ class IUserRepository(ABC):
     
     @abstractmethod
     def load_users_from_db(self) -> List[UserDTO]:
-        pass
\ No newline at end of file
+        pass
+
+class IPubkeyRepository(ABC):
+    @abstractmethod
+    def load_pubkey(self, owner_hash: str) -> tuple[str, float] | None:
+        pass
+    
+    @abstractmethod
+    def store_pubkey(self, owner_hash: str, pubkey: str, fetched_at: float) -> None:
+        pass
+    
+    @abstractmethod
+    def delete_pubkey(self, owner_hash: str) -> None:
+        pass
+
+class IOutboxRepository(ABC):
+    @abstractmethod
+    def add_items(self, rows: list[tuple[str, str, str, float, float]]) -> int:
+        pass
+    
+    @abstractmethod
+    def load_due_items(self, owner_hash: str, now: float, limit: int) -> list[tuple[int, str, int]]:
+        pass
+    
+    @abstractmethod
+    def load_next_attempt_at(self, owner_hash: str) -> float | None:
+        pass
+    
+    @abstractmethod
+    def count_items_by_status(self, owner_hash: str) -> dict[str, int]:
+        pass
+    
+    @abstractmethod
+    def update_items(self, rows: list[tuple[str, int, float, str | None, int]]) -> None:
+        pass
+    
+    @abstractmethod
+    def make_items_due(self, owner_hash: str, now: float) -> int:
+        pass
+    
+    @abstractmethod
+    def delete_items(self, ids: list[int]) -> None:
+        pass
+    
+    @abstractmethod
+    def expire_items(self, now: float) -> int:
+        pass
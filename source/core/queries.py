@@ -1,21 +1,57 @@
 # Fields
-SELECT_ALL_FIELDS = "SELECT `key`, `value`, alias_key, `date_added` FROM fields"
+SELECT_ALL_FIELDS = "SELECT `id`, `key`, `value`, alias_key, `date_added`, cipher_version FROM fields"
+SELECT_FIELDS_BY_CIPHER = "SELECT `id`, `key`, `value`, alias_key FROM fields WHERE cipher_version = ?"
 SELECT_ONE_FIELD_BY_ID = "SELECT `key`, `value`, alias_key, `date_added` FROM fields WHERE `id` = ?"
-SELECT_ONE_FIELD_BY_KEY = "SELECT `key`, `value`, alias_key, `date_added` FROM fields WHERE `key` = ?"
-COUNT_FIELDS_BY_KEY = "SELECT COUNT(*) FROM fields WHERE `key` = ?"
-INSERT_FIELD = "INSERT INTO fields (`key`, value, alias_key) VALUES (?, ?, ?)"
+SELECT_FIELD_BY_KEY_INDEX = "SELECT `id`, `key`, `value`, alias_key, `date_added`, cipher_version FROM fields WHERE key_index = ?"
+SELECT_FIELDS_BY_KEY_INDEXES = "SELECT `id`, key_index, `value`, alias_key, cipher_version FROM fields WHERE key_index IN ({placeholders})"
+SELECT_FIELDS_WITHOUT_KEY_INDEX = "SELECT `id`, `key`, cipher_version FROM fields WHERE key_index IS NULL"
+INSERT_FIELD = "INSERT INTO fields (`key`, value, alias_key, cipher_version, key_index) VALUES (?, ?, ?, ?, ?)"
+UPDATE_FIELD_CIPHER_BY_ID = "UPDATE fields SET `key` = ?, `value` = ?, alias_key = ?, cipher_version = ?, key_index = ? WHERE `id` = ?"
+UPDATE_FIELD_KEY_INDEX_BY_ID = "UPDATE fields SET key_index = ? WHERE `id` = ?"
 DELETE_FIELD_BY_KEY = "DELETE FROM fields WHERE `key` = ?"
+DELETE_FIELD_BY_KEY_INDEX = "DELETE FROM fields WHERE key_index = ?"
+# Fields pages (keyset pagination on id; filters are appended before ORDER BY)
+SELECT_FIELDS_PAGE = "SELECT `id`, `key`, `value`, alias_key, `date_added`, cipher_version FROM fields WHERE `id` > ?"
+COUNT_FIELDS = "SELECT COUNT(*) FROM fields WHERE 1 = 1"
+SELECT_FIELD_IDS = "SELECT `id` FROM fields WHERE 1 = 1"
+# Data keys
+SELECT_DATA_KEY_BY_NAME = "SELECT wrapped_key FROM data_keys WHERE name = ?"
+INSERT_DATA_KEY = "INSERT INTO data_keys (name, wrapped_key) VALUES (?, ?)"
 # Users
 SELECT_ALL_USERS = "SELECT username, email, date_added FROM users"
+SELECT_ALL_USERS_WITH_IDS = "SELECT id, username, email, date_added FROM users"
 SELECT_ONE_USER_BY_ID = "SELECT username, email, date_added FROM users WHERE id = ?"
 SELECT_ONE_USER_BY_USERNAME = "SELECT username, email, date_added FROM users WHERE `username` = ?"
 COUNT_USERS_BY_USERNAME = "SELECT COUNT(*) FROM users WHERE username = ?"
 INSERT_USER = "INSERT INTO users (username, email) VALUES (?, ?)"
 DELETE_USER_BY_USERNAME = "DELETE FROM users WHERE username = ?"
+# Users pages (keyset pagination on id; filters are appended before ORDER BY)
+SELECT_USERS_PAGE = "SELECT id, username, email, date_added FROM users WHERE id > ?"
+COUNT_USERS = "SELECT COUNT(*) FROM users WHERE 1 = 1"
+SELECT_USER_IDS = "SELECT id FROM users WHERE 1 = 1"
+# Page filters and ordering
+FILTER_DATE_FROM = " AND date_added >= ?"
+FILTER_DATE_TO = " AND date_added <= ?"
+FILTER_USERNAME_PREFIX = " AND username >= ? AND username < ?"
+ORDER_BY_ID = " ORDER BY id"
+ORDER_BY_ID_LIMIT = " ORDER BY id LIMIT ?"
 # Requests
 SELECT_ALL_REQUESTS = "SELECT receivers, keys, date_added FROM requests"
 SELECT_ONE_REQUEST_BY_ID = "SELECT receivers, keys, date_added FROM requests WHERE id = ?"
 SELECT_ONE_REQUEST_BY_RECEIVERS = "SELECT keys, date_added FROM requests WHERE `receivers` = ?"
 COUNT_REQUESTS = "SELECT COUNT(*) FROM requests"
 INSERT_REQUEST = "INSERT INTO requests (receivers, keys) VALUES (?, ?)"
-DELETE_REQUEST_BY_RECEIVERS = "DELETE FROM requests WHERE receivers = ?"
\ No newline at end of file
+DELETE_REQUEST_BY_RECEIVERS = "DELETE FROM requests WHERE receivers = ?"
+# Public keys
+SELECT_PUBKEY_BY_OWNER = "SELECT pubkey, fetched_at FROM pubkeys WHERE owner_hash = ?"
+UPSERT_PUBKEY = "INSERT OR REPLACE INTO pubkeys (owner_hash, pubkey, fetched_at) VALUES (?, ?, ?)"
+DELETE_PUBKEY_BY_OWNER = "DELETE FROM pubkeys WHERE owner_hash = ?"
+# Outbox
+INSERT_OUTBOX_ITEM = "INSERT OR IGNORE INTO outbox (idempotency_key, owner_hash, payload, next_attempt_at, expires_at) VALUES (?, ?, ?, ?, ?)"
+SELECT_DUE_OUTBOX_ITEMS = "SELECT id, payload, attempts FROM outbox WHERE owner_hash = ? AND status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at, id LIMIT ?"
+SELECT_NEXT_OUTBOX_ATTEMPT = "SELECT MIN(next_attempt_at) FROM outbox WHERE owner_hash = ? AND status = ?"
+COUNT_OUTBOX_ITEMS_BY_STATUS = "SELECT status, COUNT(*) FROM outbox WHERE owner_hash = ? GROUP BY status"
+UPDATE_OUTBOX_ATTEMPT_BY_ID = "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?"
+UPDATE_OUTBOX_DUE_BY_OWNER = "UPDATE outbox SET next_attempt_at = ? WHERE owner_hash = ? AND status = ? AND next_attempt_at > ?"
+UPDATE_OUTBOX_EXPIRED = "UPDATE outbox SET status = ? WHERE status = ? AND expires_at <= ?"
+DELETE_OUTBOX_ITEM_BY_ID = "DELETE FROM outbox WHERE id = ?"
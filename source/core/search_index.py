@@ -0,0 +1,214 @@
+# core/search_index.py
+
+import heapq
+import math
+import re
+import threading
+from array import array
+from collections import Counter, defaultdict
+from functools import partial
+from typing import Any, Iterable
+
+from core.constant import (
+    DEFAULT_SEARCH_LIMIT,
+    SEARCH_MIN_COVERAGE,
+    SEARCH_MAX_CANDIDATES,
+    SEARCH_TYPO_MIN_CHARS,
+)
+
+# Characters after which a match counts as starting a word
+WORD_SEPARATORS = " @._-/:"
+_WORD_SPLIT = re.compile(f"[{re.escape(WORD_SEPARATORS)}]+")
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+def make_trigrams(text: str, padded: bool = False) -> set[str]:
+    """Trigrams of `text`. Padded ones also mark its start and end, for indexing."""
+    if padded:
+        text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def make_index_trigrams(text: str) -> set[str]:
+    """Padded trigrams of `text` and of each of its words, so words starting the query get ahead too."""
+    words = _WORD_SPLIT.split(text)
+    return make_trigrams(text, padded=True).union(*(make_trigrams(word, padded=True) for word in words if word))
+
+def within_one_edit(a: str, b: str) -> bool:
+    """
+    Whether `a` and `b` differ by at most one inserted, deleted or replaced
+    character, or two adjacent ones swapped (Damerau distance <= 1).
+    """
+    if abs(len(a) - len(b)) > 1:
+        return False
+    i = 0
+    while i < len(a) and i < len(b) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        swapped = a[i:i + 2] == b[i:i + 2][::-1] and a[i + 2:] == b[i + 2:]
+        return swapped or a[i + 1:] == b[i + 1:]
+    longer, shorter = (a, b) if len(a) > len(b) else (b, a)
+    return longer[i + 1:] == shorter[i:]
+
+
+class TrigramIndex():
+    """
+    In-memory trigram index over short texts (keys, names, emails) with
+    substring and typo-tolerant matching. A document is a tuple of texts,
+    weighted by position, plus a payload returned with its results. Texts
+    are held in plain form, so secrets should go in the payload, not the texts.
+
+    Postings are append-only id arrays. Removed or changed documents leave
+    stale ids behind, which are skipped at query time and dropped when the
+    postings are rebuilt.
+    """
+
+    def __init__(self, weights: tuple[float, ...], min_coverage: float = SEARCH_MIN_COVERAGE):
+        self.weights = weights
+        self.min_coverage = min_coverage
+
+        self._docs: dict[int, tuple[tuple[str, ...], Any]] = {}
+        self._postings: defaultdict[str, array] = defaultdict(partial(array, "q"))
+        self._stale = 0
+        self._lock = threading.RLock()
+
+    # ----- Indexing -----
+    def add(self, doc_id: int, texts: tuple[str, ...], payload: Any = None):
+        """Index or re-index a document."""
+        normalized = tuple(normalize(text or "") for text in texts)
+        with self._lock:
+            old = self._docs.get(doc_id)
+            self._docs[doc_id] = (normalized, payload)
+            if old is not None:
+                if old[0] == normalized:
+                    return
+                self._stale += 1
+
+            self._index(doc_id, normalized)
+            self._compact_if_stale()
+
+    def remove(self, doc_id: int):
+        with self._lock:
+            if self._docs.pop(doc_id, None) is not None:
+                self._stale += 1
+                self._compact_if_stale()
+
+    def sync(self, docs: Iterable[tuple[int, tuple[str, ...], Any]]):
+        """Make the index hold exactly `docs`; only new and changed ones are re-indexed."""
+        with self._lock:
+            seen = set()
+            for doc_id, texts, payload in docs:
+                seen.add(doc_id)
+                self.add(doc_id, texts, payload)
+            for doc_id in self._docs.keys() - seen:
+                self.remove(doc_id)
+
+    def clear(self):
+        with self._lock:
+            self._docs = {}
+            self._postings.clear()
+            self._stale = 0
+
+    # ----- Searching -----
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> list[tuple[int, float, Any]]:
+        """
+        (doc_id, score, payload) of the best matches, best first. Exact,
+        prefix and substring matches rank above fuzzy ones, which need at
+        least `min_coverage` of the query trigrams. Only when none match, a
+        word within one edit of the query does (emial -> email).
+        """
+        query = normalize(query)
+        if not query:
+            return []
+
+        grams = make_trigrams(query)
+        with self._lock:
+            scored = self._score_all(query, grams, self._candidates(query, grams))
+            if not scored and len(query) >= SEARCH_TYPO_MIN_CHARS:
+                # A swapped or mistyped letter breaks up to three trigrams,
+                # leaving short queries too few to reach min_coverage
+                scored = self._score_all(query, grams, self._candidates(query, grams, min_hits=1), typos=True)
+
+            best = heapq.nlargest(limit, scored)
+            return [(doc_id, score, self._docs[doc_id][1]) for score, doc_id in best]
+
+    def _score_all(self, query: str, grams: set[str], doc_ids: list[int], typos: bool = False) -> list[tuple[float, int]]:
+        scored = []
+        for doc_id in doc_ids:
+            doc = self._docs.get(doc_id)
+            if doc is None:
+                continue
+            score = self._score(query, grams, doc[0], typos)
+            if score > 0:
+                scored.append((score, doc_id))
+        return scored
+
+    def _candidates(self, query: str, grams: set[str], min_hits: int | None = None) -> list[int]:
+        """
+        Documents sharing enough trigrams with the query, most shared first.
+        Padded query trigrams also count, so texts and words starting (or
+        equal to) the query get ahead, and queries under three characters
+        match by prefix. Trigrams in most documents are assumed present
+        rather than counted, unless they are all the query has or `min_hits`
+        sets the number of shared trigrams needed.
+        """
+        postings = sorted(
+            (self._postings[gram] for gram in make_trigrams(query, padded=True) if gram in self._postings),
+            key=len)
+        common = [] if min_hits else [doc_ids for doc_ids in postings[1:] if len(doc_ids) > len(self._docs) // 2]
+
+        counts = Counter()
+        for doc_ids in postings[:len(postings) - len(common)]:
+            counts.update(doc_ids)
+
+        required = min_hits or max(1, math.ceil(len(grams) * self.min_coverage) - len(common))
+        candidates = [doc_id for doc_id, hits in counts.items() if hits >= required]
+        if len(candidates) > SEARCH_MAX_CANDIDATES:
+            candidates = heapq.nlargest(SEARCH_MAX_CANDIDATES, candidates, key=counts.__getitem__)
+        return candidates
+
+    def _score(self, query: str, grams: set[str], texts: tuple[str, ...], typos: bool = False) -> float:
+        best = 0.0
+        for text, weight in zip(texts, self.weights):
+            if not text:
+                continue
+
+            position = text.find(query)
+            if text == query:
+                score = 4.0
+            elif position == 0:
+                score = 3.0
+            elif position > 0:
+                score = 2.5 if text[position - 1] in WORD_SEPARATORS else 2.0
+            else:
+                coverage = len(grams & make_trigrams(text)) / len(grams) if grams else 0.0
+                if coverage >= self.min_coverage:
+                    score = coverage
+                elif typos and any(within_one_edit(query, word) for word in (text, *_WORD_SPLIT.split(text))):
+                    score = self.min_coverage
+                else:
+                    continue
+
+            # Among equal matches, prefer the texts the query covers most
+            score = score * weight + 0.1 * min(1.0, len(query) / len(text))
+            best = max(best, score)
+        return best
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ----- Internal methods -----
+    def _compact_if_stale(self):
+        if self._stale <= max(1000, len(self._docs)):
+            return
+
+        self._postings.clear()
+        for doc_id, (texts, _) in self._docs.items():
+            self._index(doc_id, texts)
+        self._stale = 0
+
+    def _index(self, doc_id: int, texts: tuple[str, ...]):
+        postings = self._postings
+        for gram in set().union(*(make_index_trigrams(text) for text in texts if text)):
+            postings[gram].append(doc_id)
@@ -1,5 +1,6 @@
 from datetime import datetime
 import hashlib
+import hmac
 import secrets  # Secure nonce generation
 from Crypto.Cipher import AES
 from Crypto.Random import get_random_bytes
@@ -32,6 +33,18 @@ def hash_message_extended(message: bytes | str) -> tuple[bytes, str]:
     hash = get_sha256_hash(message)  # Get the hash object
     return hash.digest(), hash.hexdigest()
     
+def make_merkle_root(leaves: list[str]) -> str:
+    """SHA-256 Merkle root (hex) of hex-encoded leaf hashes. Odd levels repeat their last node."""
+    if not leaves:
+        return hash_message("")
+    
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [hashlib.sha256(level[i] + level[i + 1]).digest() for i in range(0, len(level), 2)]
+    return level[0].hex()
+
 def make_verification_hash(data, secret_key, timestamp=None, nonce=None):
     """Create a secure hash (HMAC) to verify sender identity."""
     current_timestamp = get_current_utc("datetime") # Get current UNIX timestamp
@@ -76,7 +89,25 @@ def aes_decrypt(key: bytes, encrypted_data: bytes) -> str:
     cipher = AES.new(key, AES.MODE_CBC, iv)
     return unpad(cipher.decrypt(ciphertext), AES.block_size).decode()
 
+def aes_gcm_encrypt(key: bytes, plaintext: bytes) -> bytes:
+    """Seal plaintext with AES-GCM. Output layout: nonce (12) | ciphertext | tag (16)."""
+    nonce = get_random_bytes(12)
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    ciphertext, tag = cipher.encrypt_and_digest(plaintext)
+    return nonce + ciphertext + tag
+
+def aes_gcm_decrypt(key: bytes, sealed_data: bytes) -> bytes:
+    """Open data sealed by aes_gcm_encrypt. Raises ValueError if it was tampered."""
+    nonce = sealed_data[:12]
+    ciphertext = sealed_data[12:-16]
+    tag = sealed_data[-16:]
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    return cipher.decrypt_and_verify(ciphertext, tag)
+
+def make_blind_index(index_key: bytes, plaintext: bytes) -> bytes:
+    """Deterministic HMAC-SHA256 of plaintext, to match sealed data by equality without opening it."""
+    return hmac.new(index_key, plaintext, hashlib.sha256).digest()
+
 def make_user_salt(user: str) -> bytes:
     """Create a salt for the user as raw bytes."""
     return f"shary_creds.{user}".encode("utf-8")
-
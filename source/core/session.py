@@ -1,11 +1,12 @@
 # core/session.py
 
+from __future__ import annotations
+
 import os
 import json
 import logging
 from base64 import b64encode
-
-from services.security_service import SecurityService
+from typing import TYPE_CHECKING
 
 from core.security_utils import (
     aes_encrypt,
@@ -19,6 +20,9 @@ from core.constant import (
     PATH_CREDENTIALS
 )
 
+if TYPE_CHECKING:
+    from services.security_service import SecurityService
+
 class Session():
     _instance = None
 
@@ -29,6 +33,7 @@ class Session():
         self.safe_password = None
         self.is_password_safe = False
         self.verification_token = None
+        self.encryption_key = None
 
         # Owner status
 
@@ -73,10 +78,8 @@ class Session():
 
         # Hash encryption key using PBKDF2
         encryption_key = self.security_service.hash_password(safe_password, user_salt)
-        
-        logging.debug(f"salt: {user_salt}")
-        logging.debug(f"safe_password: {password, safe_password}")
-        logging.debug(f"encryption_key: {encryption_key}")
+
+        self.encryption_key = encryption_key
 
         if not self._exists_owner():
             data = {
@@ -101,23 +104,29 @@ class Session():
         with open(PATH_FILE_CREDENTIALS, "rb") as f:
             encrypted = f.read()
         encryption_key = self.security_service.hash_password(safe_password, salt)
-        logging.debug(f"salt: {salt}")
-        logging.debug(f"safe_password: {safe_password}")
-        logging.debug(f"encryption_key: {encryption_key}")
         try:
             data = json.loads(aes_decrypt(encryption_key, encrypted))
         except Exception as e:
-            logging.debug(f"Error at loading credentials: {e}")
+            # A wrong password fails here; the error is logged by type only, never with the key
+            logging.debug(f"Credentials could not be opened: {type(e).__name__}")
             return
 
-        logging.debug(f"load_credentials - data: {data}")
-        
         # Load the credentials into session
+        self.encryption_key = encryption_key
         self.email = data.get("owner_email")
         self.username = data.get("owner_username")
         self.safe_password = data.get("owner_safe_password")
         self.verification_token = data.get("verification_token", "")
 
+    def logout(self):
+        """Forget the owner's in-memory credentials. Stored credentials are kept."""
+        self.email = None
+        self.username = None
+        self.safe_password = None
+        self.verification_token = None
+        self.encryption_key = None
+        self.checked_users = None
+
     def delete_credentials(self):
         if os.path.exists(PATH_FILE_CREDENTIALS):
             os.remove(PATH_FILE_CREDENTIALS)
@@ -133,6 +142,9 @@ class Session():
     def get_safe_password(self):
         return self.safe_password
     
+    def get_encryption_key(self):
+        return self.encryption_key
+    
     def get_verification_token(self):
         return self.verification_token
 
@@ -152,14 +164,10 @@ class Session():
         password_utf8: bytes = ui_password.encode("utf-8")
         
         test_safe_password = self.security_service.hash_password(password_utf8, user_salt)
-        print(f"test_safe_password : {test_safe_password}")
-        
+
         # Load session credentials (username and safe_password)        
         self.load_credentials(user_salt, test_safe_password)
-        
-        logging.debug(""f"try_login - session credentials - username: {ui_username}, {self.get_username()}")
-        logging.debug(""f"try_login - session credentials - password: {test_safe_password}, {self.get_safe_password()}")
-        
+
         if ui_username == self.get_username() \
         and test_safe_password.hex() == self.get_safe_password():
             # User can login
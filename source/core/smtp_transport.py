@@ -0,0 +1,176 @@
+# core/smtp_transport.py
+
+import logging
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.message import EmailMessage
+from typing import Callable
+
+from core.constant import (
+    DEFAULT_SMTP_POOL_SIZE,
+    DEFAULT_SMTP_TIMEOUT,
+    TIME_SMTP_IDLE_ALIVE,
+)
+
+def is_connection_error(error: BaseException) -> bool:
+    """Errors after which a connection can't be trusted anymore (SMTPException is an OSError too)."""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class SmtpTransport():
+    """
+    Pool of logged-in SMTP connections. Connections are reused across sends,
+    closed after being idle too long and reopened transparently when dropped.
+    """
+
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            credentials: Callable[[], tuple[str, str]],
+            use_ssl: bool = True,
+            max_connections: int = DEFAULT_SMTP_POOL_SIZE,
+            idle_timeout: float = TIME_SMTP_IDLE_ALIVE,
+            timeout: float = DEFAULT_SMTP_TIMEOUT,
+            ):
+        self.host = host
+        self.port = port
+        self.credentials = credentials
+        self.use_ssl = use_ssl
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+
+        self._idle: list[tuple[smtplib.SMTP, float]] = []
+        self._login_user = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, max_connections))
+
+    # ----- Sending -----
+    def send(self, message: EmailMessage, retries: int = 1) -> dict[str, tuple[int, bytes]]:
+        """Send one message. Returns the recipients refused by the server."""
+        for attempt in range(retries + 1):
+            try:
+                with self.connection() as server:
+                    return server.send_message(message)
+            except OSError as e:
+                if not is_connection_error(e) or attempt == retries:
+                    raise
+                logging.info(f"SMTP connection dropped ({type(e).__name__}), reconnecting")
+
+    def send_many(self, messages: list[EmailMessage], retries: int = 1) -> list[dict | Exception]:
+        """
+        Stream messages over a single session, reconnecting if it drops.
+        Returns, per message, the refused recipients or the exception raised.
+        """
+        results = []
+        pending = list(messages)
+        attempts = 0
+        while pending:
+            try:
+                with self.connection() as server:
+                    while pending:
+                        try:
+                            results.append(server.send_message(pending[0]))
+                        except smtplib.SMTPRecipientsRefused as e:
+                            results.append(e.recipients)
+                        except OSError as e:
+                            if is_connection_error(e):
+                                raise
+                            results.append(e)
+                        pending.pop(0)
+                        attempts = 0
+            except OSError as e:
+                if not is_connection_error(e):
+                    raise
+                attempts += 1
+                if attempts > retries:
+                    # Give up on the message that keeps failing, keep the rest going
+                    results.append(e)
+                    pending.pop(0)
+                    attempts = 0
+                logging.info(f"SMTP connection dropped ({type(e).__name__}), reconnecting")
+        return results
+
+    # ----- Connection handling -----
+    @contextmanager
+    def connection(self):
+        server = self._acquire()
+        try:
+            yield server
+        except BaseException as e:
+            if is_connection_error(e):
+                self._discard(server)
+            else:
+                self._release(server)
+            raise
+        else:
+            self._release(server)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._quit(server)
+
+    def _acquire(self) -> smtplib.SMTP:
+        self._slots.acquire()
+        try:
+            user, _ = self.credentials()
+            with self._lock:
+                # Don't reuse sessions logged in as someone else
+                if user != self._login_user:
+                    stale, self._idle = self._idle, []
+                    self._login_user = user
+                    server = None
+                else:
+                    stale = []
+                    now = time.monotonic()
+                    while self._idle:
+                        server, last_used = self._idle.pop()
+                        if now - last_used <= self.idle_timeout:
+                            break
+                        stale.append((server, last_used))
+                    else:
+                        server = None
+
+            for stale_server, _ in stale:
+                self._quit(stale_server)
+
+            return server if server is not None else self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, server: smtplib.SMTP):
+        with self._lock:
+            self._idle.append((server, time.monotonic()))
+        self._slots.release()
+
+    def _discard(self, server: smtplib.SMTP):
+        self._quit(server)
+        self._slots.release()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        server = smtp_class(self.host, self.port, timeout=self.timeout)
+
+        user, password = self.credentials()
+        if user and password:
+            try:
+                server.login(user, password)
+            except BaseException:
+                self._quit(server)
+                raise
+        logging.debug(f"SMTP connection opened to {self.host}:{self.port}")
+        return server
+
+    @staticmethod
+    def _quit(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
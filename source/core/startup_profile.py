@@ -0,0 +1,45 @@
+# core/startup_profile.py
+"""
+Startup milestones (first frame, Fields screen shown), timed from the
+import of this module, which main.py does before anything else. Each
+milestone is logged once.
+"""
+
+import logging
+import time
+
+MARK_FIRST_FRAME = "first frame"
+MARK_LOGIN_SUBMITTED = "login submitted"
+MARK_FIELDS_SCREEN = "fields screen"
+
+_start = time.perf_counter()
+_marks: dict[str, float] = {}
+
+
+def mark(name: str, since: str | None = None):
+    """Record milestone `name` the first time it is reached, also relative to milestone `since` if given."""
+    if name in _marks:
+        return
+
+    _marks[name] = elapsed = time.perf_counter() - _start
+    message = f"Startup: {name} at {elapsed:.3f}s"
+    if since in _marks:
+        message += f" ({elapsed - _marks[since]:.3f}s after {since})"
+    logging.info(message)
+
+def mark_next_frame(name: str, since: str | None = None):
+    """Record milestone `name` once the next frame has been drawn."""
+    if name in _marks:
+        return
+
+    from kivy.core.window import Window
+
+    def on_flip(*_):
+        Window.unbind(on_flip=on_flip)
+        mark(name, since)
+
+    Window.bind(on_flip=on_flip)
+
+def get_marks() -> dict[str, float]:
+    """Seconds from startup to each milestone reached so far."""
+    return dict(_marks)
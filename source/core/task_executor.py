@@ -0,0 +1,125 @@
+# core/task_executor.py
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable
+
+from kivy.clock import Clock
+
+from core.constant import DEFAULT_TASK_WORKERS
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task that noticed it was cancelled."""
+
+
+class BackgroundTask():
+    """Handle for work submitted to TaskExecutor. Callbacks always run on the Kivy main thread."""
+
+    def __init__(
+            self,
+            name: str,
+            on_result: Callable[[Any], None] = None,
+            on_error: Callable[[Exception], None] = None,
+            on_progress: Callable[[float, str], None] = None,
+            ):
+        self.name = name
+        self.on_result = on_result
+        self.on_error = on_error
+        self.on_progress = on_progress
+
+        self.future: Future | None = None
+        self._cancelled = threading.Event()
+
+    # ----- Worker side -----
+    def report_progress(self, progress: float, message: str = ""):
+        """Post progress (0..1) to the UI thread. Safe to call from the worker."""
+        self.raise_if_cancelled()
+        if self.on_progress:
+            Clock.schedule_once(lambda _: self.on_progress(progress, message), 0)
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def raise_if_cancelled(self):
+        if self.is_cancelled():
+            raise TaskCancelled(self.name)
+
+    # ----- UI side -----
+    def cancel(self) -> bool:
+        """Request cancellation. Pending tasks never start; running ones stop at their next check."""
+        self._cancelled.set()
+        return self.future.cancel() if self.future else True
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def _dispatch(self, future: Future):
+        if self.is_cancelled() or future.cancelled():
+            logging.debug(f"Task '{self.name}' cancelled")
+            return
+
+        error = future.exception()
+        if isinstance(error, TaskCancelled):
+            return
+
+        if error is not None:
+            logging.error(f"Task '{self.name}' failed: {error}")
+            if self.on_error:
+                Clock.schedule_once(lambda _: self.on_error(error), 0)
+            return
+
+        result = future.result()
+        if self.on_result:
+            Clock.schedule_once(lambda _: self.on_result(result), 0)
+
+
+class TaskExecutor():
+    """Runs blocking work (network, crypto, disk) off the Kivy main thread."""
+
+    def __init__(self, max_workers: int = DEFAULT_TASK_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shary-task")
+        self._tasks: set[BackgroundTask] = set()
+        self._lock = threading.Lock()
+
+    def submit(
+            self,
+            func: Callable,
+            *args,
+            on_result: Callable[[Any], None] = None,
+            on_error: Callable[[Exception], None] = None,
+            on_progress: Callable[[float, str], None] = None,
+            pass_task: bool = False,
+            name: str = None,
+            **kwargs
+            ) -> BackgroundTask:
+        """
+        Run `func(*args, **kwargs)` on a worker thread.
+        With `pass_task`, the BackgroundTask is passed as first argument so the
+        function can report progress and check for cancellation.
+        """
+        task = BackgroundTask(name or getattr(func, "__name__", "task"), on_result, on_error, on_progress)
+        if pass_task:
+            args = (task, *args)
+
+        with self._lock:
+            self._tasks.add(task)
+        task.future = self._pool.submit(func, *args, **kwargs)
+        task.future.add_done_callback(lambda future: self._on_done(task, future))
+        return task
+
+    def cancel_all(self):
+        with self._lock:
+            tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+
+    def shutdown(self, wait: bool = False):
+        self.cancel_all()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _on_done(self, task: BackgroundTask, future: Future):
+        with self._lock:
+            self._tasks.discard(task)
+        task._dispatch(future)
@@ -0,0 +1,192 @@
+# core/tracing.py
+"""
+Timing spans aggregated into in-memory histograms, one per operation name.
+
+    @span("fields.import")
+    def import_fields(...): ...
+
+    with span("cloud.get_pubkey"):
+        ...
+
+Recording is off unless TRACING_ENABLED or set_enabled(True) (the
+diagnostics screen has a switch). While off, a decorated call costs a flag
+check and a `with span(...)` block an object creation. Finished spans can
+also be passed to an exporter, e.g. OpenTelemetryExporter.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable
+
+from core.constant import TRACING_ENABLED, TRACING_NUM_BUCKETS, PATH_TRACING_EXPORT
+
+# (name, start, end, failed); times are epoch nanoseconds
+Exporter = Callable[[str, int, int, bool], None]
+
+_enabled = TRACING_ENABLED
+_exporter: Exporter | None = None
+_histograms: dict[str, "Histogram"] = {}
+_lock = threading.Lock()
+
+# perf_counter_ns() + offset ~= time_ns(), for exporters that want wall-clock times
+_epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+
+
+class Histogram():
+    """Durations in power-of-two microsecond buckets, with exact count, total, min and max."""
+    __slots__ = ("count", "errors", "total_ns", "min_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        # Bucket i holds durations under 2**i microseconds (and from 2**(i-1))
+        self.buckets = [0] * TRACING_NUM_BUCKETS
+
+    def add(self, duration_ns: int, failed: bool = False):
+        if not self.count or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        self.max_ns = max(self.max_ns, duration_ns)
+        self.count += 1
+        self.errors += failed
+        self.total_ns += duration_ns
+        self.buckets[min((duration_ns // 1000).bit_length(), TRACING_NUM_BUCKETS - 1)] += 1
+
+    def percentile(self, q: float) -> float:
+        """Upper bound, in seconds, of the bucket holding the q-th percentile (0 < q <= 1)."""
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min(2 ** i * 1e-6, self.max_ns * 1e-9)
+        return self.max_ns * 1e-9
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_s": self.total_ns * 1e-9,
+            "mean_s": self.total_ns * 1e-9 / self.count if self.count else 0.0,
+            "min_s": self.min_ns * 1e-9,
+            "p50_s": self.percentile(0.5),
+            "p95_s": self.percentile(0.95),
+            "p99_s": self.percentile(0.99),
+            "max_s": self.max_ns * 1e-9,
+            "buckets": self.buckets[:],
+        }
+
+
+class span():
+    """Times a block (`with span(name):`) or every call of a function (`@span(name)`)."""
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._start = None
+
+    def __enter__(self):
+        if _enabled:
+            self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._start is not None:
+            record(self.name, self._start, time.perf_counter_ns(), exc_type is not None)
+            self._start = None
+
+    def __call__(self, func):
+        name = self.name
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Checked per call, so recording can be switched on after import
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter_ns()
+            failed = True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                record(name, start, time.perf_counter_ns(), failed)
+        return wrapper
+
+
+def record(name: str, start_ns: int, end_ns: int, failed: bool = False):
+    """Add a finished span, timed with perf_counter_ns, to its histogram and the exporter."""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(end_ns - start_ns, failed)
+
+    exporter = _exporter
+    if exporter is not None:
+        try:
+            exporter(name, start_ns + _epoch_offset_ns, end_ns + _epoch_offset_ns, failed)
+        except Exception as e:
+            logging.warning(f"Tracing exporter failed: {type(e).__name__}")
+
+# ----- Control -----
+def set_enabled(enabled: bool):
+    global _enabled
+    _enabled = enabled
+
+def is_enabled() -> bool:
+    return _enabled
+
+def set_exporter(exporter: Exporter | None):
+    """Also pass every finished span to `exporter` (None to stop)."""
+    global _exporter
+    _exporter = exporter
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+# ----- Reading -----
+def get_stats(sort_by: str = "p95_s") -> list[dict]:
+    """One dict per operation (name, count, errors, total_s, mean_s, min_s, p50_s, p95_s, p99_s, max_s, buckets), largest `sort_by` first."""
+    with _lock:
+        stats = [{"name": name, **histogram.to_dict()} for name, histogram in _histograms.items()]
+    return sorted(stats, key=lambda stat: stat[sort_by], reverse=True)
+
+def export_json(path: str = PATH_TRACING_EXPORT) -> str:
+    """Write the current histograms to a JSON file and return its path."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "exported_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "operations": get_stats(),
+            }, f, indent=2)
+    return path
+
+
+class OpenTelemetryExporter():
+    """
+    Forwards spans to OpenTelemetry, for whatever tracer provider and span
+    exporter the process configured. opentelemetry-api is an optional
+    dependency, imported when this exporter is created.
+    """
+    def __init__(self, tracer_name: str = "shary"):
+        from opentelemetry import trace
+        from opentelemetry.trace import Status, StatusCode
+
+        self._tracer = trace.get_tracer(tracer_name)
+        self._error_status = Status(StatusCode.ERROR)
+
+    def __call__(self, name: str, start_ns: int, end_ns: int, failed: bool):
+        otel_span = self._tracer.start_span(name, start_time=start_ns)
+        if failed:
+            otel_span.set_status(self._error_status)
+        otel_span.end(end_time=end_ns)
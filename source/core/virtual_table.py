@@ -0,0 +1,434 @@
+# core/virtual_table.py
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable
+
+from kivy.metrics import dp
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.layout import RecycleLayoutManagerBehavior
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.widget import Widget
+from kivymd.uix.boxlayout import MDBoxLayout
+from kivymd.uix.label import MDLabel
+from kivymd.uix.selectioncontrol import MDCheckbox
+
+from core.constant import (
+    ROW_HEIGHT,
+    VIRTUAL_TABLE_BLOCK_ROWS,
+    VIRTUAL_TABLE_CACHE_BLOCKS,
+)
+
+if TYPE_CHECKING:
+    from core.dtos import PageDTO
+    from core.task_executor import TaskExecutor
+
+# ----- Data sources -----
+# A data source answers count() and fetch(offset, limit); add/remove keep
+# in-memory sources in sync, persistent ones pick changes up on reload().
+# reload() returns whether anything changed since the previous reload, so
+# tables can skip redrawing when nothing did.
+
+class ListDataSource():
+    """Rows held in memory (files, requests)."""
+    def __init__(self, rows=None):
+        self.rows = [tuple(row) for row in rows or []]
+        self._changed = True
+
+    def count(self) -> int:
+        return len(self.rows)
+
+    def fetch(self, offset: int, limit: int) -> list[tuple]:
+        return self.rows[offset:offset + limit]
+
+    def reload(self) -> bool:
+        changed, self._changed = self._changed, False
+        return changed
+
+    def add(self, row):
+        self.rows.append(tuple(row))
+        self._changed = True
+
+    def remove(self, pks: set, pk_index: int = 0):
+        rows = [row for row in self.rows if row[pk_index] not in pks]
+        if len(rows) != len(self.rows):
+            self.rows = rows
+            self._changed = True
+
+
+class PagedDataSource():
+    """
+    Read-only rows of a known count, fetched one page at a time as they
+    scroll into view (e.g. an indexed file too large to load whole).
+    """
+    def __init__(self, count: int, fetch_page: Callable[[int, int], list[tuple]]):
+        self._count = count
+        self.fetch_page = fetch_page
+        self._changed = True
+
+    def count(self) -> int:
+        return self._count
+
+    def fetch(self, offset: int, limit: int) -> list[tuple]:
+        return self.fetch_page(offset, limit)
+
+    def reload(self) -> bool:
+        changed, self._changed = self._changed, False
+        return changed
+
+    def add(self, row):
+        pass
+
+    def remove(self, pks: set, pk_index: int = 0):
+        pass
+
+
+class KeysetDataSource():
+    """
+    Offset access over a keyset-paginated service. Only the ordered ids are
+    loaded up front; rows are fetched one page at a time as they scroll into view.
+    With `load_version` (a data version stamp), reload() only re-reads the
+    ids when the stamp moved.
+    """
+    def __init__(
+            self,
+            load_ids: Callable[[], list[int]],
+            load_page: Callable[[int, int], PageDTO],
+            load_version: Callable[[], object] | None = None,
+            ):
+        self.load_ids = load_ids
+        self.load_page = load_page
+        self.load_version = load_version
+        # Read before the ids, so a concurrent write is seen as a change next time
+        self.version = load_version() if load_version else None
+        self.ids = load_ids()
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def fetch(self, offset: int, limit: int) -> list[tuple]:
+        after_id = self.ids[offset - 1] if offset else 0
+        return self.load_page(after_id, limit).rows
+
+    def reload(self) -> bool:
+        if self.load_version:
+            version = self.load_version()
+            if version == self.version:
+                return False
+            self.version = version
+
+        ids = self.load_ids()
+        changed = ids != self.ids
+        self.ids = ids
+        # Same ids may still hold updated rows when the version moved
+        return changed or self.load_version is not None
+
+    def add(self, row):
+        pass
+
+    def remove(self, pks: set, pk_index: int = 0):
+        pass
+
+# ----- Widgets -----
+class VirtualTableRow(RecycleDataViewBehavior, MDBoxLayout):
+    """Recycled row view; its content is pulled from the table by index."""
+    def __init__(self, **kwargs):
+        super().__init__(orientation="horizontal", size_hint_y=None, height=dp(ROW_HEIGHT), **kwargs)
+        self.table = None
+        self.row = None
+        self.labels = []
+
+        self.checkbox = MDCheckbox(size_hint=(None, 1), width=dp(ROW_HEIGHT))
+        self.checkbox.bind(on_release=self._on_checkbox_release)
+        self.add_widget(self.checkbox)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.table = rv.table
+        self._make_labels(self.table.column_widths)
+
+        self.row = self.table.get_row(index)
+        cells = self.row or ("",) * len(self.labels)
+        for label, cell in zip(self.labels, cells):
+            label.text = str(cell)
+        self.checkbox.active = self.row is not None and self.table.is_checked(self.row)
+
+        return super().refresh_view_attrs(rv, index, data)
+
+    def _make_labels(self, column_widths: list[float]):
+        if len(self.labels) == len(column_widths):
+            return
+
+        for label in self.labels:
+            self.remove_widget(label)
+        self.labels = [make_cell_label(width) for width in column_widths]
+        for label in self.labels:
+            self.add_widget(label)
+
+    def _on_checkbox_release(self, checkbox):
+        if self.row is None:
+            checkbox.active = False
+            return
+        self.table.dispatch("on_check_press", self.row)
+
+
+class FixedRowLayout(RecycleLayoutManagerBehavior, Widget):
+    """
+    Layout manager for rows of a single height. Row positions are computed
+    from the index instead of being stored per row (as RecycleBoxLayout
+    does), so (re)loading the data costs the same for 100 or 100k rows.
+    """
+    def __init__(self, row_height: float, **kwargs):
+        super().__init__(size_hint_y=None, **kwargs)
+        self.row_height = row_height
+        self.view_indices = {}
+        self._count = 0
+        self.fbind("width", self._on_width)
+
+    def compute_sizes_from_data(self, data, flags):
+        self._count = len(data)
+        self.clear_layout()
+
+    def compute_layout(self, data, flags):
+        self.height = self._count * self.row_height
+
+    def compute_visible_views(self, data, viewport):
+        if not self._count:
+            return []
+
+        x, y, w, h = viewport
+        return range(self.get_view_index_at((x, y + h)), self.get_view_index_at((x, y)) + 1)
+
+    def get_view_index_at(self, pos):
+        # Rows go top-down while y grows upwards
+        index = int((self.height - pos[1]) // self.row_height)
+        return min(max(index, 0), self._count - 1)
+
+    def set_visible_views(self, indices, data, viewport):
+        adapter = self.recycleview.view_adapter
+        new, _, old = adapter.set_visible_views(indices, data, _SameViewclass(self.viewclass))
+
+        for _, widget in old:
+            self.remove_widget(widget)
+            del self.view_indices[widget]
+
+        for index, widget in new:
+            layout = {
+                "size": (self.width, self.row_height),
+                "size_hint": (None, None),
+                "pos": (0, self.height - (index + 1) * self.row_height),
+            }
+            self.refresh_view_layout(index, layout, widget, viewport)
+            self.view_indices[widget] = index
+            if widget.parent is None:
+                self.add_widget(widget)
+
+    def remove_views(self):
+        super().remove_views()
+        self.clear_widgets()
+        self.view_indices = {}
+
+    def remove_view(self, view, index):
+        super().remove_view(view, index)
+        self.remove_widget(view)
+        del self.view_indices[view]
+
+    def clear_layout(self):
+        super().clear_layout()
+        self.clear_widgets()
+        self.view_indices = {}
+
+    def _on_width(self, instance, width):
+        for widget in self.view_indices:
+            widget.width = width
+
+
+class _SameViewclass():
+    """Per-index view options as the view adapter expects them; every row shares one."""
+    def __init__(self, viewclass):
+        self.opts = {"viewclass": viewclass}
+
+    def __getitem__(self, index):
+        return self.opts
+
+
+class VirtualTableView(RecycleView):
+    def __init__(self, table, **kwargs):
+        super().__init__(**kwargs)
+        self.table = table
+        self.add_widget(FixedRowLayout(dp(ROW_HEIGHT)))
+
+        # Forwarded to the layout manager, so it must be set after adding it
+        self.viewclass = VirtualTableRow
+
+
+class VirtualTable(MDBoxLayout):
+    """
+    Checkable table built on a RecycleView, standing in for MDDataTable.
+    Only the visible rows have widgets, and rows are pulled from the data
+    source in blocks (a few of them cached), so large tables stay smooth.
+
+    With an `executor`, the data source is only read on its worker threads
+    (for sources that query or decrypt): rows show empty until their block
+    arrives, and a reload keeps showing the old rows until the new ones do.
+    """
+    __events__ = ("on_check_press",)
+
+    def __init__(
+            self,
+            column_data: list[tuple[str, float]],
+            data_source=None,
+            is_checked: Callable[[tuple], bool] | None = None,
+            pk_index: int = 0,
+            executor: TaskExecutor | None = None,
+            **kwargs
+            ):
+        super().__init__(orientation="vertical", **kwargs)
+        self.column_widths = [width for _, width in column_data]
+        self.data_source = data_source or ListDataSource()
+        self.is_checked = is_checked or (lambda row: False)
+        self.pk_index = pk_index
+        self.executor = executor
+        self._blocks: OrderedDict[int, list[tuple]] = OrderedDict()
+        # Blocks being fetched in the background; a reload bumps the generation,
+        # so blocks fetched before it are dropped
+        self._pending: set[int] = set()
+        self._generation = 0
+
+        self.add_widget(self._make_header(column_data))
+        self.view = VirtualTableView(self)
+        self.add_widget(self.view)
+        self.refresh(force=True)
+
+    # ----- Rows -----
+    def get_row(self, index: int) -> tuple | None:
+        block_index, offset = divmod(index, VIRTUAL_TABLE_BLOCK_ROWS)
+        block = self._blocks.get(block_index)
+        if block is None:
+            if self.executor is not None:
+                self._fetch_block_async(block_index)
+                return None
+            block = self._fetch_block(block_index)
+            self._store_block(block_index, block)
+        else:
+            self._blocks.move_to_end(block_index)
+
+        return block[offset] if offset < len(block) else None
+
+    @property
+    def row_data(self) -> list[tuple]:
+        return self.data_source.fetch(0, self.data_source.count())
+
+    @row_data.setter
+    def row_data(self, rows):
+        """Replace every row at once, with a single layout pass."""
+        self.set_data_source(ListDataSource(rows))
+
+    def set_data_source(self, data_source):
+        """Show the rows of another data source."""
+        self.data_source = data_source
+        self.refresh(force=True)
+
+    def add_row(self, row):
+        self.add_rows([row])
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.data_source.add(row)
+        self.refresh()
+
+    def remove_row(self, row):
+        self.remove_rows({row[self.pk_index]})
+
+    def remove_rows(self, pks: set):
+        self.data_source.remove(pks, self.pk_index)
+        self.refresh()
+
+    # ----- Refreshing -----
+    def refresh(self, force: bool = False):
+        """
+        Reload the data source and, if it changed (or `force`), drop cached rows
+        and redraw. Relayout only happens when the number of rows changed.
+        """
+        if self.executor is not None:
+            # Refetched with the reload, so visible rows don't blank out meanwhile
+            visible = sorted({index // VIRTUAL_TABLE_BLOCK_ROWS for index in self.view.view_adapter.views})
+            self.executor.submit(
+                self._reload, visible, force,
+                on_result=lambda result: self._apply_reload(force, *result),
+                name="table_reload",
+                )
+            return
+
+        self._apply_reload(force, self.data_source.reload(), self.data_source.count(), {})
+
+    def _reload(self, block_indexes: list[int], force: bool) -> tuple[bool, int, dict[int, list[tuple]]]:
+        changed = self.data_source.reload()
+        blocks = {block_index: self._fetch_block(block_index) for block_index in block_indexes} if changed or force else {}
+        return changed, self.data_source.count(), blocks
+
+    def _apply_reload(self, force: bool, changed: bool, count: int, blocks: dict[int, list[tuple]]):
+        if not changed and not force:
+            return
+
+        self._generation += 1
+        self._pending.clear()
+        self._blocks.clear()
+        for block_index, block in blocks.items():
+            self._store_block(block_index, block)
+        if force or count != len(self.view.data):
+            # Views get their content by index, so every item shares one empty dict
+            self.view.data = [{}] * count
+            self.view.refresh_from_data()
+        else:
+            self.refresh_view()
+
+    def refresh_view(self):
+        """Redraw visible rows (e.g. check marks) keeping cached rows."""
+        for index, row_view in self.view.view_adapter.views.items():
+            row_view.refresh_view_attrs(self.view, index, {})
+
+    # ----- Blocks -----
+    def _fetch_block(self, block_index: int) -> list[tuple]:
+        return self.data_source.fetch(block_index * VIRTUAL_TABLE_BLOCK_ROWS, VIRTUAL_TABLE_BLOCK_ROWS)
+
+    def _store_block(self, block_index: int, block: list[tuple]):
+        self._blocks[block_index] = block
+        if len(self._blocks) > VIRTUAL_TABLE_CACHE_BLOCKS:
+            self._blocks.popitem(last=False)
+
+    def _fetch_block_async(self, block_index: int):
+        if block_index in self._pending:
+            return
+        self._pending.add(block_index)
+        generation = self._generation
+        self.executor.submit(
+            self._fetch_block, block_index,
+            on_result=lambda block: self._on_block_fetched(generation, block_index, block),
+            on_error=lambda _: self._on_block_fetched(generation, block_index, None),
+            name="table_fetch",
+            )
+
+    def _on_block_fetched(self, generation: int, block_index: int, block: list[tuple] | None):
+        if generation != self._generation:
+            return
+        self._pending.discard(block_index)
+        if block is not None:
+            self._store_block(block_index, block)
+            self.refresh_view()
+
+    def on_check_press(self, row):
+        pass
+
+    def _make_header(self, column_data) -> MDBoxLayout:
+        header = MDBoxLayout(orientation="horizontal", size_hint_y=None, height=dp(ROW_HEIGHT))
+        header.add_widget(MDBoxLayout(size_hint_x=None, width=dp(ROW_HEIGHT)))
+        for name, width in column_data:
+            header.add_widget(make_cell_label(width, text=name, bold=True))
+        return header
+
+
+def make_cell_label(width: float, **kwargs) -> MDLabel:
+    label = MDLabel(size_hint_x=width, shorten=True, shorten_from="right", **kwargs)
+    label.bind(width=lambda instance, value: setattr(instance, "text_size", (value, None)))
+    return label
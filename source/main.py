@@ -1,10 +1,19 @@
 # --- main.py ---
+import multiprocessing
 
-from kivy.core.window import Window
+if __name__ == "__main__":
+    # Crypto pool workers are spawned from this script (or the frozen executable),
+    # so the app must only start in the parent process
+    multiprocessing.freeze_support()
 
-from app.app import SharyApp
-from core.functions import resource_path
+    # First, so startup times include the imports below
+    from core import startup_profile  # noqa: F401 (imported for its start time)
 
-Window.icon = resource_path("assets/favicon.ico")
+    from kivy.core.window import Window
 
-SharyApp().run()
\ No newline at end of file
+    from app.app import SharyApp
+    from core.functions import resource_path
+
+    Window.icon = resource_path("assets/favicon.ico")
+
+    SharyApp().run()
@@ -0,0 +1,66 @@
+import sqlite3
+import threading
+from inspect import isfunction
+from contextlib import contextmanager
+
+from core.database import ConnectionManager
+from core.tracing import span
+
+
+class BaseRepository():
+    # Table whose changes get_version tracks
+    table: str | None = None
+
+    # Writes per table, counted across every repository in the process
+    _versions: dict[str, int] = {}
+    _versions_lock = threading.Lock()
+
+    def __init_subclass__(cls, **kwargs):
+        # Every query method of a repository is timed as "db.<Repository>.<method>"
+        super().__init_subclass__(**kwargs)
+        for attr, value in list(vars(cls).items()):
+            if isfunction(value) and not attr.startswith("_"):
+                setattr(cls, attr, span(f"db.{cls.__name__}.{attr}")(value))
+
+    def __init__(self, db_connection: sqlite3.Connection | ConnectionManager | None = None):
+        # Either a fixed connection (tests, benchmarks) or a per-thread connection manager
+        self._db = db_connection if db_connection is not None else ConnectionManager.default()
+
+    @property
+    def db_connection(self) -> sqlite3.Connection:
+        if isinstance(self._db, ConnectionManager):
+            return self._db.connection()
+        return self._db
+
+    @contextmanager
+    def transaction(self):
+        """Run several statements as one transaction; commits or rolls back as a whole."""
+        if isinstance(self._db, ConnectionManager):
+            with self._db.transaction() as conn:
+                yield conn
+            return
+
+        try:
+            yield self._db
+        except BaseException:
+            self._db.rollback()
+            raise
+        else:
+            self._db.commit()
+
+    # ----- Change tracking -----
+    def get_version(self) -> tuple[int, int]:
+        """
+        Stamp that moves whenever the table may have changed: writes made by
+        repositories in this process, plus SQLite's data_version, which moves
+        when another connection (or process) commits. data_version is per
+        connection, so only compare stamps taken on the same thread.
+        """
+        cursor = self.db_connection.execute("PRAGMA data_version")
+        data_version = cursor.fetchone()[0]
+        cursor.close()
+        return self._versions.get(self.table, 0), data_version
+
+    def _mark_changed(self):
+        with self._versions_lock:
+            self._versions[self.table] = self._versions.get(self.table, 0) + 1
@@ -1,46 +1,99 @@
 import sqlite3
-from typing import List
+from typing import Iterable, List
 from kivy.logger import Logger
 
-from core.constant import PATH_DB
+from core.constant import DEFAULT_NUM_ROWS_PAGE, DEFAULT_SQL_IN_CHUNK_SIZE
 from core.queries import (
     INSERT_FIELD,
-    DELETE_FIELD_BY_KEY,
-    SELECT_ALL_FIELDS
+    DELETE_FIELD_BY_KEY_INDEX,
+    SELECT_ALL_FIELDS,
+    SELECT_FIELDS_PAGE,
+    COUNT_FIELDS,
+    FILTER_DATE_FROM,
+    FILTER_DATE_TO,
+    ORDER_BY_ID,
+    ORDER_BY_ID_LIMIT,
+    SELECT_FIELD_IDS,
+    SELECT_FIELDS_BY_CIPHER,
+    UPDATE_FIELD_CIPHER_BY_ID,
+    UPDATE_FIELD_KEY_INDEX_BY_ID,
+    SELECT_FIELD_BY_KEY_INDEX,
+    SELECT_FIELDS_BY_KEY_INDEXES,
+    SELECT_FIELDS_WITHOUT_KEY_INDEX,
+    SELECT_DATA_KEY_BY_NAME,
+    INSERT_DATA_KEY,
 )
 
 from core.dtos import FieldDTO
+from core.functions import iter_chunks
 from core.interfaces import IFieldRepository
+from repositories.base_repository import BaseRepository
 from services.security_service import SecurityService
 
 
-class FieldRepository(IFieldRepository):
-    def __init__(self, db_connection=None):
-        self.db_connection = db_connection if db_connection else sqlite3.connect(PATH_DB)
-
-    def add_field(self, field: List[str]) -> None:
+class FieldRepository(BaseRepository, IFieldRepository):
+    table = "fields"
+    def add_field(self, field: List[str]) -> int | None:
+        """Insert a field and return its id (None if it couldn't be stored)."""
         cursor = self.db_connection.cursor()
 
         try:
             cursor.execute(INSERT_FIELD, field)
             self.db_connection.commit()
+            self._mark_changed()
+            return cursor.lastrowid
         except sqlite3.IntegrityError:
-            Logger.warning(f"IntegrityError: INSERT operation attempt failed for key {field.key}. Potential duplication.")
+            Logger.warning("IntegrityError: INSERT operation attempt failed for field. Potential duplication.")
+            return None
         finally:
             cursor.close()
 
-    def delete_field(self, key: str) -> None:
+    def add_fields_bulk(self, batches: Iterable[List[tuple]], updates: Iterable[List[tuple]] = ()) -> None:
+        """
+        Insert batches of (key, value, alias_key, cipher_version, key_index) rows and apply
+        batches of (key, value, alias_key, cipher_version, key_index, id) updates, all in one transaction.
+        """
+        with self.transaction() as conn:
+            for batch in batches:
+                conn.executemany(INSERT_FIELD, batch)
+            for batch in updates:
+                conn.executemany(UPDATE_FIELD_CIPHER_BY_ID, batch)
+        self._mark_changed()
+
+    def delete_field(self, key_index: bytes) -> None:
         cursor = self.db_connection.cursor()
-        cursor.execute(DELETE_FIELD_BY_KEY, (key,))
+        cursor.execute(DELETE_FIELD_BY_KEY_INDEX, (key_index,))
         self.db_connection.commit()
+        self._mark_changed()
         cursor.close()
 
-    def delete_fields(self, keys: List[str]) -> None:
+    def delete_fields(self, key_indexes: List[bytes]) -> None:
         cursor = self.db_connection.cursor()
-        cursor.executemany(DELETE_FIELD_BY_KEY, [(key,) for key in keys])
+        cursor.executemany(DELETE_FIELD_BY_KEY_INDEX, [(key_index,) for key_index in key_indexes])
         self.db_connection.commit()
+        self._mark_changed()
+        cursor.close()
+
+    def load_field_by_key_index(self, key_index: bytes) -> tuple | None:
+        """Row (id, key, value, alias_key, date_added, cipher_version) stored under `key_index`, if any."""
+        cursor = self.db_connection.cursor()
+        cursor.execute(SELECT_FIELD_BY_KEY_INDEX, (key_index,))
+        record = cursor.fetchone()
+        cursor.close()
+
+        return record
+
+    def load_fields_by_key_indexes(self, key_indexes: Iterable[bytes]) -> List[tuple]:
+        """Rows (id, key_index, value, alias_key, cipher_version) stored under any of `key_indexes`."""
+        records = []
+        cursor = self.db_connection.cursor()
+        for chunk in iter_chunks(list(key_indexes), DEFAULT_SQL_IN_CHUNK_SIZE):
+            cursor.execute(SELECT_FIELDS_BY_KEY_INDEXES.format(placeholders=", ".join("?" * len(chunk))), chunk)
+            records.extend(cursor.fetchall())
         cursor.close()
 
+        return records
+
     def load_fields_from_db(self) -> List[FieldDTO]:
         cursor = self.db_connection.cursor()
         cursor.execute(SELECT_ALL_FIELDS)
@@ -48,3 +101,107 @@ class FieldRepository(IFieldRepository):
         cursor.close()
 
         return records #[FieldDTO(key=r[0], value=r[3], alias_key=r[2], date_added=r[3]) for r in records]
+
+    def load_fields_page(
+            self,
+            after_id: int = 0,
+            limit: int = DEFAULT_NUM_ROWS_PAGE,
+            date_from: str | None = None,
+            date_to: str | None = None
+            ) -> List[tuple]:
+        """Rows (id, key, value, alias_key, date_added, cipher_version) after `after_id`, by id."""
+        filters, params = self._make_filters(date_from, date_to)
+
+        cursor = self.db_connection.cursor()
+        cursor.execute(SELECT_FIELDS_PAGE + filters + ORDER_BY_ID_LIMIT, (after_id, *params, limit))
+        records = cursor.fetchall()
+        cursor.close()
+
+        return records
+
+    def load_field_ids(self, date_from: str | None = None, date_to: str | None = None) -> List[int]:
+        """Ids of the filtered rows, in page order."""
+        filters, params = self._make_filters(date_from, date_to)
+
+        cursor = self.db_connection.cursor()
+        cursor.execute(SELECT_FIELD_IDS + filters + ORDER_BY_ID, params)
+        ids = [r[0] for r in cursor.fetchall()]
+        cursor.close()
+
+        return ids
+
+    def count_fields(self, date_from: str | None = None, date_to: str | None = None) -> int:
+        filters, params = self._make_filters(date_from, date_to)
+
+        cursor = self.db_connection.cursor()
+        cursor.execute(COUNT_FIELDS + filters, params)
+        count = cursor.fetchone()[0]
+        cursor.close()
+
+        return count
+
+    @staticmethod
+    def _make_filters(date_from: str | None, date_to: str | None) -> tuple[str, list]:
+        filters, params = "", []
+        if date_from:
+            filters += FILTER_DATE_FROM
+            params.append(date_from)
+        if date_to:
+            filters += FILTER_DATE_TO
+            params.append(date_to)
+
+        return filters, params
+
+    def load_fields_by_cipher(self, cipher_version: int) -> List[tuple]:
+        cursor = self.db_connection.cursor()
+        cursor.execute(SELECT_FIELDS_BY_CIPHER, (cipher_version,))
+        records = cursor.fetchall()
+        cursor.close()
+
+        return records
+
+    def update_fields_cipher(self, fields: List[tuple]) -> None:
+        """Rewrite (key, value, alias_key, cipher_version, key_index, id) rows in one transaction."""
+        cursor = self.db_connection.cursor()
+        try:
+            cursor.executemany(UPDATE_FIELD_CIPHER_BY_ID, fields)
+            self.db_connection.commit()
+            self._mark_changed()
+        except sqlite3.Error:
+            self.db_connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def load_fields_without_key_index(self) -> List[tuple]:
+        """Encrypted (id, key, cipher_version) of the rows stored before keys were indexed."""
+        cursor = self.db_connection.cursor()
+        cursor.execute(SELECT_FIELDS_WITHOUT_KEY_INDEX)
+        records = cursor.fetchall()
+        cursor.close()
+
+        return records
+
+    def update_fields_key_index(self, key_indexes: List[tuple]) -> None:
+        """Set (key_index, id) pairs in one transaction."""
+        with self.transaction() as conn:
+            conn.executemany(UPDATE_FIELD_KEY_INDEX_BY_ID, key_indexes)
+
+    # Data keys
+    def load_wrapped_data_key(self, name: str) -> bytes | None:
+        cursor = self.db_connection.cursor()
+        cursor.execute(SELECT_DATA_KEY_BY_NAME, (name,))
+        record = cursor.fetchone()
+        cursor.close()
+
+        return record[0] if record else None
+
+    def store_wrapped_data_key(self, name: str, wrapped_key: bytes) -> None:
+        cursor = self.db_connection.cursor()
+        try:
+            cursor.execute(INSERT_DATA_KEY, (name, wrapped_key))
+            self.db_connection.commit()
+        except sqlite3.IntegrityError:
+            Logger.warning(f"IntegrityError: INSERT operation attempt failed for data key {name}. Potential duplication.")
+        finally:
+            cursor.close()
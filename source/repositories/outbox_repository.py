@@ -0,0 +1,111 @@
+import sqlite3
+from kivy.logger import Logger
+
+from core.queries import (
+    INSERT_OUTBOX_ITEM,
+    SELECT_DUE_OUTBOX_ITEMS,
+    SELECT_NEXT_OUTBOX_ATTEMPT,
+    COUNT_OUTBOX_ITEMS_BY_STATUS,
+    UPDATE_OUTBOX_ATTEMPT_BY_ID,
+    UPDATE_OUTBOX_DUE_BY_OWNER,
+    UPDATE_OUTBOX_EXPIRED,
+    DELETE_OUTBOX_ITEM_BY_ID,
+)
+from core.enums import OutboxStatus
+from core.interfaces import IOutboxRepository
+from repositories.base_repository import BaseRepository
+
+class OutboxRepository(BaseRepository, IOutboxRepository):
+    table = "outbox"
+
+    def add_items(self, rows: list[tuple[str, str, str, float, float]]) -> int:
+        """Queue (idempotency_key, owner_hash, payload, next_attempt_at, expires_at) rows; known keys are skipped."""
+        try:
+            with self.transaction() as conn:
+                cursor = conn.executemany(INSERT_OUTBOX_ITEM, rows)
+                added = cursor.rowcount
+                cursor.close()
+            self._mark_changed()
+            return added
+        except sqlite3.Error as e:
+            Logger.warning(f"Outbox insert failed: {e}")
+            return 0
+
+    def load_due_items(self, owner_hash: str, now: float, limit: int) -> list[tuple[int, str, int]]:
+        """Pending (id, payload, attempts) rows of the owner due by `now`, oldest first."""
+        cursor = self.db_connection.cursor()
+        try:
+            cursor.execute(SELECT_DUE_OUTBOX_ITEMS, (owner_hash, OutboxStatus.PENDING.value, now, limit))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            Logger.warning(f"Outbox lookup failed: {e}")
+            return []
+        finally:
+            cursor.close()
+
+    def load_next_attempt_at(self, owner_hash: str) -> float | None:
+        cursor = self.db_connection.cursor()
+        try:
+            cursor.execute(SELECT_NEXT_OUTBOX_ATTEMPT, (owner_hash, OutboxStatus.PENDING.value))
+            return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            Logger.warning(f"Outbox lookup failed: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    def count_items_by_status(self, owner_hash: str) -> dict[str, int]:
+        cursor = self.db_connection.cursor()
+        try:
+            cursor.execute(COUNT_OUTBOX_ITEMS_BY_STATUS, (owner_hash,))
+            return dict(cursor.fetchall())
+        except sqlite3.Error as e:
+            Logger.warning(f"Outbox count failed: {e}")
+            return {}
+        finally:
+            cursor.close()
+
+    def update_items(self, rows: list[tuple[str, int, float, str | None, int]]) -> None:
+        """Record attempts as (status, attempts, next_attempt_at, last_error, id) rows."""
+        try:
+            with self.transaction() as conn:
+                conn.executemany(UPDATE_OUTBOX_ATTEMPT_BY_ID, rows).close()
+            self._mark_changed()
+        except sqlite3.Error as e:
+            Logger.warning(f"Outbox update failed: {e}")
+
+    def make_items_due(self, owner_hash: str, now: float) -> int:
+        """Bring the owner's pending rows waiting past `now` forward to it; returns how many."""
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute(UPDATE_OUTBOX_DUE_BY_OWNER, (now, owner_hash, OutboxStatus.PENDING.value, now))
+                advanced = cursor.rowcount
+                cursor.close()
+            if advanced:
+                self._mark_changed()
+            return advanced
+        except sqlite3.Error as e:
+            Logger.warning(f"Outbox update failed: {e}")
+            return 0
+
+    def delete_items(self, ids: list[int]) -> None:
+        try:
+            with self.transaction() as conn:
+                conn.executemany(DELETE_OUTBOX_ITEM_BY_ID, [(item_id,) for item_id in ids]).close()
+            self._mark_changed()
+        except sqlite3.Error as e:
+            Logger.warning(f"Outbox delete failed: {e}")
+
+    def expire_items(self, now: float) -> int:
+        """Mark pending rows whose document expired by `now`; returns how many."""
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute(UPDATE_OUTBOX_EXPIRED, (OutboxStatus.EXPIRED.value, OutboxStatus.PENDING.value, now))
+                expired = cursor.rowcount
+                cursor.close()
+            if expired:
+                self._mark_changed()
+            return expired
+        except sqlite3.Error as e:
+            Logger.warning(f"Outbox expiry failed: {e}")
+            return 0
@@ -0,0 +1,38 @@
+import sqlite3
+from kivy.logger import Logger
+
+from core.queries import (
+    SELECT_PUBKEY_BY_OWNER,
+    UPSERT_PUBKEY,
+    DELETE_PUBKEY_BY_OWNER,
+)
+from core.interfaces import IPubkeyRepository
+from repositories.base_repository import BaseRepository
+
+class PubkeyRepository(BaseRepository, IPubkeyRepository):
+    def load_pubkey(self, owner_hash: str) -> tuple[str, float] | None:
+        cursor = self.db_connection.cursor()
+        try:
+            cursor.execute(SELECT_PUBKEY_BY_OWNER, (owner_hash,))
+            return cursor.fetchone()
+        except sqlite3.Error as e:
+            Logger.warning(f"Pubkey lookup failed: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    def store_pubkey(self, owner_hash: str, pubkey: str, fetched_at: float) -> None:
+        cursor = self.db_connection.cursor()
+        try:
+            cursor.execute(UPSERT_PUBKEY, (owner_hash, pubkey, fetched_at))
+            self.db_connection.commit()
+        except sqlite3.Error as e:
+            Logger.warning(f"Pubkey store failed: {e}")
+        finally:
+            cursor.close()
+
+    def delete_pubkey(self, owner_hash: str) -> None:
+        cursor = self.db_connection.cursor()
+        cursor.execute(DELETE_PUBKEY_BY_OWNER, (owner_hash,))
+        self.db_connection.commit()
+        cursor.close()
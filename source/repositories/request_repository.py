@@ -1,22 +1,22 @@
 import sqlite3
 from kivy.logger import Logger
 
-from core.constant import PATH_DB
 from core.queries import (
     INSERT_REQUEST,
     DELETE_REQUEST_BY_RECEIVERS
 )
 from core.interfaces import IRequestRepository
+from repositories.base_repository import BaseRepository
 
-class RequestRepository(IRequestRepository):
-    def __init__(self, db_connection=None):
-        self.db_connection = db_connection if db_connection else sqlite3.connect(PATH_DB)
+class RequestRepository(BaseRepository, IRequestRepository):
+    table = "requests"
 
     def add_request(self, receivers, keys):
         cursor = self.db_connection.cursor()
         try:
             cursor.execute(INSERT_REQUEST, (receivers, keys))
             self.db_connection.commit()
+            self._mark_changed()
         except sqlite3.IntegrityError:
             Logger.warning(f"IntegrityError: INSERT operation attempt failed \
                             for request {receivers}. Potential duplication.")
@@ -26,6 +26,7 @@ class RequestRepository(IRequestRepository):
         cursor = self.db_connection.cursor()
         cursor.execute(DELETE_REQUEST_BY_RECEIVERS, (receivers,))
         self.db_connection.commit()
+        self._mark_changed()
         cursor.close()
 
         return cursor
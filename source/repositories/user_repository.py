@@ -2,24 +2,34 @@ from typing import List
 import sqlite3
 from kivy.logger import Logger
 
-from core.constant import PATH_DB
+from core.constant import DEFAULT_NUM_ROWS_PAGE
 from core.queries import (
     INSERT_USER,
     SELECT_ALL_USERS,
+    SELECT_ALL_USERS_WITH_IDS,
+    SELECT_USERS_PAGE,
+    COUNT_USERS,
+    FILTER_DATE_FROM,
+    FILTER_DATE_TO,
+    FILTER_USERNAME_PREFIX,
+    ORDER_BY_ID,
+    ORDER_BY_ID_LIMIT,
+    SELECT_USER_IDS,
     DELETE_USER_BY_USERNAME
 )
 from core.interfaces import IUserRepository
+from repositories.base_repository import BaseRepository
 from core.dtos import UserDTO
 
-class UserRepository(IUserRepository):
-    def __init__(self, db_connection=None):
-        self.db_connection = db_connection if db_connection else sqlite3.connect(PATH_DB)
+class UserRepository(BaseRepository, IUserRepository):
+    table = "users"
 
     def add_user(self, user: UserDTO) -> None:
         cursor = self.db_connection.cursor()
         try:
             cursor.execute(INSERT_USER, (user.username, user.email))
             self.db_connection.commit()
+            self._mark_changed()
         except sqlite3.IntegrityError:
             Logger.warning(f"IntegrityError: INSERT operation attempt failed for user {user.username}. Potential duplication.")
         finally:
@@ -30,16 +40,87 @@ class UserRepository(IUserRepository):
         cursor.execute(SELECT_ALL_USERS)
         records = cursor.fetchall()
         cursor.close()
-        return [UserDTO(username=r[0], email=r[1]) for r in records]
+        return [UserDTO(username=r[0], email=r[1], date_added=r[2]) for r in records]
+
+    def load_users_records(self) -> List[tuple]:
+        """Rows (id, username, email, date_added) of every user."""
+        cursor = self.db_connection.cursor()
+        cursor.execute(SELECT_ALL_USERS_WITH_IDS)
+        records = cursor.fetchall()
+        cursor.close()
+
+        return records
+
+    def load_users_page(
+            self,
+            after_id: int = 0,
+            limit: int = DEFAULT_NUM_ROWS_PAGE,
+            username_prefix: str | None = None,
+            date_from: str | None = None,
+            date_to: str | None = None
+            ) -> List[tuple]:
+        """Rows (id, username, email, date_added) after `after_id`, by id."""
+        filters, params = self._make_filters(username_prefix, date_from, date_to)
+
+        cursor = self.db_connection.cursor()
+        cursor.execute(SELECT_USERS_PAGE + filters + ORDER_BY_ID_LIMIT, (after_id, *params, limit))
+        records = cursor.fetchall()
+        cursor.close()
+
+        return records
+
+    def load_user_ids(self, username_prefix: str | None = None, date_from: str | None = None, date_to: str | None = None) -> List[int]:
+        """Ids of the filtered rows, in page order."""
+        filters, params = self._make_filters(username_prefix, date_from, date_to)
+
+        cursor = self.db_connection.cursor()
+        cursor.execute(SELECT_USER_IDS + filters + ORDER_BY_ID, params)
+        ids = [r[0] for r in cursor.fetchall()]
+        cursor.close()
+
+        return ids
+
+    def count_users(
+            self,
+            username_prefix: str | None = None,
+            date_from: str | None = None,
+            date_to: str | None = None
+            ) -> int:
+        filters, params = self._make_filters(username_prefix, date_from, date_to)
+
+        cursor = self.db_connection.cursor()
+        cursor.execute(COUNT_USERS + filters, params)
+        count = cursor.fetchone()[0]
+        cursor.close()
+
+        return count
+
+    @staticmethod
+    def _make_filters(username_prefix: str | None, date_from: str | None, date_to: str | None) -> tuple[str, list]:
+        filters, params = "", []
+        if username_prefix:
+            # Range instead of LIKE so the username index is used
+            filters += FILTER_USERNAME_PREFIX
+            params += [username_prefix, username_prefix[:-1] + chr(ord(username_prefix[-1]) + 1)]
+        if date_from:
+            filters += FILTER_DATE_FROM
+            params.append(date_from)
+        if date_to:
+            filters += FILTER_DATE_TO
+            params.append(date_to)
+
+        return filters, params
 
     def delete_user(self, username: str) -> None:
         cursor = self.db_connection.cursor()
         cursor.execute(DELETE_USER_BY_USERNAME, (username,))
         self.db_connection.commit()
+        self._mark_changed()
         cursor.close()
 
     def delete_users(self, usernames: List[str]) -> None:
         cursor = self.db_connection.cursor()
         cursor.executemany(DELETE_USER_BY_USERNAME, [(username,) for username in usernames])
         self.db_connection.commit()
+        self._mark_changed()
         cursor.close()
\ No newline at end of file
@@ -0,0 +1,65 @@
+from kivy.metrics import dp
+from kivymd.uix.snackbar import MDSnackbar
+
+from core import tracing
+from core.classes import EnhancedTableMDScreen
+from core.constant import (
+    DEFAULT_ROW_REST_WIDTH,
+    DEFAULT_ROW_VALUE_WIDTH,
+    SCREEN_NAME_DIAGNOSTICS,
+)
+
+class DiagnosticsScreen(EnhancedTableMDScreen):
+    """Operation timings recorded by core.tracing, slowest (by p95) first."""
+    def __init__(self, **kwargs):
+        super().__init__(name=SCREEN_NAME_DIAGNOSTICS, **kwargs)
+
+    # ----- UI entrypoints -----
+    def set_recording(self, active: bool):
+        tracing.set_enabled(active)
+
+    def refresh_timings(self):
+        self._update_table()
+
+    def reset_timings(self):
+        tracing.reset()
+        self._update_table()
+
+    def export_timings(self):
+        try:
+            path = tracing.export_json()
+        except OSError as e:
+            MDSnackbar(f"Timings could not be exported: {e}").open()
+            return
+        MDSnackbar(f"Timings exported to {path}").open()
+
+    # Screen transitions
+    def go_to_fields_screen(self):
+        self.manager.go_to_fields_screen("left")
+
+    # Screens callback
+    def on_enter(self):
+        self.ids.recording_switch.active = tracing.is_enabled()
+        self._initialize_table([
+            ("Operation", dp(DEFAULT_ROW_VALUE_WIDTH)),
+            ("Calls", dp(DEFAULT_ROW_REST_WIDTH)),
+            ("p50 (ms)", dp(DEFAULT_ROW_REST_WIDTH)),
+            ("p95 (ms)", dp(DEFAULT_ROW_REST_WIDTH)),
+            ("Max (ms)", dp(DEFAULT_ROW_REST_WIDTH)),
+            ("Total (ms)", dp(DEFAULT_ROW_REST_WIDTH)),
+            ])
+        self._update_table()
+
+    # ----- Internal methods -----
+    def _update_table(self):
+        self.main_table.row_data = [
+            (
+                stat["name"],
+                str(stat["count"]),
+                f"{stat['p50_s'] * 1000:.1f}",
+                f"{stat['p95_s'] * 1000:.1f}",
+                f"{stat['max_s'] * 1000:.1f}",
+                f"{stat['total_s'] * 1000:.0f}",
+            )
+            for stat in tracing.get_stats()
+        ]
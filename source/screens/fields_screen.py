@@ -1,7 +1,11 @@
 # --- source/fields_screen.py ---
 
-from kivy.lang import Builder
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from kivy.metrics import dp
+from kivy.logger import Logger
 from kivymd.uix.button import MDRaisedButton
 from kivymd.uix.snackbar import MDSnackbar
 from kivymd.uix.dialog import MDDialog
@@ -13,9 +17,6 @@ from core.constant import (
     DEFAULT_ROW_VALUE_WIDTH,
     DEFAULT_ROW_REST_WIDTH,
     SCREEN_NAME_FIELDS,
-    PATH_SCHEMA_FIELD_DIALOG,
-    PATH_SCHEMA_SEND_EMAIL_DIALOG,
-    PATH_SCHEMA_SELECT_CHANNEL_DIALOG,
 )
 
 from core.enums import StatusDataSentDb
@@ -28,23 +29,33 @@ from core.classes import (
 )
 
 from core.functions import information_panel
+from core import startup_profile
+from core.virtual_table import KeysetDataSource
 
-from services.field_service import FieldService
-from services.email_service import EmailService
-from services.cloud_service import CloudService
 from core.session import Session
 
+if TYPE_CHECKING:
+    from services.field_service import FieldService
+    from services.email_service import EmailService
+    from services.cloud_service import CloudService
+    from controller.app_controller import AppController
+
 class FieldsScreen(EnhancedTableMDScreen):
-    def __init__(self, field_service: FieldService, session: Session, email_service: EmailService, cloud_service: CloudService, **kwargs):
+    def __init__(self, field_service: FieldService, session: Session, email_service: EmailService, cloud_service: CloudService, controller: AppController, **kwargs):
         super().__init__(name=SCREEN_NAME_FIELDS, **kwargs)
         self.field_service = field_service
         self.session = session
         self.cloud_service = cloud_service
         self.email_service = email_service
+        self.controller = controller
+
+        # Building the table's data source, off the UI thread
+        self._table_task = None
         
-        self.field_dialog = Builder.load_file(PATH_SCHEMA_FIELD_DIALOG)  # Load the dialog definition
-        self.email_dialog = Builder.load_file(PATH_SCHEMA_SEND_EMAIL_DIALOG)  # Load the dialog definition
-        self.select_channel_dialog = Builder.load_file(PATH_SCHEMA_SELECT_CHANNEL_DIALOG)  # Load the dialog definition
+        # Dialog KV rules are compiled with the screen (see KV_PATHS_BY_SCREEN)
+        self.field_dialog = None
+        self.email_dialog = None
+        self.select_channel_dialog = None
         
     def open_add_dialog(self):
         self.field_dialog = MDDialog(
@@ -64,10 +75,8 @@ class FieldsScreen(EnhancedTableMDScreen):
 
         if key and value:
             alias_key = key or self._get_ui_new_alias_key()
-
+            # The dialog closes once the field is stored
             self._add_field(key, value, alias_key)
-            self.field_dialog.dismiss()
-            MDSnackbar(f"Field '{key}' added successfully!").open()
         else:
             MDSnackbar("Both Key and Value are required.").open()
 
@@ -117,9 +126,9 @@ class FieldsScreen(EnhancedTableMDScreen):
             if hasattr(self.select_channel_dialog.content_cls, "ids") and "checked_channel" in self.select_channel_dialog.content_cls.ids:
                 self._set_ui_channel_name(text)  # Update label text
             else:
-                print("checked_channel not found in select_channel_dialog.content_cls.ids")
+                Logger.warning("checked_channel not found in select_channel_dialog.content_cls.ids")
         else:
-            print("select_channel_dialog is not initialized")
+            Logger.warning("select_channel_dialog is not initialized")
 
         self.menu_channel.dismiss()  # Close menu
 
@@ -132,21 +141,26 @@ class FieldsScreen(EnhancedTableMDScreen):
             # Obtener datos de la tabla
             rows = self._get_checked_fields()
             
-            results = self._upload_data(
+            # Upload runs in background; the result is shown when it is done
+            self._upload_data(
                 rows, 
                 self.session.get_email(), 
                 self.session.get_checked_users(), 
                 False
                 )
-            self.show_channel_result(results)
+            MDSnackbar("Sending data...").open()
         
         if channel_name != "Cloud":
             return
         
     def show_channel_result(self, results):
         if results:
-            insertions = [user for user, status in results.items() if status != StatusDataSentDb.STORED]
-            MDSnackbar(f"Stored {len(insertions)} of {len(results)} data documents").open()
+            insertions = [user for user, status in results.items() if status == StatusDataSentDb.STORED]
+            queued = [user for user, status in results.items() if status == StatusDataSentDb.QUEUED]
+            message = f"Stored {len(insertions)} of {len(results)} data documents"
+            if queued:
+                message += f", {len(queued)} queued to send when the cloud is reachable"
+            MDSnackbar(message).open()
         else:
             insertions = []
 
@@ -179,11 +193,13 @@ class FieldsScreen(EnhancedTableMDScreen):
             information_panel("Action: sending email", "No requested keys or filename provided")
             return
 
-        # Send email
-        self.email_service.send_email_with_fields(
+        # Send email in background
+        self.controller.send_email_with_fields(
             fields, 
             self.session.get_checked_users(), 
             filename, 
+            on_result=lambda _: information_panel("Action: sending email", "Email sent successfully"),
+            on_error=lambda e: information_panel("Action: sending email", f"Error at sending: {str(e)}"),
             )
 
     def close_email_dialog(self):
@@ -201,16 +217,34 @@ class FieldsScreen(EnhancedTableMDScreen):
     def go_to_requests_screen(self):
         self.manager.go_to_requests_screen("right")
 
+    def go_to_diagnostics_screen(self):
+        self.manager.go_to_diagnostics_screen("right")
+
+    def logout(self):
+        # Decrypted rows must not outlive the session
+        self._clear_table()
+        self._table_task = None
+        self.controller.logout()
+        self.manager.go_to_login_screen("right")
+
     def toggle_password_visibility(self):
         field = self.select_channel_dialog.content_cls.ids.secret_key
         field.password = not field.password
         field.icon_right = "eye" if not field.password else "eye-off"
     
     def _upload_data(self, data_rows: list, email: str, users: list, on_request=False):
-        self.cloud_service.upload_data(data_rows, email, users, on_request)
+        return self.controller.upload_data(
+            data_rows, 
+            email, 
+            users, 
+            on_request,
+            on_result=self.show_channel_result,
+            on_error=lambda e: MDSnackbar(f"Error at sending data: {str(e)}").open(),
+            )
 
     def on_enter(self):
         self._load_table_from_db()
+        startup_profile.mark_next_frame(startup_profile.MARK_FIELDS_SCREEN, since=startup_profile.MARK_LOGIN_SUBMITTED)
         
     # ----- Internal methods -----
     def _get_checked_fields(self) -> list[str]:
@@ -246,17 +280,34 @@ class FieldsScreen(EnhancedTableMDScreen):
         keys = self._delete_rows()
         
         if not keys:
-            MDSnackbar(f"No keys selected.").open()
+            MDSnackbar("No keys selected.").open()
             return
         
-        self.field_service.delete_fields(keys)
+        self.controller.delete_fields(
+            keys,
+            on_result=lambda _: self._refresh_table(),
+            on_error=lambda e: MDSnackbar(f"Error at deleting fields: {str(e)}").open(),
+            )
     
     #def _get_checked_keys(self):
     #    return self._get_cells_from_checked_rows(0, True)
 
     def _add_field(self, key, value, alias_key=""):
-        self.field_service.create_field(key, value, alias_key)
+        """Store the field in the background, then show it, or that its key is already stored."""
+        self.controller.create_field(
+            key, value, alias_key,
+            on_result=lambda field_id: self._on_field_added(key, value, alias_key, field_id),
+            on_error=lambda e: MDSnackbar(f"Error at adding field: {str(e)}").open(),
+            )
+
+    def _on_field_added(self, key, value, alias_key, field_id: int | None):
+        if field_id is None:
+            MDSnackbar(f"Field '{key}' already exists.").open()
+            return
         self._add_row((key, value, alias_key, "today"))
+        if self.field_dialog:
+            self.field_dialog.dismiss()
+        MDSnackbar(f"Field '{key}' added successfully!").open()
 
     def _load_table_from_db(self):
         column_data = [
@@ -266,8 +317,34 @@ class FieldsScreen(EnhancedTableMDScreen):
             ("Date", dp(DEFAULT_ROW_REST_WIDTH)),
             ]
         
-        fields_data = self.field_service.get_all_fields()
-        self._initialize_table(column_data, fields_data)
+        if self.main_table:
+            # No-op unless the table changed since the screen was last shown
+            self._refresh_table()
+            return
+        if self._table_task is not None:
+            return
+
+        # Only the visible pages are loaded (and decrypted), like the ids, on
+        # the executor: queries, decryption and the legacy migration never block a frame
+        executor = self.controller.get_executor()
+
+        def on_data_source(data_source):
+            self._table_task = None
+            self._initialize_table(column_data, data_source=data_source, executor=executor)
+
+        def on_error(e):
+            self._table_task = None
+            MDSnackbar(f"Error at loading fields: {str(e)}").open()
+
+        self._table_task = executor.submit(
+            KeysetDataSource,
+            self.field_service.get_field_ids,
+            self.field_service.get_fields_page,
+            self.field_service.get_data_version,
+            on_result=on_data_source,
+            on_error=on_error,
+            name="load_fields",
+            )
 
     def _initialize_ui_file_formats(self):
         menu_items = [
@@ -277,7 +354,6 @@ class FieldsScreen(EnhancedTableMDScreen):
             }
             for format in FILE_FORMATS
         ]
-        print(f"self.email_dialog.content_cls - {self.email_dialog.content_cls.ids}")
         self.menu_formats = MDDropdownMenu(
             caller=self.email_dialog.content_cls.ids.file_format_dropdown,
             items=menu_items,
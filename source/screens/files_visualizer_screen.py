@@ -1,13 +1,11 @@
+from kivy.clock import Clock
 from kivy.metrics import dp
 from kivy.logger import Logger
 from kivymd.uix.snackbar import MDSnackbar
 from kivymd.uix.menu import MDDropdownMenu
 
-from core.functions import (
-    get_json_files,
-    load_file_of_fields,
-    check_new_json_files
-)
+from core.file_catalog import FileCatalog
+from core.virtual_table import ListDataSource, PagedDataSource
 
 from core.classes import (
     EnhancedTableMDScreen
@@ -20,9 +18,10 @@ from core.constant import (
 )
 
 class FilesVisualizerScreen(EnhancedTableMDScreen):
-    def __init__(self, **kwargs):
+    def __init__(self, file_catalog: FileCatalog, **kwargs):
         super().__init__(name=SCREEN_NAME_FILES_VISUALIZER, **kwargs)
 
+        self.file_catalog = file_catalog
         self.dialog = None
         self.selected_file = ""
         self.json_files = []
@@ -41,10 +40,7 @@ class FilesVisualizerScreen(EnhancedTableMDScreen):
 
         self.selected_file = filename
         try:
-            raw_data: dict[str, str] = load_file_of_fields(filename)
-            data = raw_data.get("data", {})
-
-            self._update_table(data)
+            self._update_table(self._make_data_source(filename))
         except Exception as e:
             Logger.error(f"Error loading JSON: {e}")
             MDSnackbar("Error loading file.")
@@ -57,15 +53,18 @@ class FilesVisualizerScreen(EnhancedTableMDScreen):
     def on_enter(self):
         """Called when the screen is entered, ensuring UI is loaded before creating menu."""
         self._initialize_empty_table()
-        if check_new_json_files(self.json_files):
-            self.json_files = get_json_files()
+        self.json_files = self.file_catalog.files()
 
         # Ensure menu is only created once after UI loads
         if self.menu is None:
             self.menu = self._create_menu()
 
+        # Indexes new downloads in the background while the screen is shown
+        self.file_catalog.start_watching(on_change=lambda: Clock.schedule_once(lambda _: self._on_files_changed(), 0))
+
     def on_leave(self):
         self.selected_file = ""
+        self.file_catalog.stop_watching()
 
     # ----- Internal methods -----
     def _initialize_empty_table(self):
@@ -78,13 +77,25 @@ class FilesVisualizerScreen(EnhancedTableMDScreen):
         
         self._initialize_table(column_data)
 
+    def _on_files_changed(self):
+        self.json_files = self.file_catalog.files()
+        if self.menu is not None:
+            self.menu.items = self._make_menu_items()
+
     def _create_menu(self):
         """Create a dropdown menu with available JSON files."""
         if not hasattr(self.ids, "menu_button"):
             Logger.error("menu_button is missing in self.ids!")
             return None
 
-        menu_items = [
+        return MDDropdownMenu(
+            caller=self.ids.menu_button,  # Now it will be available
+            items=self._make_menu_items(),
+            width_mult=4,
+        )
+
+    def _make_menu_items(self) -> list[dict]:
+        return [
             {
                 "text": f,
                 "viewclass": "OneLineListItem",
@@ -92,14 +103,16 @@ class FilesVisualizerScreen(EnhancedTableMDScreen):
             }
             for f in self.json_files
         ]
-        return MDDropdownMenu(
-            caller=self.ids.menu_button,  # Now it will be available
-            items=menu_items,
-            width_mult=4,
-        )
-    
-    def _update_table(self, data: dict):
+
+    def _make_data_source(self, filename: str):
+        """Rows parsed once per file version; very large files are read page by page as they scroll into view."""
+        entry = self.file_catalog.get_current(filename)
+        if entry.error:
+            raise ValueError(entry.error)
+        if not self.file_catalog.is_streamed(entry):
+            return ListDataSource(self.file_catalog.get_rows(filename))
+        return PagedDataSource(entry.n_fields, lambda offset, limit: self.file_catalog.read_rows(filename, offset, limit))
+
+    def _update_table(self, data_source):
         """Update the table with new data."""
-        self.main_table.row_data = []
-        for key, value in data.items():
-            self.main_table.add_row((key, str(value)))
\ No newline at end of file
+        self.main_table.set_data_source(data_source)
\ No newline at end of file
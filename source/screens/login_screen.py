@@ -1,61 +1,75 @@
 # --- source/login_screen.py ---
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import logging
 from kivymd.uix.snackbar import MDSnackbar
 
 from core.classes import EnhancedMDScreen
 from core.functions import enter_message
+from core import startup_profile
 from core.session import Session
-from services.cloud_service import CloudService
-from services.security_service import SecurityService
 
 from core.constant import SCREEN_NAME_LOGIN
 
+if TYPE_CHECKING:
+    from controller.app_controller import AppController
+    from services.cloud_service import CloudService
+    from services.security_service import SecurityService
+
 class LoginScreen(EnhancedMDScreen):
-    def __init__(self, session: Session, security_service: SecurityService, cloud_service: CloudService, **kwargs):
+    def __init__(self, session: Session, security_service: SecurityService, cloud_service: CloudService, controller: AppController, **kwargs):
         super().__init__(name=SCREEN_NAME_LOGIN, **kwargs)
-        
+
         self.session = session
         self.security_service = security_service
         self.cloud_service = cloud_service
+        self.controller = controller
+
+        self.login_task = None
 
     def check_login(self):
+        # Ignore repeated presses while a login is in progress
+        if self.login_task and not self.login_task.done():
+            return
+
         # Get credentials from UI
         username = self._get_ui_username()
         password = self._get_ui_password()
-        logging.debug(f"check_login - _get_ui_...: username: {username}, password: {password}")
 
-        self.security_service.generate_keys_from_secrets(password, username)
-        
-        #session.save_cryptographic_keys()
+        startup_profile.mark(startup_profile.MARK_LOGIN_SUBMITTED)
+
+        # Credentials check, key derivation and registration check run in background
+        self._set_ui_busy(True, "Logging in...")
+        self.login_task = self.controller.login(
+            username,
+            password,
+            on_result=self._on_login_result,
+            on_error=self._on_login_error,
+            on_progress=self._on_login_progress,
+            )
 
-        # Try login
-        login_succesful = self.session.try_login(username, password)
+    def _on_login_result(self, result: tuple[bool, bool]):
+        self._set_ui_busy(False)
+        login_succesful, is_registered = result
 
         if login_succesful:
             logging.info(f"User logged-in by input credentials.")
-
-            # Check if the user is already registered
-            logging.info(f"session.get_email() : {self.session.get_email()}")
-            
-            is_registered = self._check_owner_registered(self.session.get_email())
             logging.info(f"{enter_message(True, is_registered)}. Going to home screen")
-            
-            # Load cryptographic keys
-            #session.load_cryptographic_keys()
-            
-            # Remove the user creation screen after successful registration
-            self._load_other_screens()
-
-            # Remove the login screen after validating credentials and 
-            # pressing the login button
+
+            # The Fields screen is built on this first visit
             self._go_to_fields_screen()
         else:
             MDSnackbar("Invalid credentials").open()
-    
-    # Owner registration checker
-    def _check_owner_registered(self, email: str) -> bool:
-        return self.cloud_service.is_owner_registered(email)
+
+    def _on_login_error(self, error: Exception):
+        self._set_ui_busy(False)
+        MDSnackbar("Login failed. Try again.").open()
+
+    def _on_login_progress(self, progress: float, message: str):
+        self._set_ui_status(message)
 
     #  ----- UI entrypoints -----
     # UI Getters
@@ -65,10 +79,15 @@ class LoginScreen(EnhancedMDScreen):
     def _get_ui_password(self) -> str:
         return self.ids.password_input.text.strip()
 
+    # UI Setters
+    def _set_ui_busy(self, busy: bool, message: str = ""):
+        self.ids.login_button.disabled = busy
+        self._set_ui_status(message)
+
+    def _set_ui_status(self, message: str):
+        self.ids.status_label.text = message
+
     # Screen Manager
-    def _load_other_screens(self):
-        self.manager.load_other_screens()
-    
     def _go_to_fields_screen(self):
         self.manager.go_to_fields_screen("left")
 
@@ -76,4 +95,4 @@ class LoginScreen(EnhancedMDScreen):
     def on_leave(self):
         # Load the services
         #self.manager.load_services()
-        pass
\ No newline at end of file
+        pass
@@ -1,6 +1,9 @@
 # --- source/requests_screen.py ---
 
-from kivy.lang import Builder
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from kivy.metrics import dp
 from kivymd.uix.button import MDRaisedButton
 from kivymd.uix.snackbar import MDSnackbar
@@ -15,21 +18,22 @@ from core.constant import (
     DEFAULT_ROW_KEY_WIDTH,
     DEFAULT_ROW_VALUE_WIDTH,
     SCREEN_NAME_REQUESTS,
-    PATH_SCHEMA_REQUEST_DIALOG,
 )
-from services.email_service import EmailService
-from services.request_service import RequestService
 from core.session import Session
 from core.functions import information_panel
 
+if TYPE_CHECKING:
+    from services.email_service import EmailService
+    from services.request_service import RequestService
+    from controller.app_controller import AppController
+
 class RequestsScreen(EnhancedTableMDScreen):
-    def __init__(self, request_service: RequestService, session: Session, email_service: EmailService, **kwargs):
+    def __init__(self, request_service: RequestService, session: Session, email_service: EmailService, controller: AppController, **kwargs):
         super().__init__(name=SCREEN_NAME_REQUESTS, **kwargs)
         self.request_service = request_service
         self.email_service = email_service
         self.session = session
-
-        Builder.load_file(PATH_SCHEMA_REQUEST_DIALOG)
+        self.controller = controller
 
         self.request_dialog = None
         self.email_dialog = None
@@ -94,10 +98,15 @@ class RequestsScreen(EnhancedTableMDScreen):
         # Load the services
         users: list = self.session.get_checked_users()
 
-        # Send email
-        self.email_service.send_email_with_fields(requested_keys, users, filename)
+        # Send email in background
+        self.controller.send_email_with_fields(
+            requested_keys, 
+            users, 
+            filename,
+            on_result=lambda _: information_panel("Action: sending email", "Email sent successfully"),
+            on_error=lambda e: information_panel("Action: sending email", f"Error at sending: {str(e)}"),
+            )
 
-        information_panel("Action: sending email", "Email sent successfully")
         self.email_dialog.dismiss()
 
     # ----- UI Methods -----
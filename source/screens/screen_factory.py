@@ -1,36 +1,37 @@
 # core/screen_factory.py
 
-# Screens
-from screens.fields_screen import FieldsScreen
-from screens.user_creation_screen import UserCreationScreen
-from screens.users_screen import UsersScreen
-from screens.files_visualizer_screen import FilesVisualizerScreen
-from screens.login_screen import LoginScreen
-from screens.requests_screen import RequestsScreen
-
 # Dependency inyection
 from core.dependency_container import DependencyContainer
 
+# Screen modules are imported by their factory, so startup only pays for the first screen
 class ScreenFactory():
     @staticmethod
     def create_user_creation_screen():
+        from screens.user_creation_screen import UserCreationScreen
+
         session = DependencyContainer.get("session")
-        security = DependencyContainer.get("security_service")
-        cloud = DependencyContainer.get("cloud_service")
+        security = DependencyContainer.lazy("security_service")
+        cloud = DependencyContainer.lazy("cloud_service")
+        controller = DependencyContainer.get("controller")
 
-        return UserCreationScreen(session, security, cloud)
+        return UserCreationScreen(session, security, cloud, controller)
 
     @staticmethod
     def create_fields_screen():
+        from screens.fields_screen import FieldsScreen
+
         field = DependencyContainer.get("field_service")
         session = DependencyContainer.get("session")
         cloud = DependencyContainer.get("cloud_service")
         email = DependencyContainer.get("email_service")
+        controller = DependencyContainer.get("controller")
 
-        return FieldsScreen(field, session, email, cloud)
+        return FieldsScreen(field, session, email, cloud, controller)
 
     @staticmethod
     def create_users_screen():
+        from screens.users_screen import UsersScreen
+
         user = DependencyContainer.get("user_service")
         session = DependencyContainer.get("session")
 
@@ -38,20 +39,36 @@ class ScreenFactory():
 
     @staticmethod
     def create_login_screen():
+        from screens.login_screen import LoginScreen
+
         session = DependencyContainer.get("session")
-        security = DependencyContainer.get("security_service")
-        cloud = DependencyContainer.get("cloud_service")
+        security = DependencyContainer.lazy("security_service")
+        cloud = DependencyContainer.lazy("cloud_service")
+        controller = DependencyContainer.get("controller")
 
-        return LoginScreen(session, security, cloud)
+        return LoginScreen(session, security, cloud, controller)
 
     @staticmethod
     def create_files_visualizer_screen():
-        return FilesVisualizerScreen()
+        from screens.files_visualizer_screen import FilesVisualizerScreen
+
+        file_catalog = DependencyContainer.get("file_catalog")
+
+        return FilesVisualizerScreen(file_catalog)
+
+    @staticmethod
+    def create_diagnostics_screen():
+        from screens.diagnostics_screen import DiagnosticsScreen
+
+        return DiagnosticsScreen()
 
     @staticmethod
     def create_requests_screen():
+        from screens.requests_screen import RequestsScreen
+
         request = DependencyContainer.get("request_service")
         session = DependencyContainer.get("session")
         email = DependencyContainer.get("email_service")
+        controller = DependencyContainer.get("controller")
 
-        return RequestsScreen(request, session, email)
+        return RequestsScreen(request, session, email, controller)
@@ -1,6 +1,8 @@
 # --- screen/screen_manager.py ---
 
-from kivy.uix.screenmanager import SlideTransition
+import time
+
+from kivy.uix.screenmanager import Screen, SlideTransition
 from kivy.logger import Logger
 from kivy.lang import Builder
 
@@ -15,67 +17,86 @@ from core.constant import (
     SCREEN_NAME_REQUESTS,
     SCREEN_NAME_USERS,
     SCREEN_NAME_FILES_VISUALIZER,
-    KV_PATHS_OTHERS,
-    PATH_SCHEMA_LOGIN,
-    PATH_SCHEMA_USER_CREATION,
+    SCREEN_NAME_DIAGNOSTICS,
+    KV_PATHS_BY_SCREEN,
 )
 
 class RootScreenManager(EnhancedScreenManager):
+    """
+    Screens are registered by name and only built, with their KV files
+    compiled, the first time they are navigated to.
+    """
     def __init__(self, session: Session, **kwargs):
         super().__init__(**kwargs)
 
         self.session = session
 
+        self._screen_factories = {
+            SCREEN_NAME_LOGIN: ScreenFactory.create_login_screen,
+            SCREEN_NAME_USER_CREATION: ScreenFactory.create_user_creation_screen,
+            SCREEN_NAME_FIELDS: ScreenFactory.create_fields_screen,
+            SCREEN_NAME_USERS: ScreenFactory.create_users_screen,
+            SCREEN_NAME_REQUESTS: ScreenFactory.create_requests_screen,
+            SCREEN_NAME_FILES_VISUALIZER: ScreenFactory.create_files_visualizer_screen,
+            SCREEN_NAME_DIAGNOSTICS: ScreenFactory.create_diagnostics_screen,
+        }
+        self._loaded_kv_paths = set()
+
         # Start the first screen
         self._start_login_or_signup()
 
     def load_user_creation_screen(self):
-        Builder.load_file(PATH_SCHEMA_USER_CREATION)
-        self.add_widget(ScreenFactory.create_user_creation_screen())
-        self.current = SCREEN_NAME_USER_CREATION
+        self._switch_to(SCREEN_NAME_USER_CREATION)
     
     def load_login_screen(self):
-        Builder.load_file(PATH_SCHEMA_LOGIN)
-        self.add_widget(ScreenFactory.create_login_screen())
-        self.current = SCREEN_NAME_LOGIN
+        self._switch_to(SCREEN_NAME_LOGIN)
+
+    def ensure_screen(self, name: str) -> Screen:
+        """The screen called `name`, built (and its KV compiled) if this is its first use."""
+        if self.has_screen(name):
+            return self.get_screen(name)
 
-    def load_other_screens(self):
-        # Load business concerned KV files
-        for path in KV_PATHS_OTHERS:
-            Builder.load_file(path)
+        start = time.perf_counter()
+        for path in KV_PATHS_BY_SCREEN.get(name, []):
+            # Shared dialog KV files must only be compiled once
+            if path not in self._loaded_kv_paths:
+                Builder.load_file(path)
+                self._loaded_kv_paths.add(path)
 
-        # Add the ui widgets
-        self.add_widget(ScreenFactory.create_fields_screen())
-        self.add_widget(ScreenFactory.create_users_screen())
-        self.add_widget(ScreenFactory.create_requests_screen())
-        self.add_widget(ScreenFactory.create_files_visualizer_screen())
+        screen = self._screen_factories[name]()
+        self.add_widget(screen)
+        Logger.debug(f"Screen '{name}' built in {time.perf_counter() - start:.3f}s")
+        return screen
 
     # Screen transitions
     def go_to_users_screen(self, direction):
-        self.transition = SlideTransition(direction=direction, duration=0.4)
-        self.current = SCREEN_NAME_USERS
+        self._switch_to(SCREEN_NAME_USERS, direction)
 
     def go_to_requests_screen(self, direction):
-        self.transition = SlideTransition(direction=direction, duration=0.4)
-        self.current = SCREEN_NAME_REQUESTS
+        self._switch_to(SCREEN_NAME_REQUESTS, direction)
 
     def go_to_fields_screen(self, direction):
-        self.transition = SlideTransition(direction=direction, duration=0.4)
-        self.current = SCREEN_NAME_FIELDS
+        self._switch_to(SCREEN_NAME_FIELDS, direction)
 
     def go_to_user_creation_screen(self, direction):
-        self.transition = SlideTransition(direction=direction, duration=0.4)
-        self.current = SCREEN_NAME_USER_CREATION
+        self._switch_to(SCREEN_NAME_USER_CREATION, direction)
 
     def go_to_login_screen(self, direction):
-        self.transition = SlideTransition(direction=direction, duration=0.4)
-        self.current = SCREEN_NAME_LOGIN
+        self._switch_to(SCREEN_NAME_LOGIN, direction)
 
     def go_to_files_visualizer_screen(self, direction):
-        self.transition = SlideTransition(direction=direction, duration=0.4)
-        self.current = SCREEN_NAME_FILES_VISUALIZER
+        self._switch_to(SCREEN_NAME_FILES_VISUALIZER, direction)
+
+    def go_to_diagnostics_screen(self, direction):
+        self._switch_to(SCREEN_NAME_DIAGNOSTICS, direction)
     
    # ----- Internal methods -----
+    def _switch_to(self, name: str, direction: str | None = None):
+        self.ensure_screen(name)
+        if direction:
+            self.transition = SlideTransition(direction=direction, duration=0.4)
+        self.current = name
+
     def _start_login_or_signup(self):
 
         if self.session.is_owner_creds_active() \
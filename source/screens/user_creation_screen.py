@@ -1,5 +1,9 @@
 # --- source/user_creation_screen.py ---
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import logging
 from kivymd.uix.dialog import MDDialog
 
@@ -17,16 +21,20 @@ from core.constant import (
     CONTINUE_FOR_TESTING
 )
 
-from services.security_service import SecurityService
-from services.cloud_service import CloudService
 from core.session import Session
 
+if TYPE_CHECKING:
+    from services.security_service import SecurityService
+    from services.cloud_service import CloudService
+    from controller.app_controller import AppController
+
 class UserCreationScreen(EnhancedMDScreen):
-    def __init__(self, session: Session, security_service: SecurityService, cloud_service: CloudService, **kwargs):
+    def __init__(self, session: Session, security_service: SecurityService, cloud_service: CloudService, controller: AppController, **kwargs):
         super().__init__(name=SCREEN_NAME_USER_CREATION, **kwargs)
         self.session = session
         self.cloud_service = cloud_service
         self.security_service = security_service
+        self.controller = controller
     
     # ----- Internal methods -----
     def _create_user(self):
@@ -39,22 +47,32 @@ class UserCreationScreen(EnhancedMDScreen):
         email, username, password, *_ = ui_inputs
         
         self._cache_session_credentials(email, username, password)
-        self._generate_cryptographic_keys(password, username)
 
-        _ = self._upload_user(email)
+        # Credentials storage, key generation and cloud registration run in background
+        self._set_ui_busy(True, "Creating user...")
+        self.controller.create_owner(
+            email,
+            username,
+            password,
+            on_result=self._on_user_created,
+            on_error=self._on_user_creation_error,
+            on_progress=lambda _, message: self._set_ui_status(message),
+            )
+
+    def _on_user_created(self, is_stored: bool):
         #if success_store or CONTINUE_FOR_TESTING:
-        # Store previously validated user credentials
-        self._store_cached_credentials()
-        
-        # Store previously generated cryptographic keys
-        self._save_user_signature(username, email, password)
-        
+        self._set_ui_busy(False)
+
         # Login screen
         self._go_to_login_screen()
 
         self._show_dialog("Success", "User created successfully!")
         #self._show_dialog("Error", "Invalid username or email. Choose another.")
 
+    def _on_user_creation_error(self, error: Exception):
+        self._set_ui_busy(False)
+        self._show_dialog("Error", "User could not be created. Try again.")
+
     def _get_ui_inputs(self):
         email = self._get_ui_email()
         username = self._get_ui_username()
@@ -107,35 +125,26 @@ class UserCreationScreen(EnhancedMDScreen):
     
     def _get_ui_confirm_password(self):
         return self.ids.confirm_password_input.text.strip()
+
+    # UI Setters
+    def _set_ui_busy(self, busy: bool, message: str = ""):
+        self.ids.create_button.disabled = busy
+        self._set_ui_status(message)
+
+    def _set_ui_status(self, message: str):
+        self.ids.status_label.text = message
     
     # UI screen transition
     def _go_to_login_screen(self):
-        self.manager.load_login_screen()
         self.manager.go_to_login_screen("left")
     
-    # ----- Cache and store of credentials and cryptographic keys entrypoints -----
-
-    # Cryptographic keys
-    def _generate_cryptographic_keys(self, password, username):
-        self.security_service.generate_keys_from_secrets(password, username)
-    
-    def _save_user_signature(self, username: str, email: str, password: str):
-        self.security_service.save_signature(username, email, password)
+    # ----- Cache of credentials entrypoints -----
 
     # Credentials
     def _cache_session_credentials(
-            self,
-            email: str,
-            username: str,
+            self, 
+            email: str, 
+            username: str, 
             password: str
             ):
         self.session.cache_credentials_from_ui(email, username, password)
-
-    def _store_cached_credentials(self):
-        self.session.store_cached_credentials()
-
-    # User
-    def _upload_user(self, email: str) -> bool:
-        ok_store, token = self.cloud_service.upload_user(email)
-        self.session.set_verification_token(token)
-        return ok_store
\ No newline at end of file
@@ -1,6 +1,9 @@
 # --- source/users_screen.py ---
 
-from kivy.lang import Builder
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from kivy.metrics import dp
 from kivymd.uix.button import MDRaisedButton
 from kivymd.uix.snackbar import MDSnackbar
@@ -14,12 +17,14 @@ from core.classes import (
 from core.constant import (
     DEFAULT_ROW_KEY_WIDTH,
     SCREEN_NAME_USERS,
-    PATH_SCHEMA_USER_DIALOG,
 )
 
-from services.user_service import UserService
+from core.virtual_table import KeysetDataSource
 from core.session import Session
 
+if TYPE_CHECKING:
+    from services.user_service import UserService
+
 
 class UsersScreen(EnhancedTableMDScreen):
     def __init__(self, user_service: UserService, session: Session, **kwargs):
@@ -27,7 +32,7 @@ class UsersScreen(EnhancedTableMDScreen):
         self.user_service = user_service
         self.session = session
         
-        self.dialog = Builder.load_file(PATH_SCHEMA_USER_DIALOG)  # Load the dialog definition
+        self.dialog = None
     
     def open_add_dialog(self):
         self.dialog = MDDialog(
@@ -93,6 +98,7 @@ class UsersScreen(EnhancedTableMDScreen):
             return
         
         self.user_service.delete_users(usernames)
+        self._refresh_table()
     
     #def _get_checked_usernames(self):
     #    return self._get_cells_from_checked_rows(0, True)
@@ -111,5 +117,14 @@ class UsersScreen(EnhancedTableMDScreen):
             ("Creation Date", dp(DEFAULT_ROW_KEY_WIDTH)),
             ]
         
-        users_data = self.user_service.get_all_users()
-        self._initialize_table(column_data, users_data)
\ No newline at end of file
+        if self.main_table:
+            # No-op unless the table changed since the screen was last shown
+            self._refresh_table()
+            return
+
+        data_source = KeysetDataSource(
+            self.user_service.get_user_ids,
+            self.user_service.get_users_page,
+            self.user_service.get_data_version
+            )
+        self._initialize_table(column_data, data_source=data_source)
\ No newline at end of file
@@ -1,8 +1,14 @@
+from __future__ import annotations
+
 import requests
 import keyring
 from functools import wraps
 import logging
-from typing import Optional
+import time
+from typing import Optional, TYPE_CHECKING
+from uuid import uuid4
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 from core.constant import (
     BACKEND_HOST,
@@ -10,6 +16,13 @@ from core.constant import (
     BACKEND_APP_ID,
     NAME_GC_LOCATION_HOST,
     TIME_DOCUMENT_ALIVE,
+    DEFAULT_HTTP_TIMEOUT,
+    DEFAULT_HEALTH_PROBE_TIMEOUT,
+    TIME_HEALTH_PROBE_INTERVAL,
+    DEFAULT_UPLOAD_WORKERS,
+    DEFAULT_UPLOAD_BATCH_SIZE,
+    TIME_PUBKEY_CACHE_ALIVE,
+    PUBKEY_CACHE_MAX_SIZE,
 )
 
 from services.security_service import (
@@ -17,6 +30,9 @@ from services.security_service import (
 )
 
 from core.session import Session
+from core.cache import TTLCache
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from repositories.pubkey_repository import PubkeyRepository
 
 from core.functions import (
     get_selected_fields_as_req_json,
@@ -29,10 +45,15 @@ from core.cloud_services_utils import (
 
 from core.security_utils import (
     hash_message,
-    hash_message_extended
+    hash_message_extended,
+    make_merkle_root
 )
 
-from core.enums import StatusDataSentDb
+from core.enums import StatusDataSentDb, CircuitState
+from core.tracing import span
+
+if TYPE_CHECKING:
+    from services.outbox_service import OutboxService
 
 class CloudService():
     base_endpoint = f"http://{BACKEND_HOST}:{BACKEND_PORT}/{BACKEND_APP_ID}/{NAME_GC_LOCATION_HOST}"
@@ -40,57 +61,112 @@ class CloudService():
     endpoint_store_user = f"{base_endpoint}/store_user"
     endpoint_delete_user = f"{base_endpoint}/delete_user"
     endpoint_send_data = f"{base_endpoint}/store_payload"
+    endpoint_send_data_batch = f"{base_endpoint}/store_payloads"
     endpoint_ping = f"{base_endpoint}/ping"
 
-    def __init__(self, session: Session, security_service: SecurityService):
+    def __init__(
+            self, 
+            session: Session, 
+            security_service: SecurityService, 
+            base_endpoint: str = None,
+            max_workers: int = DEFAULT_UPLOAD_WORKERS,
+            pubkey_repository: PubkeyRepository = None,
+            outbox: OutboxService = None,
+            ):
         self.session = session
         self.security_service = security_service
 
+        # Consumers' public keys (parsed), optionally persisted
+        self.pubkey_cache = TTLCache(PUBKEY_CACHE_MAX_SIZE, TIME_PUBKEY_CACHE_ALIVE)
+        self.pubkey_repository = pubkey_repository
+
+        # Sends that fail are queued here and retried in the background
+        self.outbox = outbox
+
         self.document_expiration_time = TIME_DOCUMENT_ALIVE
+
+        # Endpoints (overridable to target a local backend)
+        if base_endpoint:
+            self._set_endpoints(base_endpoint)
+
+        # Shared keep-alive HTTP session, sized for the upload fan-out
+        self.max_workers = max(1, max_workers)
+        self.http = self._make_http_session(self.max_workers)
         
-        # Attributes for service states
-        self.is_online: bool = None
+        # Backend health: requests fail fast while the circuit is open
+        self.breaker = CircuitBreaker(on_state_change=self._on_circuit_change)
+
+    @property
+    def is_online(self) -> bool:
+        return not self.breaker.is_open()
+
+    def _set_endpoints(self, base_endpoint: str):
+        self.base_endpoint = base_endpoint.rstrip("/")
+        self.endpoint_get_pubkey = f"{self.base_endpoint}/get_pubkey"
+        self.endpoint_store_user = f"{self.base_endpoint}/store_user"
+        self.endpoint_delete_user = f"{self.base_endpoint}/delete_user"
+        self.endpoint_send_data = f"{self.base_endpoint}/store_payload"
+        self.endpoint_send_data_batch = f"{self.base_endpoint}/store_payloads"
+        self.endpoint_ping = f"{self.base_endpoint}/ping"
+
+    @staticmethod
+    def _make_http_session(pool_size: int) -> requests.Session:
+        http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        http.mount("http://", adapter)
+        http.mount("https://", adapter)
+        return http
+
+    def close(self):
+        self.stop_health_checks()
+        self.http.close()
 
     def check_service_online():
         def decorator(method):
             @wraps(method)
             def wrapper(self, *args, **kwargs):
-                if self.is_online in [False, None]:
-                    self.is_online = self._send_ping()
-                if self.is_online:
-                    return method(self, *args, **kwargs)
-                
-                logging.info("Cloud-Service is not online")
-                return False
+                # No ping per call: the circuit breaker knows, kept current by requests and probes
+                if self.breaker.is_open():
+                    logging.info("Cloud-Service is not online")
+                    return False
+                return method(self, *args, **kwargs)
             return wrapper
         return decorator
     
     def is_owner_registered(self, owner: str):
         # Owner
-        print(f"email: ", owner)
         owner_hash: str = hash_message(owner)
 
         pubkey_data: dict = self.get_user_pubkey(owner_hash)
         pubkey: str = pubkey_data.get("pubkey") if pubkey_data else ""
         
-        self.is_online = True if pubkey else False
-        return self.is_online
+        return True if pubkey else False
     
-    def send_ping(self):
+    @span("cloud.ping")
+    def send_ping(self) -> bool:
+        """Whether the backend answers. Goes through an open circuit, as pings are how it closes again."""
         logging.info(f"Ping sent to endpoint {self.base_endpoint}")
         try:
-            _ = requests.get(self.endpoint_ping)
-            self.is_online = True
-            return True
-        except:
-            self.is_online = False
+            response = self._request("ping", "GET", self.endpoint_ping, probe=True, timeout=DEFAULT_HEALTH_PROBE_TIMEOUT)
+            return response.status_code < 500
+        except requests.RequestException:
             return False
 
+    def start_health_checks(self, interval: float = TIME_HEALTH_PROBE_INTERVAL):
+        """Ping the backend in the background while it's idle or down, so the circuit state stays current."""
+        self.breaker.start_probing(self.send_ping, interval)
+
+    def stop_health_checks(self):
+        self.breaker.stop_probing()
+
+    def get_endpoint_stats(self) -> list[dict]:
+        """Calls, errors and latencies of recent requests, per endpoint."""
+        return self.breaker.get_stats()
+
     @check_service_online()
+    @span("cloud.store_user")
     def upload_user(self, owner: str):
         try:
-            #print(f"1 Owner before hash: {owner}")
-
             # Owner
             owner_hash: str = hash_message(owner)
 
@@ -108,27 +184,26 @@ class CloudService():
             payload.update(payload_details)
 
             # Make request
-            response = requests.post(self.endpoint_store_user, json=payload)
-            payload = response.json()
+            response = self._request("store_user", "POST", self.endpoint_store_user, json=payload)
             
             if response.status_code == 200:
-                self.is_online = True
-                shorten_token = shorten_key_string(payload["token"])
-                logging.debug(f"User stored in cloud. Token: {shorten_token}")
-                return True, payload["token"]
+                token = response.json()["token"]
+                logging.debug(f"User stored in cloud. Token: {shorten_key_string(token)}")
+                return True, token
             
-            elif response.status_code != 409:
-                self.is_online = False
+            elif response.status_code == 409:
                 logging.debug(f"User already stored in cloud")
                 return True, ""
+            
+            logging.error(f"User not stored in cloud: HTTP {response.status_code}")
             return False, ""
         
         except Exception as e:
-            self.is_online = False
             logging.error(f"Error at storing user in cloud. Message: {e}")
             return False
     
     @check_service_online()
+    @span("cloud.delete_user")
     def delete_user(self, owner: str):
         try:
             # Owner
@@ -147,21 +222,29 @@ class CloudService():
             header = self._make_header()
 
             # Make request
-            response = requests.post(self.endpoint_delete_user, 
+            response = self._request("delete_user", "POST", self.endpoint_delete_user, 
                                      json=payload, 
                                      headers=header)
 
-            return True if response.status_code in 200 else False
+            return response.status_code == 200
         
         except Exception as e:
             logging.error(f"delete_user: {e}")
             return False
 
-    def get_user_pubkey(self, user_hash: str) -> dict[str, str]:
+    def get_user_pubkey(self, user_hash: str, use_cache: bool = True) -> dict[str, str]:
         """
         Public method to obtain parsed public key for a given user.
         Handles errors and returns a safe default on failure.
+
+        Keys are served from the in-memory cache, then the persistent table, while
+        fresh. If the backend can't be reached, a stale stored key is used instead.
         """
+        if use_cache:
+            pubkey = self._get_cached_pubkey(user_hash)
+            if pubkey:
+                return {"owner": user_hash, "pubkey": pubkey}
+
         header = self._make_header()
 
         try:
@@ -170,16 +253,54 @@ class CloudService():
 
             pubkey_str = response.json().get("pubkey", "")
             pubkey = self._get_pubkey_from_string(pubkey_str)
+            self._cache_pubkey(user_hash, pubkey, pubkey_str)
 
             return {"owner": user_hash, "pubkey": pubkey}
 
-        except requests.RequestException as e:
+        except (requests.RequestException, CircuitOpenError) as e:
             logging.error(f"[CloudService] HTTP request failed: {e}")
+            pubkey = self._get_cached_pubkey(user_hash, allow_expired=True)
+            if pubkey:
+                logging.warning(f"[CloudService] Using stale cached pubkey for {shorten_key_string(user_hash)}")
+                return {"owner": user_hash, "pubkey": pubkey}
         except (ValueError, KeyError) as e:
             logging.error(f"[CloudService] Invalid response structure: {e}")
 
         return {"owner": user_hash, "pubkey": ""}
+
+    def invalidate_pubkey(self, user_hash: str):
+        self.pubkey_cache.pop(user_hash)
+        if self.pubkey_repository:
+            self.pubkey_repository.delete_pubkey(user_hash)
+
+    def _get_cached_pubkey(self, user_hash: str, allow_expired: bool = False):
+        pubkey = self.pubkey_cache.get(user_hash, allow_expired=allow_expired)
+        if pubkey or not self.pubkey_repository:
+            return pubkey
+
+        record = self.pubkey_repository.load_pubkey(user_hash)
+        if not record:
+            return None
+        
+        pubkey_str, fetched_at = record
+        if not allow_expired and not self.pubkey_cache.is_fresh(fetched_at):
+            return None
+        
+        try:
+            pubkey = self._get_pubkey_from_string(pubkey_str)
+        except ValueError:
+            return None
+        
+        self.pubkey_cache.put(user_hash, pubkey, fetched_at)
+        return pubkey
+
+    def _cache_pubkey(self, user_hash: str, pubkey, pubkey_str: str):
+        fetched_at = self.security_service.get_current_utc_ts()
+        self.pubkey_cache.put(user_hash, pubkey, fetched_at)
+        if self.pubkey_repository:
+            self.pubkey_repository.store_pubkey(user_hash, pubkey_str, fetched_at)
     
+    @span("cloud.get_pubkey")
     def _get_pubkey(self, user_hash: str, header: Optional[dict[str, str]] = None) -> requests.Response:
         """
         Internal method that makes the HTTP request to fetch the pubkey.
@@ -187,21 +308,34 @@ class CloudService():
         """
         header = header or {"Content-Type": "application/json"}
         url = f"{self.endpoint_get_pubkey}?owner={user_hash}"
-        return requests.get(url, headers=header)
+        return self._request("get_pubkey", "GET", url, headers=header)
 
     @staticmethod
     def _get_pubkey_from_string(pubkey_str: str):
         return SecurityService.get_pubkey_from_string(pubkey_str)
 
-    @check_service_online()
+    @span("cloud.upload_data")
     def upload_data(
             self,
             fields: list, 
             owner: str, 
             consumers: list[str], 
             on_request: bool=False
-            ) -> dict[str, str]:
-        
+            ) -> dict[str, StatusDataSentDb]:
+        """
+        Send the data to each consumer, encrypted to their public key and signed.
+
+        With an outbox, sends that fail, or every send while the backend is
+        unreachable, are queued (QUEUED) and go out later with the same
+        idempotency key. Queuing while offline needs the consumer's public key
+        in the cache.
+        """
+        # While the circuit is open nothing is posted; with an outbox, all is queued
+        online = not self.breaker.is_open()
+        if not online and self.outbox is None:
+            logging.info("Cloud-Service is not online")
+            return False
+
         if not consumers or len(consumers) == 0:
             logging.warning("No consumers selected.")
             return {}
@@ -217,38 +351,201 @@ class CloudService():
             data = get_selected_fields_as_json(fields, as_dict=False)
 
         # Owner
-        print(f"email: ", owner)
         owner_hash = hash_message(owner)
         
         # Header request
         header = self._make_header()
         
+        # Fan out the uploads over the shared HTTP session, one task per consumer
+        n_workers = min(self.max_workers, len(consumers))
+        with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="cloud-upload") as executor:
+            futures = [
+                executor.submit(self._upload_consumer_data, owner_hash, consumer, data, header, online)
+                for consumer in consumers
+            ]
+            outcomes = [future.result() for future in futures]
+
+        # Payloads that were built but not stored go to the outbox
         results = {}
-        for consumer in consumers:
-            # Consumer
-            consumer_hash = hash_message(consumer)
+        queued = []
+        for consumer, (status, payload) in zip(consumers, outcomes):
+            if status == StatusDataSentDb.ERROR and payload is not None and self.outbox is not None:
+                queued.append(payload)
+                status = StatusDataSentDb.QUEUED
+            results[consumer] = status
+
+        if queued:
+            self.outbox.enqueue(owner_hash, queued)
+            logging.info(f"{len(queued)} documents queued until the BACKEND is reachable")
+        
+        return results
 
-            # Base payload
-            payload = {"owner": owner_hash}
+    @span("cloud.store_payload")
+    def _upload_consumer_data(self, owner_hash: str, consumer: str, data: str, header: dict[str, str], send: bool = True) -> tuple[StatusDataSentDb, dict | None]:
+        """Build the consumer's payload and, if `send`, post it. Returns the status and the payload, if it was built."""
+        # Consumer
+        consumer_hash = hash_message(consumer)
 
-            try:
-                # Setup payload details
-                payload_details = self._setup_data_payload_details(owner_hash, consumer_hash, data)
-
-                # Complete payload
-                payload.update(payload_details)
-
-                # Make request
-                response = requests.post(self.endpoint_send_data, 
-                                         json=payload,
-                                         headers=header)
-                results[consumer] = CloudService.evaluate_status_code(response.status_code)
-                logging.info(f"✅ Data sent to BACKEND: {response.json()}")
-            except Exception as e:
-                results[consumer] = CloudService.evaluate_status_code(StatusDataSentDb.ERROR)
-                logging.error(f"❌ Failed to send data to BACKEND: {e}")
-        return results
+        # Base payload; the key lets the backend drop a repeated send of it.
+        # Kept with the payload for the outbox, but posted as a header here
+        payload = {"owner": owner_hash, "idempotency_key": uuid4().hex}
+
+        try:
+            # Setup payload details
+            payload_details = self._setup_data_payload_details(owner_hash, consumer_hash, data)
+
+            # Complete payload
+            payload.update(payload_details)
+        except Exception as e:
+            logging.error(f"❌ Cannot prepare data for consumer {shorten_key_string(consumer_hash)}: {e}")
+            return StatusDataSentDb.ERROR, None
+
+        if not send:
+            return StatusDataSentDb.ERROR, payload
+
+        try:
+            # Make request; the body keeps the fields the backend always had
+            response = self._request("store_payload", "POST", self.endpoint_send_data, 
+                                     json={key: value for key, value in payload.items() if key != "idempotency_key"},
+                                     headers={**header, "Idempotency-Key": payload["idempotency_key"]})
+            logging.info(f"✅ Data sent to BACKEND: {response.status_code}")
+            return CloudService.evaluate_status_code(response.status_code), payload
+        except Exception as e:
+            logging.error(f"❌ Failed to send data to BACKEND: {e}")
+            return StatusDataSentDb.ERROR, payload
+
+    @span("cloud.store_queued")
+    def send_queued_batch(self, owner_hash: str, payloads: list[dict]) -> dict[str, StatusDataSentDb]:
+        """
+        Send queued payloads in one batch request, signed anew over their Merkle
+        root. Each item carries its `idempotency_key`, which the backend echoes
+        in its result. Returns the status by idempotency key; raises if the
+        request as a whole fails, for the outbox to retry it.
+        """
+        items = [
+            {key: payload[key] for key in ("consumer", "data", "verification", "idempotency_key")}
+            for payload in payloads
+        ]
+        batch = self._setup_batch_payload_details(owner_hash, items)
+        response = self._request("store_payloads", "POST", self.endpoint_send_data_batch, 
+                                 json=batch,
+                                 headers=self._make_header())
+        response.raise_for_status()
+
+        # Results come in item order
+        statuses = {}
+        for item, item_result in zip(items, response.json().get("results", [])):
+            key = item_result.get("idempotency_key", item["idempotency_key"])
+            statuses[key] = CloudService.evaluate_status_code(item_result.get("status"))
+        return statuses
     
+    @check_service_online()
+    @span("cloud.upload_data_batch")
+    def upload_data_batch(
+            self,
+            fields: list, 
+            owner: str, 
+            consumers: list[str], 
+            on_request: bool=False,
+            batch_size: int=DEFAULT_UPLOAD_BATCH_SIZE,
+            ) -> dict[str, StatusDataSentDb]:
+        """
+        Send the same data to many consumers in as few requests as possible.
+
+        Each item is encrypted to its own consumer, and every request carries a single
+        owner signature over the Merkle root of the items' verification codes.
+        """
+        if not consumers or len(consumers) == 0:
+            logging.warning("No consumers selected.")
+            return {}
+
+        if not fields or len(fields) == 0:
+            logging.warning("No fields selected.")
+            return {}
+        
+        # Request
+        if on_request:
+            data = get_selected_fields_as_req_json(fields, owner, as_dict=False)
+        else:
+            data = get_selected_fields_as_json(fields, as_dict=False)
+
+        # Owner
+        owner_hash = hash_message(owner)
+        
+        # Header request
+        header = self._make_header()
+
+        results = {}
+        for start in range(0, len(consumers), batch_size):
+            batch = consumers[start:start + batch_size]
+            results.update(self._upload_batch(owner_hash, batch, data, header))
+        
+        return results
+
+    @span("cloud.store_payloads")
+    def _upload_batch(self, owner_hash: str, consumers: list[str], data: str, header: dict[str, str]) -> dict[str, StatusDataSentDb]:
+        consumers_by_hash = {hash_message(consumer): consumer for consumer in consumers}
+        results = {consumer: StatusDataSentDb.ERROR for consumer in consumers}
+
+        # Encrypt per consumer (pubkey lookups overlap on the pool)
+        n_workers = min(self.max_workers, len(consumers_by_hash))
+        with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="cloud-batch") as executor:
+            items = list(executor.map(
+                lambda consumer_hash: self._setup_batch_item(owner_hash, consumer_hash, data),
+                consumers_by_hash
+                ))
+        items = [item for item in items if item]
+        if not items:
+            return results
+
+        try:
+            payload = self._setup_batch_payload_details(owner_hash, items)
+            response = self._request("store_payloads", "POST", self.endpoint_send_data_batch, 
+                                     json=payload,
+                                     headers=header)
+            response.raise_for_status()
+
+            for item_result in response.json().get("results", []):
+                consumer = consumers_by_hash.get(item_result.get("consumer"))
+                if consumer is not None:
+                    results[consumer] = CloudService.evaluate_status_code(item_result.get("status"))
+            logging.info(f"✅ Batch of {len(items)} documents sent to BACKEND: {response.status_code}")
+        except Exception as e:
+            logging.error(f"❌ Failed to send batch to BACKEND: {e}")
+        
+        return results
+
+    def _setup_batch_item(self, owner_hash: str, consumer_hash: str, data: str) -> dict[str, str] | None:
+        try:
+            encrypted_data, verification_fields = self._encrypt_for_consumer(owner_hash, consumer_hash, data)
+            _, verification_code = hash_message_extended(".".join(verification_fields))
+        except Exception as e:
+            logging.error(f"Cannot prepare data for consumer {shorten_key_string(consumer_hash)}: {e}")
+            return None
+        
+        return {
+            "consumer": consumer_hash,
+            "data": encrypted_data,
+            "verification": verification_code,
+            }
+
+    def _setup_batch_payload_details(self, owner_hash: str, items: list[dict[str, str]]):
+        creation_at_str, expires_at_str = self._make_expiry_window()
+
+        # One signature over the Merkle root of the items
+        root = make_merkle_root([item["verification"] for item in items])
+        signature, verification_code = self._make_credentials([owner_hash, root])
+
+        return {
+            "owner": owner_hash,
+            "creation_at": creation_at_str,
+            "expires_at": expires_at_str,
+            "items": items,
+            "root": root,
+            "verification": verification_code,
+            "signature": signature
+            }
+
     def _setup_user_payload_details(self, owner_hash: str, pubkey: str):
         # Creation timestamp
         creation_at = self.security_service.get_current_utc_ts()
@@ -276,9 +573,25 @@ class CloudService():
             }
 
     def _setup_data_payload_details(self, owner_hash: str, consumer_hash: str, data: str):
+        creation_at_str, expires_at_str = self._make_expiry_window()
+
+        payload_data_str, verification_fields = self._encrypt_for_consumer(owner_hash, consumer_hash, data)
         
+        # 1. Create signature (bytes) and verification code (string)
+        signature, verification_code = self._make_credentials(verification_fields)
+
+        return {
+            "consumer": consumer_hash,
+            "creation_at": creation_at_str,
+            "expires_at": expires_at_str,
+            "data": payload_data_str,
+            "verification": verification_code,
+            "signature": signature
+            }
+
+    def _make_expiry_window(self) -> tuple[str, str]:
         # Creation timestamp
-        creation_at = self.security_service.get_current_utc_dt()
+        creation_at = self.security_service.get_current_utc_ts()
         creation_at_str = str(int(creation_at))
 
         # Expiration timestamp
@@ -288,8 +601,15 @@ class CloudService():
             )
         expires_at_str = str(int(expires_at))
 
+        return creation_at_str, expires_at_str
+
+    def _encrypt_for_consumer(self, owner_hash: str, consumer_hash: str, data: str) -> tuple[str, list[str]]:
+        """Encrypt data to the consumer's public key. Returns (b64 data, verification fields)."""
         # Get consumer's public key
         consumer_pubkey = self.get_user_pubkey(consumer_hash)["pubkey"]
+        if not consumer_pubkey:
+            # encrypt() would fall back to the owner's own key
+            raise ValueError("Consumer public key not available")
 
         # Encrypt data with consumer's public key
         data_hash = hash_message(data)
@@ -298,19 +618,36 @@ class CloudService():
         
         encrypted_data = self.security_service.encrypt(data.encode("utf-8"), consumer_pubkey)
         
-        payload_data_str = self.security_service.convert_bytes_to_b64(encrypted_data)
-        
-        # 1. Create signature (bytes) and verification code (string)
-        signature, verification_code = self._make_credentials(verification_fields)
+        return self.security_service.convert_bytes_to_b64(encrypted_data), verification_fields
 
-        return {
-            "consumer": consumer_hash,
-            "creation_at": creation_at_str,
-            "expires_at": expires_at_str,
-            "data": payload_data_str,
-            "verification": verification_code,
-            "signature": signature
-            }
+    def _request(self, endpoint: str, method: str, url: str, probe: bool = False, **kwargs) -> requests.Response:
+        """
+        HTTP request over the shared session, recorded by the circuit breaker
+        under `endpoint`; transport errors and 5xx answers count as failures.
+        Raises CircuitOpenError while the circuit is open, unless `probe`.
+        """
+        if not probe and not self.breaker.allow_request():
+            raise CircuitOpenError(f"Cloud backend unavailable (circuit {self.breaker.state.value})")
+
+        kwargs.setdefault("timeout", DEFAULT_HTTP_TIMEOUT)
+        start = time.perf_counter()
+        try:
+            response = self.http.request(method, url, **kwargs)
+        except Exception as e:
+            self.breaker.record_failure(endpoint, time.perf_counter() - start, type(e).__name__)
+            raise
+
+        latency = time.perf_counter() - start
+        if response.status_code >= 500:
+            self.breaker.record_failure(endpoint, latency, f"HTTP {response.status_code}")
+        else:
+            self.breaker.record_success(endpoint, latency)
+        return response
+
+    def _on_circuit_change(self, state: CircuitState):
+        # Back online: send what was queued without waiting out its backoff
+        if state == CircuitState.CLOSED and self.outbox is not None:
+            self.outbox.flush()
 
     def _make_header(self):
         token = self.session.get_verification_token()
@@ -338,5 +675,4 @@ class CloudService():
             return StatusDataSentDb.MISSING_FIELD
         elif status_code == 409:
             return StatusDataSentDb.EXISTS
-        elif status_code == 500:
-            return StatusDataSentDb.ERROR
\ No newline at end of file
+        return StatusDataSentDb.ERROR
\ No newline at end of file
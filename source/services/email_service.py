@@ -1,7 +1,9 @@
-import smtplib
 from email.message import EmailMessage
 
 from core.session import Session
+from core.smtp_transport import SmtpTransport
+from core.enums import StatusEmailSent
+from core.tracing import span
 
 from core.constant import (
     MSG_DEFAULT_SEND_FILENAME,
@@ -20,19 +22,25 @@ from core.functions import (
 
 
 class EmailService():
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, transport: SmtpTransport = None):
         self.session = session
         self.email_password = "ugtt iggn nnni dchj"  # Replace with a safer secret handling strategy
 
+        # Logged-in SMTP sessions are kept and reused across sends
+        self.transport = transport or SmtpTransport(
+            SMTP_SERVER,
+            SMTP_SSL_PORT,
+            credentials=lambda: (self.session.get_email(), self.email_password),
+            )
+
+    @span("email.send")
     def _send(self, message):
-        try:
-            with smtplib.SMTP_SSL(SMTP_SERVER, SMTP_SSL_PORT) as server:
-                server.login(self.session.get_email(), self.email_password)
-                server.send_message(message)
-            information_panel("Action: sending email", "Email sent successfully")
-        except Exception as e:
-            information_panel("Action: sending email", f"Error at sending: {str(e)}")
-        
+        """Send a message over SMTP. Blocking; errors are raised to the caller."""
+        self.transport.send(message)
+
+    def close(self):
+        self.transport.close()
+
     def create_payload(self, rows, recipients, filename, file_format) -> dict | None:
             if not rows:
                 information_panel("Action: sending email", "No fields selected.")
@@ -68,11 +76,43 @@ class EmailService():
         )
         self._send(message)
 
+    def send_bulk(
+            self,
+            rows,
+            recipient_groups: list[list[str]],
+            filename=None,
+            file_format="json",
+            on_request=False
+            ) -> dict[str, StatusEmailSent]:
+        """
+        Send the same fields to several recipient groups, one message per group,
+        streamed over a single SMTP session. The attachment is built only once.
+        """
+        filename = self._make_filename(filename, file_format)
+        subject = f"Shary message with {len(rows)} fields"
+        message_keys, file_to_send = self._build_email_content(rows, file_format, on_request)
+        if file_to_send is None:
+            return {r: StatusEmailSent.ERROR for group in recipient_groups for r in group}
+
+        messages = [
+            self._make_message(group, subject, filename, file_format, message_keys, file_to_send)
+            for group in recipient_groups
+        ]
+        sent = self.transport.send_many(messages)
+
+        results = {}
+        for group, outcome in zip(recipient_groups, sent):
+            for recipient in group:
+                if isinstance(outcome, Exception):
+                    results[recipient] = StatusEmailSent.ERROR
+                elif recipient in outcome:
+                    results[recipient] = StatusEmailSent.REFUSED
+                else:
+                    results[recipient] = StatusEmailSent.SENT
+        return results
+
     def _build_email(self, recipients, subject, rows_to_send, filename=None, file_format="json"):
-        if not filename:
-            filename = f"{MSG_DEFAULT_SEND_FILENAME}{self.session.username}"
-        
-        filename += f".{file_format}"
+        filename = self._make_filename(filename, file_format)
         return self._build_email_html_body(
             recipients,
             subject,
@@ -81,7 +121,21 @@ class EmailService():
             rows_to_send
         )
 
+    def _make_filename(self, filename, file_format) -> str:
+        if not filename:
+            filename = f"{MSG_DEFAULT_SEND_FILENAME}{self.session.username}"
+
+        return f"{filename}.{file_format}"
+
     def _build_email_html_body(self, recipients, subject, filename, file_format, rows, on_request=False):
+        message_keys, file_to_send = self._build_email_content(rows, file_format, on_request)
+
+        if file_to_send is None:
+            return "bad-format"
+
+        return self._make_message(recipients, subject, filename, file_format, message_keys, file_to_send)
+
+    def _build_email_content(self, rows, file_format, on_request=False):
         if on_request:
             message_keys = parsed_keys_as_vertical_string(rows)
             file_to_send = get_selected_fields_as_req_json(rows, self.session.get_email())
@@ -89,9 +143,9 @@ class EmailService():
             message_keys = parsed_fields_as_vertical_string(rows)
             file_to_send = build_file_from_selected_fields(rows, file_format)
 
-        if file_to_send is None:
-            return "bad-format"
+        return message_keys, file_to_send
 
+    def _make_message(self, recipients, subject, filename, file_format, message_keys, file_to_send) -> EmailMessage:
         shary_uri = f"http://localhost:5001/files/open?filename=./{filename}"
         body = f"""
         <html>
@@ -118,4 +172,4 @@ class EmailService():
     def send_email_with_fields(self, rows, recipients, filename, file_format: str="json"):
         payload = self.create_payload(rows, recipients, filename, file_format)
         if payload:
-            self.send_from_payload(payload)
\ No newline at end of file
+            self.send_from_payload(payload)
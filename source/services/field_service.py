@@ -1,26 +1,60 @@
+import logging
+import threading
+
 from repositories.field_repository import FieldRepository
 from services.security_service import SecurityService
-from core.dtos import FieldDTO
-from typing import List, Tuple
+from core.dtos import PageDTO, ImportSummaryDTO
+from core.enums import FieldCipher
+from core.constant import (
+    DATA_KEY_NAME_FIELDS,
+    INDEX_KEY_LABEL_FIELD_KEYS,
+    DEFAULT_NUM_ROWS_PAGE,
+    DEFAULT_IMPORT_BATCH_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+)
+from core.functions import iter_chunks, read_file_of_selected_fields
+from core.crypto_pool import CryptoPool
+from core.cache import ZeroizingCache
+from core.search_index import TrigramIndex
+from core.tracing import span
+from collections import Counter
+from typing import Iterable, Iterator, List, Tuple
 
 
 class FieldService():
-    def __init__(self, repo: FieldRepository, security_service: SecurityService):
+    def __init__(self, repo: FieldRepository, security_service: SecurityService, crypto_pool: CryptoPool | None = None):
         self.repo = repo
         self.security_service = security_service
+        # Spreads bulk encryption/decryption over worker processes
+        self.crypto_pool = crypto_pool or CryptoPool()
+
+        # Envelope encryption state
+        self._data_key: bytes | None = None
+        self._index_key: bytes | None = None
+        self._legacy_checked = False
+        # Pages and writes may run on several worker threads: only one creates
+        # the data key or runs the migration
+        self._key_lock = threading.RLock()
+
+        # Decrypted (key, value, alias_key) by field id, for the logged-in owner
+        self._field_cache = ZeroizingCache()
+
+        # Key and alias search over the decrypted fields, re-synced when the table changes.
+        # Values are left out: the index keeps plain strings, which only the
+        # cache above can overwrite; results carry the stored (encrypted) record
+        self._search_index = TrigramIndex(weights=(1.0, 0.9))
+        self._search_version = None
 
-    def encrypt_keys_before():
+    def index_keys_before():
         def decorator(method):
             def wrapper(self, *args, **kwargs):
                 keys = args[0]
+                # Rows stored before keys were indexed must be indexed to be found
+                if not self._legacy_checked:
+                    self.migrate_legacy_fields()
 
-                encrypted_keys = []
-                for key, *_ in keys:
-                    encrypted_key = self.security_service.encrypt(key.encode())
-                    encrypted_keys.append((encrypted_key, ))
+                return method(self, [self._index_field_key(key) for key, *_ in keys])
 
-                return method(self, encrypted_keys)
-            
             return wrapper
         return decorator
 
@@ -28,13 +62,32 @@ class FieldService():
         def decorator(method):
             def wrapper(self, *args, **kwargs):
                 key, value, alias_key, *_ = args
+                if not self._legacy_checked:
+                    self.migrate_legacy_fields()
                 data = (
-                    self.security_service.encrypt(key.encode()),
-                    self.security_service.encrypt(value.encode()),
-                    self.security_service.encrypt(alias_key.encode()),
+                    self._seal_cell(key),
+                    self._seal_cell(value),
+                    self._seal_cell(alias_key),
+                    FieldCipher.AES_GCM.value,
+                    self._index_field_key(key),
                 )
-                
-                method(self, data)
+
+                field_id = method(self, data)
+                # Write-through, so the new row is never decrypted again
+                if field_id is not None:
+                    self._field_cache.put(field_id, (key, value, alias_key))
+                return field_id
+            return wrapper
+        return decorator
+
+    def evict_keys_before():
+        def decorator(method):
+            def wrapper(self, *args, **kwargs):
+                keys = args[0]
+                self._field_cache.pop_where(0, {key for key, *_ in keys})
+
+                return method(self, keys)
+
             return wrapper
         return decorator
 
@@ -43,36 +96,339 @@ class FieldService():
             def wrapper(self, *args, **kwargs):
                 records = method(self, *args, **kwargs)
 
-                fields = []
-                for key, value, alias, date in records:
-                    field = (
-                        self.security_service.decrypt(key).decode(), 
-                        self.security_service.decrypt(value).decode(), 
-                        self.security_service.decrypt(alias).decode(),
-                        date
-                        )
-                    fields.append(field)
-                
-                return fields
+                return self._open_records(records)
             return wrapper
         return decorator
 
+    @span("fields.create")
     @encrypt_field_before()
-    def create_field(self, field) -> FieldDTO:
-        self.repo.add_field(field)
+    def create_field(self, field) -> int | None:
+        # Sealed keys never repeat, so uniqueness is checked on the key index
+        if self.repo.load_field_by_key_index(field[-1]) is not None:
+            logging.warning("Field not created: its key is already stored.")
+            return None
+        return self.repo.add_field(field)
+
+    @span("fields.get_field")
+    def get_field(self, key: str) -> Tuple[str] | None:
+        """The (key, value, alias_key, date) row stored under `key`, found by its key index. None if missing."""
+        if not self._legacy_checked:
+            self.migrate_legacy_fields()
+
+        record = self.repo.load_field_by_key_index(self._index_field_key(key))
+        return self._open_records([record])[0] if record else None
 
-        return field
+    @span("fields.import")
+    def import_fields(
+            self,
+            fields: Iterable[Tuple[str, str]],
+            overwrite: bool = False,
+            batch_size: int = DEFAULT_IMPORT_BATCH_SIZE
+            ) -> ImportSummaryDTO:
+        """
+        Store many (key, value) fields at once: encrypted batch by batch and
+        inserted in a single transaction. Keys already stored with another
+        value are conflicts, replaced only if `overwrite`.
+        """
+        if not self._legacy_checked:
+            self.migrate_legacy_fields()
+        # Creating the data key writes to the DB, so do it before the import transaction
+        data_key = self._get_data_key()
 
-    @encrypt_keys_before()
-    def delete_fields(self, keys: List[str]):
-        if len(keys) == 1:
-            key = keys[0][0]
-            self.repo.delete_field(key)
+        summary = ImportSummaryDTO()
+        pending = {}
+        for key, value in fields:
+            summary.total += 1
+            if not key:
+                summary.invalid += 1
+                continue
+            if key in pending:
+                summary.duplicates.append(key)
+                continue
+            pending[key] = value
+
+        # Stored keys are matched by key index; only the values and aliases of matching rows are decrypted (unless cached)
+        key_indexes = {key: self._index_field_key(key) for key in pending}
+        stored, misses = {}, []
+        for record in self.repo.load_fields_by_key_indexes(key_indexes.values()):
+            cached = self._field_cache.get(record[0])
+            if cached is None:
+                misses.append(record)
+            else:
+                stored[record[1]] = (record[0], cached[1], cached[2])
+        opened = self.crypto_pool.open_rows(
+            [((value, alias_key) if alias_key is not None else (value,), cipher_version) for _, _, value, alias_key, cipher_version in misses],
+            data_key,
+            )
+        # Rows stored without an alias get the key as alias on rewrite, as new rows do
+        stored.update({record[1]: (record[0], cells[0], cells[1] if len(cells) > 1 else None) for cells, record in zip(opened, misses)})
+
+        inserts, updates = [], []
+        for key, value in pending.items():
+            if key_indexes[key] not in stored:
+                inserts.append((key, value))
+                continue
+
+            field_id, stored_value, stored_alias = stored[key_indexes[key]]
+            if stored_value == value:
+                summary.duplicates.append(key)
+            elif overwrite:
+                # The stored alias is kept
+                updates.append((key, value, stored_alias or key, field_id))
+            else:
+                summary.conflicts.append(key)
+
+        # Encrypted a few batches ahead of the inserts, inside the transaction
+        self.repo.add_fields_bulk(
+            self._seal_field_batches(inserts, batch_size),
+            self._seal_field_batches(updates, batch_size, with_alias=True),
+            )
+        for key, value, alias_key, field_id in updates:
+            self._field_cache.put(field_id, (key, value, alias_key))
+        summary.imported = len(inserts)
+        summary.overwritten = len(updates)
+
+        logging.info(
+            f"Fields import: {summary.imported} imported, {summary.overwritten} overwritten, "
+            f"{len(summary.duplicates)} duplicates, {len(summary.conflicts)} conflicts, {summary.invalid} invalid."
+            )
+        return summary
+
+    def import_fields_file(self, path: str, overwrite: bool = False) -> ImportSummaryDTO | None:
+        """Import a JSON, CSV, XML or YAML file as exported by Shary. None if the format is unknown."""
+        fields = read_file_of_selected_fields(path)
+        if fields is None:
+            return None
+        return self.import_fields(fields, overwrite)
+
+    @span("fields.delete")
+    @evict_keys_before()
+    @index_keys_before()
+    def delete_fields(self, key_indexes: List[bytes]):
+        if len(key_indexes) == 1:
+            self.repo.delete_field(key_indexes[0])
         else:
-            self.repo.delete_fields(keys)
-    
-    @decrypt_fields_after()
+            self.repo.delete_fields(key_indexes)
+
+    @span("fields.get_all")
     def get_all_fields(self) -> List[Tuple[str]]:
+        if not self._legacy_checked:
+            self.migrate_legacy_fields()
+
+        return self._load_all_fields()
+
+    @decrypt_fields_after()
+    def _load_all_fields(self) -> List[Tuple[str]]:
         fields = self.repo.load_fields_from_db()
-        
+
         return fields
+
+    @span("fields.get_page")
+    def get_fields_page(
+            self,
+            after_id: int = 0,
+            limit: int = DEFAULT_NUM_ROWS_PAGE,
+            date_from: str | None = None,
+            date_to: str | None = None,
+            with_total: bool = False
+            ) -> PageDTO:
+        """
+        One page of (key, value, alias_key, date) rows, plus the filtered total
+        if `with_total`. Only the page is decrypted.
+        """
+        if not self._legacy_checked:
+            self.migrate_legacy_fields()
+
+        records = self.repo.load_fields_page(after_id, limit, date_from, date_to)
+        rows = self._open_records(records)
+
+        return PageDTO(
+            rows=rows,
+            total=self.repo.count_fields(date_from, date_to) if with_total else None,
+            next_cursor=records[-1][0] if len(records) == limit else None,
+            )
+
+    def get_field_ids(self, date_from: str | None = None, date_to: str | None = None) -> List[int]:
+        return self.repo.load_field_ids(date_from, date_to)
+
+    @span("fields.search")
+    def search_fields(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Tuple[str]]:
+        """(key, value, alias_key, date) rows matching `query` by key or alias, best first. Tolerates typos."""
+        self._sync_search_index()
+        return self._open_records([record for _, _, record in self._search_index.search(query, limit)])
+
+    @span("fields.sync_search_index")
+    def _sync_search_index(self):
+        # Read first, so a write landing during the sync triggers another one
+        version = self.repo.get_version()
+        if version == self._search_version:
+            return
+
+        if not self._legacy_checked:
+            self.migrate_legacy_fields()
+
+        # Rows come from the decrypted cache; only new ones are decrypted
+        records = self.repo.load_fields_from_db()
+        rows = self._open_records(records)
+        self._search_index.sync(
+            (record[0], (key, alias_key), record) for record, (key, _, alias_key, _) in zip(records, rows)
+            )
+        self._search_version = version
+
+    def get_data_version(self) -> tuple[int, int]:
+        """Changes when the fields table may have changed (see BaseRepository.get_version)."""
+        return self.repo.get_version()
+
+    # ----- Envelope encryption -----
+    @span("fields.migrate")
+    def migrate_legacy_fields(self) -> int:
+        """
+        Re-encrypt rows stored with per-cell RSA under the AES-GCM data key,
+        then index the keys of rows stored before keys were indexed.
+        """
+        with self._key_lock:
+            records = self.repo.load_fields_by_cipher(FieldCipher.RSA.value)
+
+            migrated = []
+            if records:
+                data_key = self._get_data_key()
+                opened = self.crypto_pool.open_rows(
+                    [((key, value, alias), FieldCipher.RSA.value) for _, key, value, alias in records],
+                    data_key,
+                    self.security_service.private_key,
+                    )
+                sealed = self.crypto_pool.seal_rows(opened, data_key)
+                migrated = [
+                    (*cells, FieldCipher.AES_GCM.value, self._index_field_key(key), record[0])
+                    for cells, (key, *_), record in zip(sealed, opened, records)
+                    ]
+                for cells, record in zip(opened, records):
+                    self._field_cache.put(record[0], cells)
+
+            if migrated:
+                self.repo.update_fields_cipher(migrated)
+                logging.info(f"{len(migrated)} fields migrated to envelope encryption.")
+
+            self._backfill_key_index()
+            self._legacy_checked = True
+            return len(migrated)
+
+    def _backfill_key_index(self) -> int:
+        """Index the keys of rows stored before keys were indexed, in one transaction."""
+        records = self.repo.load_fields_without_key_index()
+        if not records:
+            return 0
+
+        keys_by_id, misses = {}, []
+        for record in records:
+            cached = self._field_cache.get(record[0])
+            if cached is None:
+                misses.append(record)
+            else:
+                keys_by_id[record[0]] = cached[0]
+        opened = self.crypto_pool.open_rows(
+            [((key,), cipher_version) for _, key, cipher_version in misses],
+            self._get_data_key(),
+            self.security_service.private_key,
+            )
+        keys_by_id.update({record[0]: key for (key,), record in zip(opened, misses)})
+
+        key_indexes = [(self._index_field_key(key), field_id) for field_id, key in keys_by_id.items()]
+        self.repo.update_fields_key_index(key_indexes)
+        logging.info(f"{len(key_indexes)} field keys indexed.")
+
+        # Older versions could store a key twice; lookups return one of them and deletes remove all
+        repeated = sum(count - 1 for count in Counter(key_index for key_index, _ in key_indexes).values())
+        if repeated:
+            logging.warning(f"{repeated} stored fields repeat the key of another field.")
+        return len(key_indexes)
+
+    def clear_data_key(self):
+        """Forget the unwrapped data key and decrypted fields (on logout or when the owner keys change)."""
+        self._data_key = None
+        self._index_key = None
+        self._legacy_checked = False
+        self._field_cache.clear()
+        self._search_index.clear()
+        self._search_version = None
+        self.crypto_pool.close()
+
+    def close(self):
+        """Stop the crypto workers (on app exit)."""
+        self.crypto_pool.close()
+
+    def _get_data_key(self) -> bytes:
+        if self._data_key is not None:
+            return self._data_key
+
+        with self._key_lock:
+            if self._data_key is not None:
+                return self._data_key
+
+            wrapped_key = self.repo.load_wrapped_data_key(DATA_KEY_NAME_FIELDS)
+            if wrapped_key:
+                self._data_key = self.security_service.unwrap_data_key(wrapped_key)
+            else:
+                data_key = self.security_service.generate_data_key()
+                self.repo.store_wrapped_data_key(
+                    DATA_KEY_NAME_FIELDS,
+                    self.security_service.wrap_data_key(data_key)
+                    )
+                self._data_key = data_key
+
+            return self._data_key
+
+    def _index_field_key(self, key: str) -> bytes:
+        """Blind index of a plaintext key: equal keys get equal indexes, under this data key only."""
+        if self._index_key is None:
+            self._index_key = self.security_service.derive_index_key(self._get_data_key(), INDEX_KEY_LABEL_FIELD_KEYS)
+        return self.security_service.blind_index(key.encode(), self._index_key)
+
+    @span("fields.decrypt_rows")
+    def _open_records(self, records: List[tuple]) -> List[Tuple[str]]:
+        """
+        (key, value, alias_key, date) rows from stored (id, key, value, alias_key,
+        date, cipher_version) rows. Only rows missing from the cache are decrypted.
+        """
+        cells_by_id = {}
+        misses = []
+        for record in records:
+            cells = self._field_cache.get(record[0])
+            if cells is None:
+                misses.append(record)
+            else:
+                cells_by_id[record[0]] = cells
+
+        if misses:
+            opened = self.crypto_pool.open_rows(
+                [((key, value, alias), cipher_version) for _, key, value, alias, _, cipher_version in misses],
+                self._get_data_key(),
+                self.security_service.private_key,
+                )
+            for cells, record in zip(opened, misses):
+                self._field_cache.put(record[0], cells)
+                cells_by_id[record[0]] = cells
+
+        return [(*cells_by_id[record[0]], record[4]) for record in records]
+
+    def _seal_field_batches(self, rows: List[tuple], batch_size: int, with_alias: bool = False) -> Iterator[List[tuple]]:
+        """
+        Seal (key, value, *extra) rows into batches of (key, value, alias_key,
+        cipher_version, key_index, *extra) ready to be stored. The alias is the
+        key, unless `with_alias`, where rows are (key, value, alias_key, *extra).
+        """
+        n_cells = 3 if with_alias else 2
+        batches = list(iter_chunks(rows, batch_size))
+        sealed_batches = self.crypto_pool.seal_batches(
+            ([(row[0], row[1], row[2] if with_alias else row[0]) for row in batch] for batch in batches),
+            self._get_data_key(),
+            len(rows),
+            )
+        for batch, sealed in zip(batches, sealed_batches):
+            yield [
+                (*cells, FieldCipher.AES_GCM.value, self._index_field_key(row[0]), *row[n_cells:])
+                for cells, row in zip(sealed, batch)
+                ]
+
+    def _seal_cell(self, plaintext: str) -> bytes:
+        return self.security_service.seal(plaintext.encode(), self._get_data_key())
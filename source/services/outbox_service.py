@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from repositories.outbox_repository import OutboxRepository
+from core.enums import OutboxStatus, StatusDataSentDb
+from core.constant import (
+    DEFAULT_UPLOAD_BATCH_SIZE,
+    DEFAULT_OUTBOX_MAX_IN_FLIGHT,
+    DEFAULT_OUTBOX_MAX_ATTEMPTS,
+    TIME_OUTBOX_BACKOFF_BASE,
+    TIME_OUTBOX_BACKOFF_MAX,
+)
+from core.functions import iter_chunks
+from core.circuit_breaker import CircuitOpenError
+from core.tracing import span
+
+if TYPE_CHECKING:
+    from services.cloud_service import CloudService
+
+
+class OutboxService():
+    """
+    Durable queue of cloud uploads that could not be sent when they were made.
+
+    Payloads are stored as CloudService built them, signed and encrypted, each
+    under an idempotency key the backend uses to drop repeated sends. While
+    started for an owner, a background thread sends their due payloads in
+    batches, at most `max_in_flight` requests at once. A failed send is retried
+    after an exponential, jittered backoff until it is stored, rejected, out of
+    attempts, or its document expired. Once a send gets through, the backend
+    is back, so every pending payload is sent without waiting out its backoff.
+    """
+    def __init__(
+            self,
+            repo: OutboxRepository,
+            cloud_service: CloudService,
+            batch_size: int = DEFAULT_UPLOAD_BATCH_SIZE,
+            max_in_flight: int = DEFAULT_OUTBOX_MAX_IN_FLIGHT,
+            max_attempts: int = DEFAULT_OUTBOX_MAX_ATTEMPTS,
+            backoff_base: float = TIME_OUTBOX_BACKOFF_BASE,
+            backoff_max: float = TIME_OUTBOX_BACKOFF_MAX,
+            ):
+        self.repo = repo
+        self.cloud_service = cloud_service
+
+        self.batch_size = max(1, batch_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # Dispatcher state; each start() gets its own stop event, so a stopped
+        # thread still finishing a request can't be revived by the next start
+        self._owner_hash: str | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="shary-outbox-send")
+
+    # ----- Queue -----
+    def enqueue(self, owner_hash: str, payloads: list[dict]) -> int:
+        """Queue payloads (each with an `idempotency_key` and `expires_at`) for a later send. Returns how many were new."""
+        now = time.time()
+        rows = [
+            (payload["idempotency_key"], owner_hash, json.dumps(payload), now + self.backoff_delay(1), float(payload["expires_at"]))
+            for payload in payloads
+        ]
+        added = self.repo.add_items(rows)
+        # The dispatcher may be waiting on a later retry
+        self._wake.set()
+        return added
+
+    def flush(self):
+        """Send every pending payload now, e.g. when the backend is back."""
+        owner_hash = self._owner_hash
+        if owner_hash is None:
+            return
+        self.repo.make_items_due(owner_hash, time.time())
+        self._wake.set()
+
+    def get_status_counts(self, owner_hash: str) -> dict[str, int]:
+        """Queued payloads of the owner by OutboxStatus value; sent ones are removed."""
+        return self.repo.count_items_by_status(owner_hash)
+
+    def backoff_delay(self, attempts: int) -> float:
+        """Seconds before retry number `attempts`: doubled per attempt up to the cap, the upper half random."""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** max(0, attempts - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    # ----- Dispatching -----
+    def start(self, owner_hash: str):
+        """Send the owner's queued payloads in the background, until stop()."""
+        if self._thread is not None and self._thread.is_alive():
+            if owner_hash == self._owner_hash:
+                self._wake.set()
+                return
+            self.stop()
+
+        self._owner_hash = owner_hash
+        self._stopping = threading.Event()
+        self._wake.set()
+        self._thread = threading.Thread(target=self._run, args=(owner_hash, self._stopping), name="shary-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sending; a request in flight finishes in the background. Queued payloads stay stored."""
+        self._stopping.set()
+        self._wake.set()
+        self._thread = None
+        self._owner_hash = None
+
+    def close(self):
+        self.stop()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    @span("outbox.dispatch")
+    def dispatch_due(self, owner_hash: str) -> float | None:
+        """
+        Send every due payload of the owner once. Returns the seconds until the
+        next one is due, or None if none is pending.
+        """
+        now = time.time()
+        expired = self.repo.expire_items(now)
+        if expired:
+            logging.warning(f"{expired} queued documents expired before they could be sent")
+
+        rows = self.repo.load_due_items(owner_hash, now, self.batch_size * self.max_in_flight)
+        if rows:
+            delivered = self._pool.map(lambda batch: self._send_batch(owner_hash, batch), iter_chunks(rows, self.batch_size))
+            if any(list(delivered)):
+                self.repo.make_items_due(owner_hash, time.time())
+
+        next_attempt_at = self.repo.load_next_attempt_at(owner_hash)
+        if next_attempt_at is None:
+            return None
+        return max(0.0, next_attempt_at - time.time())
+
+    # ----- Internal methods -----
+    def _run(self, owner_hash: str, stopping: threading.Event):
+        while not stopping.is_set():
+            self._wake.clear()
+            try:
+                delay = self.dispatch_due(owner_hash)
+            except Exception as e:
+                logging.error(f"Outbox dispatch failed: {e}")
+                delay = self.backoff_base
+            # Nothing pending: sleep until something is queued
+            self._wake.wait(delay)
+
+    def _send_batch(self, owner_hash: str, rows: list[tuple[int, str, int]]) -> bool:
+        """Send one batch and record the outcome. Returns whether any payload was stored."""
+        items, rejected = [], []
+        for item_id, payload, attempts in rows:
+            try:
+                items.append((item_id, json.loads(payload), attempts))
+            except ValueError:
+                rejected.append((item_id, attempts))
+
+        try:
+            statuses = self.cloud_service.send_queued_batch(owner_hash, [payload for _, payload, _ in items]) if items else {}
+        except CircuitOpenError as e:
+            # Not attempted; flushed when the circuit closes
+            self._record_failures([(item_id, attempts) for item_id, _, attempts in items], str(e), rejected, count_attempt=False)
+            return False
+        except Exception as e:
+            logging.error(f"❌ Failed to send {len(items)} queued documents: {e}")
+            self._record_failures([(item_id, attempts) for item_id, _, attempts in items], str(e), rejected)
+            return False
+
+        sent, retried = [], []
+        for item_id, payload, attempts in items:
+            status = statuses.get(payload["idempotency_key"], StatusDataSentDb.ERROR)
+            if status in (StatusDataSentDb.STORED, StatusDataSentDb.EXISTS):
+                sent.append(item_id)
+            elif status == StatusDataSentDb.MISSING_FIELD:
+                rejected.append((item_id, attempts))
+            else:
+                retried.append((item_id, attempts))
+
+        if sent:
+            self.repo.delete_items(sent)
+            logging.info(f"✅ {len(sent)} queued documents sent to BACKEND")
+        self._record_failures(retried, "not stored", rejected)
+        return bool(sent)
+
+    def _record_failures(self, retried: list[tuple[int, int]], error: str, rejected: list[tuple[int, int]], count_attempt: bool = True):
+        now = time.time()
+        updates = [(OutboxStatus.FAILED.value, attempts + 1, now, "rejected", item_id) for item_id, attempts in rejected]
+        for item_id, attempts in retried:
+            attempts += count_attempt
+            if attempts >= self.max_attempts:
+                updates.append((OutboxStatus.FAILED.value, attempts, now, error, item_id))
+            else:
+                updates.append((OutboxStatus.PENDING.value, attempts, now + self.backoff_delay(attempts + 1), error, item_id))
+
+        if updates:
+            self.repo.update_items(updates)
+        failed = sum(status == OutboxStatus.FAILED.value for status, *_ in updates)
+        if failed:
+            logging.warning(f"{failed} queued documents could not be sent and were given up")
@@ -1,6 +1,7 @@
 import os
 import base64
 import hashlib
+import hmac
 import json
 import time
 import logging
@@ -11,18 +12,27 @@ from rsa.key import PublicKey, PrivateKey
 from rsa.common import inverse
 from Crypto.Protocol.KDF import PBKDF2
 from Crypto.Hash import SHA256
+from Crypto.Random import get_random_bytes
 
 from core.constant import (
     PATH_PRIVATE_KEY,
     PATH_PUBLIC_KEY,
     PATH_SECRET_KEY,
     PATH_AUTH_SIGNATURE,
-    DEFAULT_SECRET_LENGTH
+    PATH_KEYS_CACHE,
+    DEFAULT_SECRET_LENGTH,
+    DEFAULT_DATA_KEY_LENGTH
 )
+from core.tracing import span
 from core.security_utils import (
     generate_nonce,
     get_current_utc,
     hash_by_pbkdf2,
+    aes_encrypt,
+    aes_decrypt,
+    aes_gcm_encrypt,
+    aes_gcm_decrypt,
+    make_blind_index,
 )
 
 # Generador determinista de enteros y primos
@@ -53,6 +63,10 @@ class SecurityService:
     _instance = None
     default_secret_length = DEFAULT_SECRET_LENGTH
 
+    # In-process cache of key pairs derived from secrets
+    _derived_keys: dict[str, tuple[PublicKey, PrivateKey]] = {}
+    _derived_keys_secret: bytes = os.urandom(32)
+
     def __init__(self, private_key=None, public_key=None, other_public_key=None, secret_key: str = None):
         self.private_key = private_key
         self.public_key = public_key
@@ -100,12 +114,65 @@ class SecurityService:
                 self.counter += 1
             return output[:n]
         
-    def generate_keys_from_secrets(self, password: str, username: str, key_size=1024):
+    @span("security.generate_keys_from_secrets")
+    def generate_keys_from_secrets(
+            self,
+            password: str,
+            username: str,
+            key_size=1024,
+            cache_key: bytes = None,
+            derived_keys: tuple[PublicKey, PrivateKey] = None,
+            ):
         """
         Genera claves RSA públicas y privadas de forma determinista a partir de username y password.
         Las claves generadas serán idénticas para los mismos parámetros.
+
+        The derived pair is cached in-process, so repeated calls with the same secrets
+        skip PBKDF2 and the prime search. If `cache_key` (the session AES key) is given,
+        the pair is also kept on disk encrypted with it, so later runs skip derivation.
+        `derived_keys` is a pair already computed by derive_keys(), used if no cache has one.
+        """
+        start = time.perf_counter()
+        cache_id = self._make_derivation_cache_id(password, username, key_size)
+
+        keys, source = self._derived_keys.get(cache_id), "memory cache"
+        if keys is None and cache_key:
+            keys, source = self._load_cached_keys(cache_key, username, key_size), "disk cache"
+        if keys is None and derived_keys is not None:
+            keys, source = derived_keys, "concurrent derivation"
+        if keys is None:
+            keys, source = self._derive_keys(password, username, key_size), "derivation"
+        if cache_key and source.endswith("derivation"):
+            self._store_cached_keys(keys, cache_key, username, key_size)
+
+        self._derived_keys[cache_id] = keys
+
+        # Asignar claves
+        self.public_key, self.private_key = keys
+        logging.info(f"Cryptographic keys ready from {source} in {time.perf_counter() - start:.3f}s")
+
+    def has_cached_keys(self, password: str, username: str, key_size=1024, path=PATH_KEYS_CACHE) -> bool:
+        """
+        Whether generate_keys_from_secrets may skip derivation: the pair is in
+        memory, or the disk cache was written for this username and key size.
         """
+        cache_id = self._make_derivation_cache_id(password, username, key_size)
+        if cache_id in self._derived_keys:
+            return True
+        try:
+            with open(path, "rb") as f:
+                return f.read(hashlib.sha256().digest_size) == self._make_keys_cache_tag(username, key_size)
+        except OSError:
+            return False
 
+    @classmethod
+    def derive_keys(cls, password: str, username: str, key_size=1024) -> tuple[PublicKey, PrivateKey]:
+        """PBKDF2 and prime search only. No state is touched, so it can run before the credentials are checked."""
+        return cls._derive_keys(password, username, key_size)
+
+    @staticmethod
+    @span("security.derive_keys")
+    def _derive_keys(password: str, username: str, key_size: int) -> tuple[PublicKey, PrivateKey]:
         # Derivar semilla desde password + username como salt
         salt = username.encode("utf-8")
         seed = PBKDF2(
@@ -134,13 +201,66 @@ class SecurityService:
         #dQ = d % (q - 1)
         #qInv = inverse(q, p)
 
-        # Asignar claves
-        self.public_key = PublicKey(n, e)
-        self.private_key = PrivateKey(n, e, d, p, q)
-        logging.debug(f"public_key: {self.public_key}")
-        logging.debug(f"private_key: {self.private_key}")
-
         logging.debug(f"Cryptographic keys generated.")
+        return PublicKey(n, e), PrivateKey(n, e, d, p, q)
+
+    @classmethod
+    def _make_derivation_cache_id(cls, password: str, username: str, key_size: int) -> str:
+        # Keyed with a per-process secret so the cache never holds a password verifier
+        message = f"{username}|{key_size}|{password}".encode("utf-8")
+        return hmac.new(cls._derived_keys_secret, message, hashlib.sha256).hexdigest()
+
+    @classmethod
+    def clear_derived_keys(cls):
+        cls._derived_keys.clear()
+
+    def clear_keys(self):
+        """Drop the owner's key pair, including the in-process derivation cache (on logout)."""
+        self.private_key = None
+        self.public_key = None
+        self.clear_derived_keys()
+
+    @staticmethod
+    def _make_keys_cache_tag(username: str, key_size: int) -> bytes:
+        # Stored in clear before the encrypted pair, so whose it is can be told
+        # before the session key is known (the credentials are read)
+        return hashlib.sha256(f"{username}|{key_size}".encode("utf-8")).digest()
+
+    @classmethod
+    def _load_cached_keys(cls, cache_key: bytes, username: str, key_size: int, path=PATH_KEYS_CACHE) -> tuple[PublicKey, PrivateKey] | None:
+        if not os.path.exists(path):
+            return None
+        
+        tag = cls._make_keys_cache_tag(username, key_size)
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(tag)) != tag:
+                    return None
+                data = json.loads(aes_decrypt(cache_key, f.read()))
+        except Exception as e:
+            logging.debug(f"Cached keys could not be opened: {type(e).__name__}")
+            return None
+
+        if data.get("username") != username or data.get("key_size") != key_size:
+            return None
+
+        private_key = PrivateKey.load_pkcs1(data["private_key"].encode("utf-8"), format="PEM")
+        return PublicKey(private_key.n, private_key.e), private_key
+
+    @classmethod
+    def _store_cached_keys(cls, keys: tuple[PublicKey, PrivateKey], cache_key: bytes, username: str, key_size: int, path=PATH_KEYS_CACHE):
+        _, private_key = keys
+        data = {
+            "username": username,
+            "key_size": key_size,
+            "private_key": private_key.save_pkcs1("PEM").decode("utf-8"),
+        }
+        try:
+            with open(path, "wb") as f:
+                f.write(cls._make_keys_cache_tag(username, key_size))
+                f.write(aes_encrypt(cache_key, json.dumps(data)))
+        except OSError as e:
+            logging.warning(f"Cannot store cached keys: {e}")
     
     def save_signature(self, username: str, email: str, password: str):
         """Genera una firma digital del usuario y la guarda en disco"""
@@ -156,6 +276,7 @@ class SecurityService:
 
         logging.debug(f"User signature stored.")
 
+    @span("security.verify_signature")
     def verify_signature(self, username: str, email: str, password) -> bool:
         """Verifica si la firma digital es válida con los datos ingresados"""
         self.generate_keys_from_secrets(password, username)
@@ -204,22 +325,26 @@ class SecurityService:
         return ""
 
     # --- Crypto Core ---
+    @span("security.encrypt")
     def encrypt(self, plaintext: bytes, public_key=None) -> bytes:
         key = public_key or self.public_key
         if not key:
             raise ValueError("Public key not loaded.")
         return rsa.encrypt(plaintext, key)
 
+    @span("security.decrypt")
     def decrypt(self, ciphertext: bytes) -> bytes:
         if not self.private_key:
             raise ValueError("Private key not loaded.")
         return rsa.decrypt(ciphertext, self.private_key)
 
+    @span("security.sign")
     def sign(self, message: bytes) -> bytes:
         if not self.private_key:
             raise ValueError("Private key not loaded.")
         return rsa.sign(message, self.private_key, 'SHA-256')
 
+    @span("security.verify")
     def verify(self, message: bytes, signature: bytes, public_key=None) -> bool:
         key = public_key or self.public_key
         if not key:
@@ -230,8 +355,39 @@ class SecurityService:
         except rsa.VerificationError:
             return False
 
+    # --- Envelope Encryption ---
+    @staticmethod
+    def generate_data_key() -> bytes:
+        return get_random_bytes(DEFAULT_DATA_KEY_LENGTH)
+
+    def wrap_data_key(self, data_key: bytes) -> bytes:
+        """Encrypt a symmetric data key with the owner's RSA public key."""
+        return self.encrypt(data_key)
+
+    def unwrap_data_key(self, wrapped_key: bytes) -> bytes:
+        """Recover a symmetric data key with the owner's RSA private key."""
+        return self.decrypt(wrapped_key)
+
+    @staticmethod
+    def seal(plaintext: bytes, data_key: bytes) -> bytes:
+        return aes_gcm_encrypt(data_key, plaintext)
+
+    @staticmethod
+    def unseal(sealed: bytes, data_key: bytes) -> bytes:
+        return aes_gcm_decrypt(data_key, sealed)
+
+    @staticmethod
+    def derive_index_key(data_key: bytes, label: bytes) -> bytes:
+        """Key of a blind index over data sealed with `data_key`. Never the data key itself."""
+        return make_blind_index(data_key, label)
+
+    @staticmethod
+    def blind_index(plaintext: bytes, index_key: bytes) -> bytes:
+        return make_blind_index(index_key, plaintext)
+
     # --- Utilities ---
     @staticmethod
+    @span("security.hash_password")
     def hash_password(password: bytes, user_salt: bytes, iterations: int = 100_000) -> bytes:
         return hash_by_pbkdf2(password, user_salt, iterations)
     
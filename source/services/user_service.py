@@ -1,5 +1,7 @@
 from repositories.user_repository import UserRepository
-from core.dtos import UserDTO
+from core.dtos import UserDTO, PageDTO
+from core.constant import DEFAULT_NUM_ROWS_PAGE, DEFAULT_SEARCH_LIMIT
+from core.search_index import TrigramIndex
 from typing import List, Tuple
 
 
@@ -7,6 +9,10 @@ class UserService():
     def __init__(self, repo: UserRepository):
         self.repo = repo
 
+        # Username (weighted higher) and email, re-synced when the table changes
+        self._search_index = TrigramIndex(weights=(1.0, 0.9))
+        self._search_version = None
+
     def create_user(self, username: str, email: str):
         user = UserDTO(username=username, email=email)
         self.repo.add_user(user)
@@ -23,3 +29,49 @@ class UserService():
         users_data = [(u.username, u.email, u.date_added) for u in user_dtos]
         
         return users_data
+
+    def get_user_ids(
+            self,
+            username_prefix: str | None = None,
+            date_from: str | None = None,
+            date_to: str | None = None
+            ) -> List[int]:
+        return self.repo.load_user_ids(username_prefix, date_from, date_to)
+
+    def search_users(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Tuple[str]]:
+        """(username, email, date) rows matching `query` by username or email, best first. Tolerates typos."""
+        self._sync_search_index()
+        return [row for _, _, row in self._search_index.search(query, limit)]
+
+    def _sync_search_index(self):
+        version = self.repo.get_version()
+        if version == self._search_version:
+            return
+
+        self._search_index.sync(
+            (user_id, (username, email), (username, email, date))
+            for user_id, username, email, date in self.repo.load_users_records()
+            )
+        self._search_version = version
+
+    def get_data_version(self) -> tuple[int, int]:
+        """Changes when the users table may have changed (see BaseRepository.get_version)."""
+        return self.repo.get_version()
+
+    def get_users_page(
+            self,
+            after_id: int = 0,
+            limit: int = DEFAULT_NUM_ROWS_PAGE,
+            username_prefix: str | None = None,
+            date_from: str | None = None,
+            date_to: str | None = None,
+            with_total: bool = False
+            ) -> PageDTO:
+        """One page of (username, email, date) rows, plus the filtered total if `with_total`."""
+        records = self.repo.load_users_page(after_id, limit, username_prefix, date_from, date_to)
+
+        return PageDTO(
+            rows=[(username, email, date) for _, username, email, date in records],
+            total=self.repo.count_users(username_prefix, date_from, date_to) if with_total else None,
+            next_cursor=records[-1][0] if len(records) == limit else None,
+            )
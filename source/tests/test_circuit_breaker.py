@@ -0,0 +1,135 @@
+import pytest
+
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from core.enums import CircuitState
+from core.session import Session
+from services.cloud_service import CloudService
+from services.security_service import SecurityService
+
+
+class FakeClock():
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeResponse():
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+class FakeHttp():
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        if self.status_code is None:
+            raise ConnectionError("connection refused")
+        return FakeResponse(self.status_code)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def breaker(clock):
+    states = []
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, on_state_change=states.append, clock=clock)
+    breaker.states = states
+    return breaker
+
+
+def test_opens_after_threshold_failures_in_a_row(breaker):
+    breaker.record_failure("ping", 0.1, "HTTP 503")
+    breaker.record_failure("ping", 0.1, "HTTP 503")
+    breaker.record_success("ping", 0.1)
+    breaker.record_failure("ping", 0.1, "HTTP 503")
+    breaker.record_failure("ping", 0.1, "HTTP 503")
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure("ping", 0.1, "HTTP 503")
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.is_open()
+    assert not breaker.allow_request()
+    assert breaker.states == [CircuitState.OPEN]
+
+
+def test_half_open_trial_after_cooldown_closes_on_success(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure("ping", 0.1, "timeout")
+
+    clock.now += 29.9
+    assert not breaker.allow_request()
+
+    clock.now += 0.2
+    assert not breaker.is_open()
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    # One trial at a time
+    assert breaker.is_open()
+    assert not breaker.allow_request()
+
+    breaker.record_success("ping", 0.1)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.states == [CircuitState.OPEN, CircuitState.HALF_OPEN, CircuitState.CLOSED]
+
+
+def test_failed_trial_reopens_for_a_full_cooldown(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure("ping", 0.1, "timeout")
+    clock.now += 31
+    assert breaker.allow_request()
+
+    breaker.record_failure("ping", 0.1, "timeout")
+    assert breaker.state == CircuitState.OPEN
+    clock.now += 29
+    assert not breaker.allow_request()
+    clock.now += 2
+    assert breaker.allow_request()
+
+
+def test_stats_per_endpoint(breaker):
+    breaker.record_success("get_pubkey", 0.2)
+    breaker.record_failure("get_pubkey", 0.4, "HTTP 500")
+
+    [stats] = breaker.get_stats()
+    assert stats["name"] == "get_pubkey"
+    assert (stats["calls"], stats["errors"], stats["last_error"]) == (2, 1, "HTTP 500")
+    assert stats["error_rate"] == 0.5
+
+
+def test_cloud_requests_short_circuit_while_open(clock):
+    cloud = CloudService(Session(), SecurityService(), base_endpoint="http://backend.invalid")
+    cloud.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    cloud.http = FakeHttp(status_code=503)
+
+    for _ in range(2):
+        cloud._request("store_payload", "POST", cloud.endpoint_send_data)
+    assert cloud.breaker.state == CircuitState.OPEN
+    assert not cloud.is_online
+
+    with pytest.raises(CircuitOpenError):
+        cloud._request("store_payload", "POST", cloud.endpoint_send_data)
+    assert cloud.http.calls == 2
+
+    # Probes still go through, and a success closes the circuit
+    cloud.http.status_code = 200
+    cloud._request("ping", "GET", cloud.base_endpoint, probe=True)
+    assert cloud.http.calls == 3
+    assert cloud.breaker.state == CircuitState.CLOSED
+
+
+def test_cloud_transport_errors_count_as_failures(clock):
+    cloud = CloudService(Session(), SecurityService(), base_endpoint="http://backend.invalid")
+    cloud.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    cloud.http = FakeHttp(status_code=None)
+
+    with pytest.raises(ConnectionError):
+        cloud._request("ping", "GET", cloud.base_endpoint)
+    assert cloud.breaker.state == CircuitState.OPEN
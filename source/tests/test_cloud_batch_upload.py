@@ -0,0 +1,121 @@
+import hashlib
+
+import pytest
+import rsa
+
+from core.enums import StatusDataSentDb
+from core.security_utils import hash_message, make_merkle_root
+from core.session import Session
+from services.cloud_service import CloudService
+from services.security_service import SecurityService
+
+OWNER = "owner@example.com"
+
+
+def leaf(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(left + right).digest()
+
+
+def test_merkle_root_of_one_leaf_is_the_leaf():
+    assert make_merkle_root([leaf("a")]) == leaf("a")
+
+def test_merkle_root_of_two_leaves():
+    a, b = bytes.fromhex(leaf("a")), bytes.fromhex(leaf("b"))
+    assert make_merkle_root([leaf("a"), leaf("b")]) == node(a, b).hex()
+
+def test_merkle_root_of_odd_leaves_repeats_the_last_node():
+    a, b, c = (bytes.fromhex(leaf(text)) for text in "abc")
+    expected = node(node(a, b), node(c, c)).hex()
+    assert make_merkle_root([leaf(text) for text in "abc"]) == expected
+
+def test_merkle_root_depends_on_order():
+    assert make_merkle_root([leaf("a"), leaf("b")]) != make_merkle_root([leaf("b"), leaf("a")])
+
+
+class FakeResponse():
+    def __init__(self, status_code: int, body: dict):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self) -> dict:
+        return self.body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeBatchBackend():
+    """
+    Answers /store_payloads with the status set per consumer hash (200 by
+    default). `status_codes` are the statuses of successive requests.
+    """
+    def __init__(self, statuses: dict[str, int] | None = None, status_codes: tuple[int, ...] = ()):
+        self.statuses = statuses or {}
+        self.status_codes = list(status_codes)
+        self.requests = []
+
+    def request(self, method, url, json=None, **kwargs):
+        self.requests.append(json)
+        results = [{"consumer": item["consumer"], "status": self.statuses.get(item["consumer"], 200)} for item in json["items"]]
+        return FakeResponse(self.status_codes.pop(0) if self.status_codes else 200, {"results": results})
+
+
+@pytest.fixture
+def cloud():
+    security = SecurityService()
+    security.public_key, security.private_key = rsa.newkeys(512)
+    cloud = CloudService(Session(), security, base_endpoint="http://backend.invalid")
+
+    def encrypt_for_consumer(owner_hash, consumer_hash, data):
+        if consumer_hash == hash_message("broken@example.com"):
+            raise ValueError("Consumer public key not available")
+        return f"encrypted-for-{consumer_hash}", [owner_hash, consumer_hash, hash_message(data)]
+
+    cloud._encrypt_for_consumer = encrypt_for_consumer
+    return cloud
+
+
+def test_batch_is_signed_over_the_merkle_root_of_its_items(cloud):
+    cloud.http = FakeBatchBackend()
+    consumers = [f"consumer_{i}@example.com" for i in range(3)]
+
+    results = cloud.upload_data_batch([("email", "a@b.c")], OWNER, consumers)
+
+    assert results == {consumer: StatusDataSentDb.STORED for consumer in consumers}
+    [payload] = cloud.http.requests
+    assert payload["root"] == make_merkle_root([item["verification"] for item in payload["items"]])
+    signed = hashlib.sha256(f"{hash_message(OWNER)}.{payload['root']}".encode()).digest()
+    signature = cloud.security_service.convert_b64_to_bytes(payload["signature"])
+    assert rsa.verify(signed, signature, cloud.security_service.public_key) == "SHA-256"
+
+
+def test_partial_failure_marks_only_the_failed_items(cloud):
+    failed, missing = "consumer_1@example.com", "consumer_2@example.com"
+    cloud.http = FakeBatchBackend({hash_message(failed): 500, hash_message(missing): 400})
+    consumers = ["consumer_0@example.com", failed, missing, "broken@example.com", "consumer_4@example.com"]
+
+    results = cloud.upload_data_batch([("email", "a@b.c")], OWNER, consumers)
+
+    assert results == {
+        "consumer_0@example.com": StatusDataSentDb.STORED,
+        failed: StatusDataSentDb.ERROR,
+        missing: StatusDataSentDb.MISSING_FIELD,
+        # Never sent: its item couldn't be built
+        "broken@example.com": StatusDataSentDb.ERROR,
+        "consumer_4@example.com": StatusDataSentDb.STORED,
+    }
+    assert len(cloud.http.requests[0]["items"]) == 4
+
+
+def test_failed_batch_request_marks_only_its_batch(cloud):
+    consumers = [f"consumer_{i}@example.com" for i in range(4)]
+    cloud.http = FakeBatchBackend(status_codes=(200, 503))
+
+    results = cloud.upload_data_batch([("email", "a@b.c")], OWNER, consumers, batch_size=2)
+
+    assert [results[consumer] for consumer in consumers] == [StatusDataSentDb.STORED] * 2 + [StatusDataSentDb.ERROR] * 2
+    assert [len(payload["items"]) for payload in cloud.http.requests] == [2, 2]
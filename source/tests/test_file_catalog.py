@@ -0,0 +1,77 @@
+import io
+import json
+
+import pytest
+
+from core.file_catalog import (
+    FileCatalog,
+    _JsonStreamReader,
+    index_json_fields,
+    iter_json_fields,
+    read_json_fields_at,
+)
+
+DOCUMENT = {
+    "version": 1,
+    "data": {"a": 12.5, "b": 1.5e3, "c": -7, "d": "été", "e": [1, 2.25], "f": True, "g": 10},
+}
+
+
+def _read_fields(text: str, chunk_chars: int) -> dict:
+    reader = _JsonStreamReader(io.BytesIO(text.encode("utf-8")), chunk_chars)
+    fields = {}
+    for key in reader.object_items():
+        if key == "data":
+            for field_key in reader.object_items():
+                fields[field_key] = reader.value()
+        else:
+            reader.value()
+    return fields
+
+
+@pytest.mark.parametrize("chunk_chars", range(1, 9))
+def test_numbers_split_across_chunks(chunk_chars):
+    text = json.dumps(DOCUMENT, ensure_ascii=False)
+    assert _read_fields(text, chunk_chars) == DOCUMENT["data"]
+
+
+def test_iter_json_fields_skips_other_members():
+    document = {"meta": {"data": {"nested": 1}}, "data": DOCUMENT["data"], "tail": [{"data": 2}]}
+    content = json.dumps(document, ensure_ascii=False).encode("utf-8")
+
+    assert dict(iter_json_fields(io.BytesIO(content))) == DOCUMENT["data"]
+
+
+@pytest.mark.parametrize("text", ['{"data": {"n": 12.}}', '{"data": {"n": 1.5e}}'])
+def test_truncated_number_is_rejected(text):
+    with pytest.raises(ValueError):
+        _read_fields(text, 3)
+
+
+def test_index_offsets_resume_reading():
+    data = {f"key_{i}": f"välue {i}" for i in range(25)}
+    content = json.dumps({"data": data}, ensure_ascii=False).encode("utf-8")
+
+    n_fields, keys, offsets = index_json_fields(io.BytesIO(content), stride=10)
+
+    assert n_fields == 25
+    assert keys == list(data)[:len(keys)]
+    assert len(offsets) == 3
+    for block, offset in enumerate(offsets):
+        rows = list(read_json_fields_at(io.BytesIO(content), offset, chunk_chars=7))
+        assert rows == list(data.items())[block * 10:]
+
+
+def test_read_rows_of_streamed_file(tmp_path):
+    data = {f"key_{i}": i for i in range(250)}
+    (tmp_path / "big.json").write_text(json.dumps({"data": data}), encoding="utf-8")
+    catalog = FileCatalog(str(tmp_path), stream_min_bytes=0)
+    catalog.scan()
+
+    entry = catalog.get_current("big.json")
+    assert catalog.is_streamed(entry)
+    assert entry.n_fields == 250
+    assert catalog.read_rows("big.json", 95, 10) == [(f"key_{i}", str(i)) for i in range(95, 105)]
+    assert catalog.read_rows("big.json", 245, 10) == [(f"key_{i}", str(i)) for i in range(245, 250)]
+    assert catalog.read_rows("big.json", 250, 10) == []
+    assert list(catalog.iter_rows("big.json")) == [(key, str(value)) for key, value in data.items()]
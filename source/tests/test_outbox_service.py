@@ -0,0 +1,162 @@
+import time
+
+import pytest
+import rsa
+
+from benchmarks.stub_backend import StubBackend
+from core.circuit_breaker import CircuitOpenError
+from core.database import ConnectionManager
+from core.enums import OutboxStatus, StatusDataSentDb
+from core.functions import try_make_base_tables
+from core.session import Session
+from repositories.outbox_repository import OutboxRepository
+from services.cloud_service import CloudService
+from services.outbox_service import OutboxService
+from services.security_service import SecurityService
+
+OWNER_HASH = "owner-hash"
+
+
+def make_payload(key: str) -> dict:
+    return {
+        "consumer": f"consumer-of-{key}",
+        "data": "encrypted",
+        "verification": "00" * 32,
+        "idempotency_key": key,
+        "expires_at": str(int(time.time()) + 3600),
+    }
+
+
+class FakeCloud():
+    """Records the idempotency keys of each batch; fails while `error` is set."""
+    def __init__(self):
+        self.error: Exception | None = None
+        self.sent: list[list[str]] = []
+
+    def send_queued_batch(self, owner_hash: str, payloads: list[dict]) -> dict[str, StatusDataSentDb]:
+        self.sent.append([payload["idempotency_key"] for payload in payloads])
+        if self.error is not None:
+            raise self.error
+        return {payload["idempotency_key"]: StatusDataSentDb.STORED for payload in payloads}
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = ConnectionManager(str(tmp_path / "outbox.db"))
+    try_make_base_tables(database.connection())
+    return database
+
+def make_outbox(database, cloud, **kwargs) -> OutboxService:
+    kwargs = {"backoff_base": 10, "backoff_max": 80, **kwargs}
+    return OutboxService(OutboxRepository(database), cloud, **kwargs)
+
+def load_items(database) -> list[tuple]:
+    return database.connection().execute(
+        "SELECT idempotency_key, status, attempts, next_attempt_at FROM outbox ORDER BY id").fetchall()
+
+
+def test_backoff_doubles_up_to_the_cap(database):
+    outbox = make_outbox(database, FakeCloud(), backoff_base=5, backoff_max=60)
+
+    for attempts, full_delay in [(1, 5), (2, 10), (3, 20), (4, 40), (5, 60), (12, 60)]:
+        delays = [outbox.backoff_delay(attempts) for _ in range(200)]
+        # Equal jitter: the upper half of the delay is random
+        assert all(full_delay / 2 <= delay <= full_delay for delay in delays)
+        assert len(set(delays)) > 1
+
+
+def test_failed_send_keeps_the_item_for_a_later_retry(database):
+    cloud = FakeCloud()
+    outbox = make_outbox(database, cloud)
+    assert outbox.enqueue(OWNER_HASH, [make_payload("k1")]) == 1
+    outbox.repo.make_items_due(OWNER_HASH, time.time())
+
+    cloud.error = ConnectionError("backend down")
+    before = time.time()
+    delay = outbox.dispatch_due(OWNER_HASH)
+
+    [(key, status, attempts, next_attempt_at)] = load_items(database)
+    assert (key, status, attempts) == ("k1", OutboxStatus.PENDING.value, 1)
+    # Second attempt waits 10-20 s (base 10, doubled)
+    assert before + 10 <= next_attempt_at <= time.time() + 20
+    assert 0 < delay <= 20
+
+    # Not due yet: nothing is sent
+    outbox.dispatch_due(OWNER_HASH)
+    assert cloud.sent == [["k1"]]
+
+    cloud.error = None
+    outbox.repo.make_items_due(OWNER_HASH, time.time())
+    assert outbox.dispatch_due(OWNER_HASH) is None
+    assert cloud.sent == [["k1"], ["k1"]]
+    assert load_items(database) == []
+
+
+def test_open_circuit_does_not_use_up_attempts(database):
+    cloud = FakeCloud()
+    outbox = make_outbox(database, cloud)
+    outbox.enqueue(OWNER_HASH, [make_payload("k1")])
+    outbox.repo.make_items_due(OWNER_HASH, time.time())
+
+    cloud.error = CircuitOpenError("circuit open")
+    outbox.dispatch_due(OWNER_HASH)
+
+    [(_, status, attempts, _)] = load_items(database)
+    assert (status, attempts) == (OutboxStatus.PENDING.value, 0)
+
+
+def test_item_is_given_up_after_max_attempts(database):
+    cloud = FakeCloud()
+    cloud.error = ConnectionError("backend down")
+    outbox = make_outbox(database, cloud, max_attempts=3)
+    outbox.enqueue(OWNER_HASH, [make_payload("k1")])
+
+    for _ in range(3):
+        outbox.repo.make_items_due(OWNER_HASH, time.time())
+        outbox.dispatch_due(OWNER_HASH)
+
+    assert outbox.get_status_counts(OWNER_HASH) == {OutboxStatus.FAILED.value: 1}
+    outbox.repo.make_items_due(OWNER_HASH, time.time())
+    outbox.dispatch_due(OWNER_HASH)
+    assert len(cloud.sent) == 3
+
+
+def test_same_key_is_queued_once(database):
+    outbox = make_outbox(database, FakeCloud())
+    assert outbox.enqueue(OWNER_HASH, [make_payload("k1"), make_payload("k2")]) == 2
+    assert outbox.enqueue(OWNER_HASH, [make_payload("k1")]) == 0
+    assert outbox.get_status_counts(OWNER_HASH) == {OutboxStatus.PENDING.value: 2}
+
+
+@pytest.fixture
+def backend():
+    backend = StubBackend(key_size=512).start()
+    yield backend
+    backend.stop()
+
+def test_lost_ack_is_retried_with_the_same_key_and_stored_once(database, backend):
+    security = SecurityService()
+    security.public_key, security.private_key = rsa.newkeys(512)
+    session = Session()
+    session.set_verification_token("test-token")
+    cloud = CloudService(session, security, base_endpoint=backend.base_endpoint)
+    outbox = make_outbox(database, cloud)
+    outbox.enqueue(OWNER_HASH, [make_payload("k1"), make_payload("k2")])
+    outbox.repo.make_items_due(OWNER_HASH, time.time())
+
+    # Stored, but the answer is lost: the outbox has to retry
+    backend.lose_ack_rate = 1.0
+    outbox.dispatch_due(OWNER_HASH)
+    assert len(backend.payloads) == 2
+    assert outbox.get_status_counts(OWNER_HASH) == {OutboxStatus.PENDING.value: 2}
+
+    backend.lose_ack_rate = 0.0
+    outbox.repo.make_items_due(OWNER_HASH, time.time())
+    outbox.dispatch_due(OWNER_HASH)
+
+    assert outbox.get_status_counts(OWNER_HASH) == {}
+    assert sorted(payload["idempotency_key"] for payload in backend.payloads) == ["k1", "k2"]
+    assert backend.duplicates == 2
+    assert backend.request_counts["/store_payloads"] == 2
+    outbox.close()
+    cloud.close()
@@ -0,0 +1,35 @@
+import os
+
+import rsa
+
+from services.security_service import SecurityService
+
+CACHE_KEY = os.urandom(32)
+
+
+def _write_cache(path, username="alice", key_size=1024):
+    keys = rsa.newkeys(512)
+    SecurityService._store_cached_keys(keys, CACHE_KEY, username, key_size, str(path))
+    return keys
+
+
+def test_cached_keys_belong_to_their_user_and_key_size(tmp_path):
+    path = tmp_path / "keys_cache.bin"
+    security = SecurityService()
+    assert not security.has_cached_keys("secret", "alice", path=str(path))
+
+    _write_cache(path)
+
+    assert security.has_cached_keys("secret", "alice", path=str(path))
+    assert not security.has_cached_keys("secret", "bob", path=str(path))
+    assert not security.has_cached_keys("secret", "alice", key_size=2048, path=str(path))
+
+
+def test_cached_keys_load_only_for_their_user(tmp_path):
+    path = tmp_path / "keys_cache.bin"
+    _, private_key = _write_cache(path)
+
+    loaded = SecurityService._load_cached_keys(CACHE_KEY, "alice", 1024, str(path))
+    assert loaded is not None and loaded[1] == private_key
+    assert SecurityService._load_cached_keys(CACHE_KEY, "bob", 1024, str(path)) is None
+    assert SecurityService._load_cached_keys(os.urandom(32), "alice", 1024, str(path)) is None
@@ -0,0 +1,161 @@
+import smtplib
+from email.message import EmailMessage
+
+import pytest
+
+from benchmarks.stub_smtp import StubSmtpServer
+from core.enums import StatusEmailSent
+from core.session import Session
+from core.smtp_transport import SmtpTransport
+from services.email_service import EmailService
+
+CREDENTIALS = ("sender@example.com", "password")
+
+
+def make_message(recipient: str, subject: str = "test") -> EmailMessage:
+    message = EmailMessage()
+    message["From"], message["To"], message["Subject"] = CREDENTIALS[0], recipient, subject
+    message.set_content("body")
+    return message
+
+
+class FakeSmtp():
+    """smtplib.SMTP stand-in: `fail_on` maps the n-th message sent over any connection to the error it raises."""
+    instances: list["FakeSmtp"] = []
+    fail_on: dict[int, BaseException] = {}
+    sent = 0
+
+    def __init__(self, host, port, timeout=None):
+        self.closed = False
+        self.messages = []
+        FakeSmtp.instances.append(self)
+
+    def login(self, user, password):
+        pass
+
+    def send_message(self, message):
+        FakeSmtp.sent += 1
+        error = FakeSmtp.fail_on.pop(FakeSmtp.sent, None)
+        if error is not None:
+            raise error
+        self.messages.append(message["Subject"])
+        return {}
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    monkeypatch.setattr(FakeSmtp, "instances", [])
+    monkeypatch.setattr(FakeSmtp, "fail_on", {})
+    monkeypatch.setattr(FakeSmtp, "sent", 0)
+    monkeypatch.setattr(smtplib, "SMTP", FakeSmtp)
+    return FakeSmtp
+
+def make_transport(**kwargs) -> SmtpTransport:
+    return SmtpTransport("smtp.invalid", 25, credentials=lambda: CREDENTIALS, use_ssl=False, **kwargs)
+
+def free_slots(transport: SmtpTransport) -> int:
+    taken = 0
+    while transport._slots.acquire(blocking=False):
+        taken += 1
+    for _ in range(taken):
+        transport._slots.release()
+    return taken
+
+
+def test_connection_dying_mid_batch_resends_the_rest(fake_smtp):
+    transport = make_transport(max_connections=2)
+    fake_smtp.fail_on = {3: smtplib.SMTPServerDisconnected("connection lost")}
+
+    results = transport.send_many([make_message("to@example.com", f"m{i}") for i in range(5)])
+
+    assert results == [{}] * 5
+    first, second = fake_smtp.instances
+    assert first.messages == ["m0", "m1"] and first.closed
+    assert second.messages == ["m2", "m3", "m4"] and not second.closed
+    assert free_slots(transport) == 2
+
+
+def test_message_failing_every_retry_is_reported_and_the_rest_sent(fake_smtp):
+    transport = make_transport()
+    fake_smtp.fail_on = {2: ConnectionResetError(), 3: ConnectionResetError()}
+
+    results = transport.send_many([make_message("to@example.com", f"m{i}") for i in range(3)], retries=1)
+
+    assert results[0] == {} and results[2] == {}
+    assert isinstance(results[1], ConnectionResetError)
+    assert [message for server in fake_smtp.instances for message in server.messages] == ["m0", "m2"]
+
+
+def test_connection_error_discards_the_connection(fake_smtp):
+    transport = make_transport(max_connections=1)
+    fake_smtp.fail_on = {1: smtplib.SMTPServerDisconnected("gone"), 2: smtplib.SMTPServerDisconnected("gone")}
+
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        transport.send(make_message("to@example.com"), retries=1)
+
+    assert all(server.closed for server in fake_smtp.instances)
+    assert transport._idle == []
+    assert free_slots(transport) == 1
+
+
+def test_smtp_error_returns_the_connection_to_the_pool(fake_smtp):
+    transport = make_transport(max_connections=1)
+    fake_smtp.fail_on = {1: smtplib.SMTPDataError(554, b"rejected")}
+
+    with pytest.raises(smtplib.SMTPDataError):
+        transport.send(make_message("to@example.com"))
+    transport.send(make_message("to@example.com", "again"))
+
+    [server] = fake_smtp.instances
+    assert server.messages == ["again"] and not server.closed
+    assert free_slots(transport) == 1
+
+    transport.close()
+    assert server.closed
+
+
+def test_failed_login_closes_the_connection_and_frees_the_slot(fake_smtp, monkeypatch):
+    def login(self, user, password):
+        raise smtplib.SMTPAuthenticationError(535, b"bad credentials")
+    monkeypatch.setattr(FakeSmtp, "login", login)
+    transport = make_transport(max_connections=1)
+
+    with pytest.raises(smtplib.SMTPAuthenticationError):
+        transport.send(make_message("to@example.com"))
+
+    assert [server.closed for server in fake_smtp.instances] == [True]
+    assert free_slots(transport) == 1
+
+
+@pytest.fixture
+def stub_smtp():
+    smtp = StubSmtpServer(drop_every=2).start()
+    yield smtp
+    smtp.stop()
+
+def test_send_bulk_reports_each_recipient(stub_smtp):
+    session = Session()
+    session.email, session.username = CREDENTIALS[0], "sender"
+    transport = SmtpTransport(stub_smtp.host, stub_smtp.port, credentials=lambda: CREDENTIALS, use_ssl=False)
+    service = EmailService(session, transport)
+    groups = [["a@example.com"], ["refused@example.com"], ["b@example.com", "refused.too@example.com"], ["c@example.com"]]
+
+    results = service.send_bulk([("email", "a@b.c"), ("phone", "555")], groups)
+    service.close()
+
+    assert results == {
+        "a@example.com": StatusEmailSent.SENT,
+        "refused@example.com": StatusEmailSent.REFUSED,
+        "b@example.com": StatusEmailSent.SENT,
+        "refused.too@example.com": StatusEmailSent.REFUSED,
+        "c@example.com": StatusEmailSent.SENT,
+    }
+    # Dropped after every second message, and reconnected
+    assert [message["to"] for message in stub_smtp.messages] == [["a@example.com"], ["b@example.com"], ["c@example.com"]]
+    assert stub_smtp.connections == 2